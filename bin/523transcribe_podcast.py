@@ -30,11 +30,7 @@ from utilities1 import (
 print(">>> [POST-utilities1] dt type:", type(dt))
 print(">>> [POST-utilities1] sys.modules['datetime']:", sys.modules.get('datetime'))
 
-import whisper
-print(">>> [POST-whisper] dt type:", type(dt))
 
-from TTS.api import TTS
-print(">>> [POST-TTS] dt type:", type(dt))
 
 # === Init logging ===
 logger = initialize_logging()
@@ -78,11 +74,15 @@ def download_podcast_audio(url: str, output_path="podcast.mp3") -> str:
         raise RuntimeError(f"Could not retrieve podcast audio.")
 
 def transcribe_audio_file(audio_path: str) -> str:
+    import whisper  # Heavy: only load once we actually transcribe
+
     model = whisper.load_model("base")
     result = model.transcribe(audio_path)
     return result["text"]
 
 def synthesize_text_to_speech(text: str, output_path: str):
+    from TTS.api import TTS  # Heavy: only load once we actually synthesize
+
     tts = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False)
     tts.tts_to_file(text=text, file_path=output_path)
 
@@ -1,7 +1,6 @@
 import os
 import sys  # <- YES, DO NOT REMOVE THIS AGAIN
 import json
-import difflib
 import logging
 
 # === Load from local utils ===
@@ -18,35 +17,7 @@ from utilities1 import (
     load_app_config,
     create_subdir,
 )
-
-
-def generate_comparison_report(file1_path, file2_path, output_path):
-    with open(file1_path, "r") as f1, open(file2_path, "r") as f2:
-        lines1 = f1.readlines()
-        lines2 = f2.readlines()
-
-    max_lines = max(len(lines1), len(lines2))
-    report_lines = []
-
-    for i in range(max_lines):
-        line1 = lines1[i].strip() if i < len(lines1) else "[MISSING]"
-        line2 = lines2[i].strip() if i < len(lines2) else "[MISSING]"
-
-        if line1 == line2:
-            report_lines.append(f"=== LINE {i + 1} ===\n✅ IDENTICAL: {line1}\n")
-        else:
-            report_lines.append(f"=== LINE {i + 1} ===")
-            report_lines.append(f"🎥 1: {line1}")
-            report_lines.append(f"🎥 2: {line2}")
-            report_lines.append("🔍 DIFF:")
-            for d in difflib.ndiff([line1], [line2]):
-                report_lines.append(f"    {d}")
-            report_lines.append("")
-
-    with open(output_path, "w") as f:
-        f.write("\n".join(report_lines))
-
-    print(f"\n📄 Comparison report saved to: {output_path}")
+from text_diff import generate_comparison_report
 
 
 def main():
@@ -94,7 +65,8 @@ def main():
     # === Generate comparison report ===
     print("\n🔍 Generating comparison report...")
     report_path = os.path.join(data_dir, "comparison_report.txt")
-    generate_comparison_report(transcript_paths[0], transcript_paths[1], report_path)
+    html_path = report_path.replace(".txt", ".html") if "--html" in sys.argv else None
+    generate_comparison_report(transcript_paths[0], transcript_paths[1], report_path, html_path)
 
 
 if __name__ == "__main__":
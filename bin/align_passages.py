@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import traceback
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from utilities1 import initialize_logging
+from corpus_index import load_corpus
+from passage_align import MIN_SCORE, load_segments, build_passage_index, align_segments
+
+USAGE = """Usage:
+  python align_passages.py <transcript.json> <article_dir_or_file> [...] [--min-score=0.5] [--top-k=1] [--output=path]
+Transcript: chunk_sentences output (*_sentences.json), a Whisper result, or *.minute.json.
+Writes <transcript>.alignment.json unless --output is given."""
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "?"
+    return f"{int(seconds // 60):02}:{seconds % 60:05.2f}"
+
+
+def main():
+    logger = initialize_logging()
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        logger.error(USAGE)
+        sys.exit(1)
+
+    try:
+        transcript_path, sources = args[0], args[1:]
+        min_score = float(get_option("min-score", MIN_SCORE))
+        top_k = int(get_option("top-k", 1))
+        output_path = get_option("output", os.path.splitext(transcript_path)[0] + ".alignment.json")
+
+        articles = {}
+        for source in sources:
+            if os.path.isdir(source):
+                articles.update(load_corpus(source))
+            else:
+                with open(source, "r", encoding="utf-8") as f:
+                    articles[os.path.basename(source)] = f.read()
+
+        segments = load_segments(transcript_path)
+        logger.info(f"🎙️ {len(segments)} transcript segments, {len(articles)} articles")
+
+        index = build_passage_index(articles)
+        rows = align_segments(index, segments, min_score=min_score, top_k=top_k)
+
+        for row in rows:
+            best = row["matches"][0]
+            logger.info(
+                f"⏱️ {format_time(row['start'])}–{format_time(row['end'])} → "
+                f"{best['article']} ¶{best['paragraph']} [{best['span'][0]}:{best['span'][1]}] "
+                f"{best['score']:.2f}  \"{row['text'][:60]}\""
+            )
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "transcript": transcript_path,
+                "articles": sorted(articles),
+                "min_score": min_score,
+                "segments": len(segments),
+                "matches": rows,
+            }, f, indent=2, ensure_ascii=False)
+        logger.info(f"📄 Alignment written to {output_path}")
+
+    except Exception as e:
+        logger.error(f"💥 Unexpected error: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
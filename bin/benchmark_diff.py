@@ -0,0 +1,102 @@
+# benchmark_diff.py — line-by-line ndiff report vs word-level text_diff report 🏁
+#
+# Runs the previous generate_comparison_report (per-line difflib.ndiff) and
+# the word-level patience/Myers diff on the same pair of transcripts and
+# prints runtime and report size for each. Besides the original pair it also
+# checks a near-duplicate (one transcript against a copy with ~5% of its
+# words changed), which is the case the report is meant for.
+#
+# Usage:
+#   python bin/benchmark_diff.py                        # the data/Tim_Ballard_*.full.txt pair
+#   python bin/benchmark_diff.py a.txt b.txt [--html]   # --html also times the HTML rendering
+
+import os
+import sys
+import glob
+import time
+import random
+import difflib
+import tempfile
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from text_diff import generate_comparison_report
+
+repo_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+
+def line_ndiff_report(file1_path, file2_path, output_path):
+    """The report as generated before: one ndiff per line."""
+    with open(file1_path, "r") as f1, open(file2_path, "r") as f2:
+        lines1 = f1.readlines()
+        lines2 = f2.readlines()
+
+    report_lines = []
+    for i in range(max(len(lines1), len(lines2))):
+        line1 = lines1[i].strip() if i < len(lines1) else "[MISSING]"
+        line2 = lines2[i].strip() if i < len(lines2) else "[MISSING]"
+        if line1 == line2:
+            report_lines.append(f"=== LINE {i + 1} ===\n✅ IDENTICAL: {line1}\n")
+        else:
+            report_lines.append(f"=== LINE {i + 1} ===")
+            report_lines.append(f"🎥 1: {line1}")
+            report_lines.append(f"🎥 2: {line2}")
+            report_lines.append("🔍 DIFF:")
+            for d in difflib.ndiff([line1], [line2]):
+                report_lines.append(f"    {d}")
+            report_lines.append("")
+
+    with open(output_path, "w") as f:
+        f.write("\n".join(report_lines))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_case(label, path1, path2, workdir, html):
+    old_out = os.path.join(workdir, "old.txt")
+    new_out = os.path.join(workdir, "new.txt")
+    html_out = os.path.join(workdir, "new.html") if html else None
+
+    old_ms = timed(line_ndiff_report, path1, path2, old_out)
+    new_ms = timed(generate_comparison_report, path1, path2, new_out, html_out)
+    row = (f"{label:<40} {old_ms:>9.1f} {os.path.getsize(old_out) / 1024:>8.1f} "
+           f"{new_ms:>9.1f} {os.path.getsize(new_out) / 1024:>8.1f}")
+    if html_out:
+        row += f" {os.path.getsize(html_out) / 1024:>8.1f}"
+    print(row)
+
+
+def main():
+    html = "--html" in sys.argv
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(repo_root, "data/Tim_Ballard_*.full.txt")))[:2]
+    if len(paths) != 2:
+        print("❌ Need exactly two transcripts")
+        return 1
+
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(paths[0], "r", encoding="utf-8") as f:
+            words = f.read().split()
+        rng = random.Random(0)
+        edited = os.path.join(workdir, "edited.txt")
+        with open(edited, "w", encoding="utf-8") as f:
+            f.write(" ".join(w if rng.random() > 0.05 else w.upper() + "x" for w in words))
+
+        header = f"{'case':<40} {'old ms':>9} {'old KB':>8} {'new ms':>9} {'new KB':>8}"
+        print(header + (f" {'html KB':>8}" if html else ""))
+        run_case(f"{os.path.basename(paths[0])[:18]} vs {os.path.basename(paths[1])[:18]}",
+                 paths[0], paths[1], workdir, html)
+        run_case(f"{os.path.basename(paths[0])[:18]} vs 5% edited", paths[0], edited, workdir, html)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# benchmark_extraction.py — BeautifulSoup article extraction vs the lxml single pass 🏁
+#
+# Extracts plain text, italics text and cleaned HTML from saved pages two ways:
+#   bs4:  parse_editorial_content() + get_text() + get_text_with_italics() + prettify()
+#   lxml: extract_article()
+# and prints the time for each and whether the text outputs agree.
+#
+# Usage:
+#   python bin/benchmark_extraction.py                  # pages in ./cache/http (*.body)
+#   python bin/benchmark_extraction.py page1.html ...   # given pages
+#   Options: --repeat=N (default 5)
+
+import os
+import sys
+import glob
+import time
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from scraper import (
+    DEFAULT_CACHE_DIR,
+    extract_article,
+    parse_editorial_content,
+    get_text_with_italics,
+)
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def bs4_extract(html):
+    element = parse_editorial_content(html)
+    return {
+        "text": element.get_text("\n", strip=True),
+        "italics": get_text_with_italics(element),
+        "html": element.prettify(),
+    }
+
+
+def timed(fn, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(html)
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def main():
+    repeat = int(get_option("repeat", 5))
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(DEFAULT_CACHE_DIR, "*.body")))
+    if not paths:
+        print(f"❌ No pages given and none cached in {DEFAULT_CACHE_DIR} (run a scrape first)")
+        return 1
+
+    print(f"{'page':<40} {'KB':>7} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8} {'text':>5}")
+    total_old = total_new = 0.0
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        old_ms, old = timed(bs4_extract, html, repeat)
+        new_ms, new = timed(extract_article, html, repeat)
+        total_old += old_ms
+        total_new += new_ms
+        same = "✅" if old["text"] == new["text"] else "❌"
+        print(f"{os.path.basename(path)[:40]:<40} {len(html) / 1024:>7.1f} {old_ms:>9.1f} "
+              f"{new_ms:>9.1f} {old_ms / max(new_ms, 1e-9):>7.1f}x {same:>5}")
+
+    print(f"{'total':<40} {'':>7} {total_old:>9.1f} {total_new:>9.1f} {total_old / max(total_new, 1e-9):>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# benchmark_similarity.py — SequenceMatcher vs text_similarity.compare_texts 🏁
+#
+# Compares the old whole-document SequenceMatcher(None, a, b).ratio() with the
+# signature + token alignment engine on the transcripts in data/*.full.txt:
+#   - every pair of transcripts as found on disk,
+#   - each transcript against a near-duplicate copy (~5% of words replaced),
+#   - each transcript against a truncated copy,
+#   - the same pairs with the texts repeated --scale times, to show how the
+#     two approaches grow with document length.
+#
+# Usage:
+#   python bin/benchmark_similarity.py                    # data/*.full.txt, scale 4
+#   python bin/benchmark_similarity.py a.txt b.txt --scale=8
+
+import os
+import sys
+import glob
+import time
+import random
+from itertools import combinations
+from difflib import SequenceMatcher
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from text_similarity import compare_texts, text_signature
+
+repo_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def near_duplicate(text, rate=0.05, seed=0):
+    """Replace roughly `rate` of the words, the way a re-transcription drifts."""
+    rng = random.Random(seed)
+    return " ".join(word if rng.random() > rate else "xxx" for word in text.split())
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_case(label, a, b):
+    old, old_ms = timed(lambda x, y: SequenceMatcher(None, x, y).ratio(), a, b)
+    text_signature.cache_clear()  # measure cold: signing is part of the cost
+    new, new_ms = timed(compare_texts, a, b)
+    speedup = old_ms / new_ms if new_ms else float("inf")
+    print(f"{label:<48} {len(a) + len(b):>9} {old:>7.3f} {old_ms:>10.1f} {new:>7.3f} {new_ms:>9.1f} {speedup:>7.1f}x")
+
+
+def main():
+    compare_texts("warm up", "warm up")  # keep the one-off numpy import out of the timings
+    scale = int(get_option("scale", 4))
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(repo_root, "data/*.full.txt")))
+    if not paths:
+        print("❌ No transcripts found (expected data/*.full.txt)")
+        return 1
+
+    texts = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            texts[os.path.basename(path).replace(".full.txt", "")] = f.read()
+
+    cases = []
+    for (name_a, a), (name_b, b) in combinations(texts.items(), 2):
+        cases.append((f"{name_a[:20]} vs {name_b[:20]}", a, b))
+    for name, text in texts.items():
+        cases.append((f"{name[:30]} vs 5% edited", text, near_duplicate(text)))
+        cases.append((f"{name[:30]} vs first half", text, text[:len(text) // 2]))
+
+    print(f"{'case':<48} {'chars':>9} {'old':>7} {'old ms':>10} {'new':>7} {'new ms':>9} {'speedup':>8}")
+    for label, a, b in cases:
+        run_case(label, a, b)
+    if scale > 1:
+        print(f"\n--- texts repeated x{scale} ---")
+        for label, a, b in cases:
+            run_case(label[:44] + f" x{scale}", a * scale, b * scale)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,6 @@ import logging
 import os
 import json
 import yaml
-from moviepy.editor import VideoFileClip
 
 # Set IM path for MoviePy
 os.environ["IMAGEMAGICK_BINARY"] = os.getenv("IMAGEMAGICK_BINARY", "magick")
@@ -35,61 +34,84 @@ from utilities2 import (
 # ======================================
 task = "generate_captions"
 
-# ======================================
-# CLI Argument Handling
-# ======================================
-if len(sys.argv) < 3:
-    print("Usage: python call_clips.py <input_video> <clips_json_file>")
-    sys.exit(1)
-
-input_video = sys.argv[1]
-clips_file = sys.argv[2]
-
 # ======================================
 # Init & Config
 # ======================================
 logger = initialize_logging()
-platform_config = load_config()
-set_imagemagick_env(platform_config)
-app_config = load_app_config()
-
 
-# ======================================
-# Task Skipping Logic
-# ======================================
-if not should_perform_task(task, app_config):
-    existing = get_existing_task_output(task, app_config)
-    if existing:
-        logger.info(f"Task '{task}' already done. Output located at: {existing}")
-    else:
-        logger.info(f"Task '{task}' is disabled in config. Exiting.")
-    sys.exit(0)
 
 # ======================================
-# Pre-checks
+# Task Entry Point
 # ======================================
-if not os.path.exists(input_video):
-    logger.error(f"Error: Video file '{input_video}' not found.")
-    sys.exit(1)
+def run_task(input_video, clips_file=None):
+    """
+    Cuts the clips described in a clips YAML from a video and captions them.
+
+    Called in-process by the task runner (video only), or from the CLI below.
+    Without clips_file, app_config["clips_file"] is used, then
+    clips/<video name>.yaml.
+
+    Returns:
+        str | bool | None: Output directory of the clips (the recorded output,
+        or True, when the task is already done or disabled), None on failure.
+    """
+    platform_config = load_config()
+    set_imagemagick_env(platform_config)
+    app_config = load_app_config()
+
+    # ======================================
+    # Task Skipping Logic
+    # ======================================
+    if not should_perform_task(task, app_config):
+        existing = get_existing_task_output(task, app_config)
+        if existing:
+            logger.info(f"Task '{task}' already done. Output located at: {existing}")
+        else:
+            logger.info(f"Task '{task}' is disabled in config. Exiting.")
+        return existing or True
+
+    # ======================================
+    # Pre-checks
+    # ======================================
+    if not os.path.exists(input_video):
+        logger.error(f"Error: Video file '{input_video}' not found.")
+        return None
+
+    video_name = os.path.splitext(os.path.basename(input_video))[0]
+    clips_file = clips_file or app_config.get("clips_file") or os.path.join("clips", f"{video_name}.yaml")
+    if not os.path.exists(clips_file):
+        logger.error(f"Error: Clips file '{clips_file}' not found.")
+        return None
+
+    logger.info(f"Processing video: {input_video}")
+
+    # ======================================
+    # Load & Process Clips
+    # ======================================
+    clips = load_clips_from_file(clips_file)
+    output_dir = create_subdir(base_dir="clips", subdir_name="orange")
+
+    #captions_config_path = "clips/2.tb.tty.yaml"
+    captions_config_path = clips_file  # ← use the file passed from Perl
+
+    with open(captions_config_path, "r") as f:
+        captions_config = yaml.safe_load(f)
+
+    # Call the part that creates clips first
+    process_clips_moviepy(app_config, clips, logger, input_video, output_dir, captions_config)
+
+    # THEN do captioning (if needed, or if it's a separate pass)
+    process_clips_with_captions(app_config, clips, logger, input_video, output_dir)
+    return output_dir
 
-logger.info(f"Processing video: {input_video}")
 
 # ======================================
-# Load & Process Clips
+# CLI Argument Handling
 # ======================================
-clips = load_clips_from_file(clips_file)
-output_dir = create_subdir(base_dir="clips", subdir_name="orange")
-
-
-#captions_config_path = "clips/2.tb.tty.yaml"
-captions_config_path = clips_file  # ← use the file passed from Perl
-
-with open(captions_config_path, "r") as f:
-    captions_config = yaml.safe_load(f)
-
-# Call the part that creates clips first
-process_clips_moviepy(app_config, clips, logger, input_video, output_dir, captions_config)
-
-# THEN do captioning (if needed, or if it's a separate pass)
-process_clips_with_captions(app_config, clips, logger, input_video, output_dir)
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python call_clips.py <input_video> <clips_json_file>")
+        sys.exit(1)
 
+    if not run_task(sys.argv[1], sys.argv[2]):
+        sys.exit(1)
@@ -16,7 +16,8 @@ import downloader5
 import utilities1
 from utilities2 import initialize_logging, load_config
 from utilities3 import set_imagemagick_env, transcribe_full_video, extract_full_audio
-from utilities4 import should_perform_task, get_existing_task_output, extend_metadata_with_task_output, find_url_json, copy_metadata_to_backup, load_default_tasks, add_default_tasks_to_metadata, update_task_output_path
+from utilities4 import should_perform_task, get_existing_task_output, find_url_json, copy_metadata_to_backup, load_default_tasks
+from tasks_lib import extend_metadata_with_task_output, add_default_tasks_to_metadata, update_task_output_path  # locked metadata writers
 
 # ======================================
 # Task Definition
@@ -42,27 +43,39 @@ app_config = {"default_tasks": default_tasks}
 # ======================================
 # Task Skipping Logic
 # ======================================
-logger.info(f"🧩 Checking if task '{task}' should be performed...")
+def task_enabled():
+    """Return True if the download task is enabled in default_tasks."""
+    logger.info(f"🧩 Checking if task '{task}' should be performed...")
 
-# Log the current task flag for 'perform_download'
-logger.debug(f"Task '{task}' in config: {default_tasks.get('perform_download')}")
+    # Log the current task flag for 'perform_download'
+    logger.debug(f"Task '{task}' in config: {default_tasks.get('perform_download')}")
+
+    # We call should_perform_task here to check if the task should be performed
+    logger.info(f"🔵 Checking task '{task}' before skipping logic.")
+    if should_perform_task(task, app_config):  # Check if the task should be performed
+        logger.info(f"✅ Task '{task}' is enabled and will be performed.")
+        return True
 
-# We call should_perform_task here to check if the task should be performed
-logger.info(f"🔵 Checking task '{task}' before skipping logic.")
-if should_perform_task(task, app_config):  # Check if the task should be performed
-    logger.info(f"✅ Task '{task}' is enabled and will be performed.")
-else:
     existing = get_existing_task_output(task, app_config)
     if existing:
         logger.info(f"Task '{task}' already done. Output located at: {existing}")
     else:
         logger.info(f"❌ Task '{task}' is disabled in config. Exiting.")
-    sys.exit(0)
+    return False
 
 # ======================================
 # Main Download Logic
 # ======================================
-def main():
+def run_task(url):
+    """
+    Downloads one URL and records it in metadata.
+
+    Called in-process by the task runner, or from main() on the CLI.
+
+    Returns:
+        str | None: Path of the downloaded video (or the one recorded in existing
+        metadata), None on failure.
+    """
     try:
         logger.info("🔴 Entering main download logic... 🚀")
 
@@ -74,7 +87,7 @@ def main():
         # Check if the USB is mounted and writable
         if not os.path.exists(target_usb):
             logger.error(f"Error: USB drive {target_usb} is not mounted.")
-            sys.exit(1)
+            return None
 
         if not os.path.exists(download_path):
             logger.warning(f"Download path {download_path} does not exist. Creating it now.")
@@ -82,20 +95,15 @@ def main():
                 os.makedirs(download_path, exist_ok=True)
             except PermissionError:
                 logger.error(f"Permission denied: Unable to create {download_path}")
-                sys.exit(1)
+                return None
 
         elif not os.access(download_path, os.W_OK):
             logger.error(f"Error: No write permission to {download_path}.")
-            sys.exit(1)
+            return None
 
         logger.info(f"Download directory confirmed: {download_path}")
 
-        # Validate URL input
-        if len(sys.argv) < 2:
-            logger.error("The URL is missing. Please provide a valid URL as a command-line argument.")
-            sys.exit(1)
-
-        url = sys.argv[1].strip()
+        url = url.strip()
 
         # Attempt to find metadata for the URL
         found_file, found_data = find_url_json(url, metadata_dir="./metadata")
@@ -103,7 +111,13 @@ def main():
         if found_file:
             logger.info(f"Metadata already exists for URL: {url}. Skipping download.")
             print(f"Metadata found in: {found_file}")
-            return  # Skip download if metadata exists
+            # Skip download if metadata exists; hand on the recorded video, not the metadata
+            recorded = found_data.get("default_tasks", {}).get(task)
+            video_path = recorded if isinstance(recorded, str) else found_data.get("original_filename")
+            if not video_path or not os.path.exists(video_path):
+                logger.error(f"No downloaded video recorded in {found_file} (got {video_path!r})")
+                return None
+            return video_path
 
         logger.warning("❌ No metadata found for URL. Proceeding with download...")
 
@@ -125,10 +139,10 @@ def main():
             downloader_result = downloader5.download_video(params)
             if not downloader_result:  # If no video was downloaded
                 logger.warning(f"No video to download for URL: {url}. Skipping to next URL.")
-                return  # Exit this function early and move to the next URL
+                return None  # Exit this function early and move to the next URL
         except Exception as e:
             logger.error(f"Error in downloading video for URL: {url}: {e}")
-            return  # Exit this function early and move to the next URL
+            return None  # Exit this function early and move to the next URL
 
         # Continue with other functions only if video is successfully downloaded
         function_calls = [
@@ -171,9 +185,24 @@ def main():
         else:
             logger.warning("No filename produced after download.")
 
+        return original_filename
+
     except Exception as e:
-        logger.error(f"Unexpected error in main(): {e}")
+        logger.error(f"Unexpected error in run_task(): {e}")
         traceback.print_exc()
+        return None
+
+
+def main():
+    # Validate URL input
+    if len(sys.argv) < 2:
+        logger.error("The URL is missing. Please provide a valid URL as a command-line argument.")
+        sys.exit(1)
+
+    if not task_enabled():
+        sys.exit(0)
+
+    if not run_task(sys.argv[1]):
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -8,7 +8,6 @@ import tempfile
 import traceback
 from datetime import datetime
 from urllib.parse import urlparse
-from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
 
 
 # === Load from local utils ===
@@ -8,12 +8,8 @@ import json
 import os
 import logging
 import traceback
-import requests
-import re
 from datetime import datetime
 from urllib.parse import urlparse
-from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
-from bs4 import BeautifulSoup
 
 # === Load from local utils ===
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,14 +17,13 @@ lib_path = os.path.join(current_dir, "../lib/python_utils")
 sys.path.append(lib_path)
 
 from transcription_utils import (
+    detect_media_language,
     whisper_transcribe_full_video,
     whisper_transcribe_video_by_minute,
     distill_run_snapshot,
     write_srt,
     write_vtt,
-    extract_editorial_content,
-    slugify_url,
-    get_text_with_italics,
+    scrape_articles,
 
 )
 
@@ -38,6 +33,9 @@ from utilities1 import (
     create_output_directory,
     create_subdir,
 )
+from tasks_lib import record_media_language
+from translation import model_for_language, translate_chunks
+from translation_memory import open_memory
 
 # === Initialize logger ===
 logger = initialize_logging()
@@ -63,10 +61,22 @@ def main():
     full_outfile = os.path.join(base_output_dir, f"{video_stem}.full.txt")
     minute_outfile = os.path.join(base_output_dir, f"{video_stem}.minute.json")
 
+    # === Detect language once, pin it for every Whisper pass ===
+    language = None
+    try:
+        detection = detect_media_language(input_video)
+        language = detection["language"]
+        metadata_path = os.path.join("metadata", f"{video_stem}.json")
+        if os.path.exists(metadata_path):
+            record_media_language(metadata_path, detection)
+    except Exception:
+        logger.warning("Language detection failed; Whisper will detect per pass")
+        logger.debug(traceback.format_exc())
+
     # === Transcribe full video ===
     logger.info("Starting full video transcription...")
     try:
-        full_transcript = whisper_transcribe_full_video(input_video)
+        full_transcript = whisper_transcribe_full_video(input_video, language=language)
         with open(full_outfile, "w") as f:
             f.write(full_transcript)
         logger.info(f"Full transcript saved to {full_outfile}")
@@ -76,8 +86,9 @@ def main():
 
     # === Transcribe by minute ===
     logger.info("Starting minute-by-minute transcription...")
+    minute_transcript = {}
     try:
-        minute_transcript = whisper_transcribe_video_by_minute(input_video)
+        minute_transcript = whisper_transcribe_video_by_minute(input_video, language=language)
         with open(minute_outfile, "w") as f:
             json.dump(minute_transcript, f, indent=2)
         logger.info(f"Minute-by-minute transcript saved to {minute_outfile}")
@@ -85,6 +96,29 @@ def main():
         logger.error("Failed minute-by-minute transcription")
         logger.debug(traceback.format_exc())
 
+    # === Route non-English transcripts to translation ===
+    translation_model = model_for_language(language)
+    if translation_model and minute_transcript:
+        logger.info(f"Translating {language} transcript to English with {translation_model}...")
+        memory = None
+        try:
+            memory = open_memory()
+            keys = list(minute_transcript)
+            translated = dict(zip(keys, translate_chunks([minute_transcript[k] for k in keys],
+                                                         model_name=translation_model, memory=memory)))
+            translated_minute_outfile = os.path.join(base_output_dir, f"{video_stem}.translated.minute.json")
+            with open(translated_minute_outfile, "w", encoding="utf-8") as f:
+                json.dump(translated, f, indent=2, ensure_ascii=False)
+            with open(os.path.join(base_output_dir, f"{video_stem}.translated.en.txt"), "w", encoding="utf-8") as f:
+                f.write(" ".join(translated.values()))
+            logger.info(f"Translated transcript saved to {translated_minute_outfile}")
+        except Exception:
+            logger.error("Failed to translate transcript")
+            logger.debug(traceback.format_exc())
+        finally:
+            if memory is not None:
+                memory.close()
+
     # === Scrape Articles ===
     logger.info("Beginning article scraping...")
 
@@ -94,31 +128,7 @@ def main():
         "https://www.presidency.ucsb.edu/documents/remarks-meeting-human-trafficking-the-mexico-united-states-border-and-exchange-with?utm_source=chatgpt.com"
     ]
 
-    for url in urls:
-        logger.info(f"Scraping: {url}")
-        element = extract_editorial_content(url)
-
-        if not element:
-            logger.warning(f"Skipping due to failed content extraction: {url}")
-            continue
-
-        slug = slugify_url(url)
-        try:
-            plain_text = element.get_text("\n", strip=True)
-            italics = get_text_with_italics(element)
-            raw_html = element.prettify()
-
-            with open(os.path.join(article_dir, f"{slug}.txt"), "w", encoding="utf-8") as f:
-                f.write(plain_text)
-            with open(os.path.join(article_dir, f"{slug}-italics.txt"), "w", encoding="utf-8") as f:
-                f.write(italics)
-            with open(os.path.join(article_dir, f"{slug}-html.txt"), "w", encoding="utf-8") as f:
-                f.write(raw_html)
-
-            logger.info(f"Saved article: {slug} (txt, italics, html)")
-        except Exception:
-            logger.error(f"Failed to save output for {slug}")
-            logger.debug(traceback.format_exc())
+    scrape_articles(urls, article_dir, config.get("scraper", {}))
     # === Generate SRT and VTT from Whisper segments ===
     logger.info("Generating SRT and VTT subtitle files...")
     try:
@@ -3,13 +3,8 @@ import os
 import json
 import logging
 import traceback
-import requests
-import re
-from bs4 import BeautifulSoup
 from datetime import datetime
 from urllib.parse import urlparse
-from moviepy.editor import VideoFileClip
-from difflib import SequenceMatcher
 
 # === Load from local utils ===
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,6 +16,9 @@ from transcription_utils import (
     whisper_transcribe_video_by_minute,
 )
 
+from text_similarity import compare_texts
+from scraper import scrape_articles, slugify_url
+
 from utilities1 import (
     initialize_logging,
     load_app_config,
@@ -29,47 +27,6 @@ from utilities1 import (
     distill_run_snapshot,
 )
 
-# === Utility functions ===
-def extract_editorial_content(url):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        return None
-
-    soup = BeautifulSoup(response.text, "lxml")
-    for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
-        tag.extract()
-
-    main_content = (
-        soup.find("article") or 
-        soup.find("div", {"id": "main-content"}) or 
-        soup.find("div", {"class": "content"})
-    )
-
-    if main_content:
-        return main_content
-
-    paragraphs = soup.find_all("p")
-    wrapper = soup.new_tag("div")
-    for p in paragraphs[:200]:
-        wrapper.append(p)
-    return wrapper
-
-def get_text_with_italics(element):
-    parts = []
-    for tag in element.descendants:
-        if tag.name in ["em", "i"]:
-            parts.append(f"*{tag.get_text(strip=True)}*")
-        elif tag.name is None:
-            parts.append(tag.strip())
-    return " ".join(parts)
-
-def slugify_url(url):
-    return re.sub(r'\W+', '-', url.split("//")[-1].split("/")[0].replace("www.", "")).strip("-")
-
-def compare_texts(a, b):
-    return SequenceMatcher(None, a, b).ratio()
-
 # === CLI Entry ===
 def main():
     logger = initialize_logging()
@@ -109,27 +66,10 @@ def main():
     ]
 
     print("\n=== Scraping Articles ===")
-    for url in urls:
+    saved = scrape_articles(urls, article_dir, config.get("scraper", {}))
+    for url, slug in saved.items():
         print(f"→ {url}")
-        element = extract_editorial_content(url)
-
-        if not element:
-            print("❌ Failed to fetch.")
-            continue
-
-        slug = slugify_url(url)
-        plain_text = element.get_text("\n", strip=True)
-        italics = get_text_with_italics(element)
-        raw_html = element.prettify()
-
-        with open(os.path.join(article_dir, f"{slug}.txt"), "w", encoding="utf-8") as f:
-            f.write(plain_text)
-        with open(os.path.join(article_dir, f"{slug}-italics.txt"), "w", encoding="utf-8") as f:
-            f.write(italics)
-        with open(os.path.join(article_dir, f"{slug}-html.txt"), "w", encoding="utf-8") as f:
-            f.write(raw_html)
-
-        print(f"   ✅ Saved to: {article_dir}/{slug}*.txt")
+        print(f"   ✅ Saved to: {article_dir}/{slug}*.txt" if slug else "❌ Failed to fetch.")
 
     # === Compare Transcription to Articles ===
     print("\n=== Comparing Whisper Transcript to Articles ===")
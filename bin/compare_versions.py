@@ -0,0 +1,64 @@
+# compare_versions.py — N-way comparison of transcripts of the same script 🧬
+#
+# Aligns every given transcript (default: data/*.full.txt) into one
+# multiple alignment and writes a variant table showing which version said
+# what wherever they differ.
+#
+# Usage:
+#   python bin/compare_versions.py                               # all data/*.full.txt
+#   python bin/compare_versions.py a.full.txt b.full.txt c.full.txt
+#   Options: --reference=<version name> --workers=N --output=<dir>
+
+import os
+import sys
+import glob
+import traceback
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from utilities1 import initialize_logging
+from multi_align import load_versions, align_versions, write_variant_report
+
+repo_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main():
+    logger = initialize_logging()
+    try:
+        paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+        if not paths:
+            paths = sorted(glob.glob(os.path.join(repo_root, "data/*.full.txt")))
+        if len(paths) < 2:
+            logger.error("❌ Need at least two transcripts to compare")
+            sys.exit(1)
+
+        workers = get_option("workers")
+        output_dir = get_option("output", os.path.join(repo_root, "sources/version_comparison"))
+
+        versions = load_versions(paths)
+        result = align_versions(versions, reference=get_option("reference"),
+                                workers=int(workers) if workers else None)
+        outputs = write_variant_report(result, output_dir)
+
+        for name in result["order"]:
+            logger.info(f"📊 {name}: {result['agreement'][name]:.1%} agreement with consensus")
+        logger.info(f"🧬 {len(result['variants'])} variant passages → {outputs['markdown']}")
+
+    except Exception as e:
+        logger.error(f"💥 Unexpected error: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 import os
 import sys  # DO NOT REMOVE THIS — critical for sys.path and utils
 import json
-import difflib
 import logging
 
 # === Load from local utils ===
@@ -18,35 +17,9 @@ from utilities1 import (
     load_app_config,
     create_subdir,
 )
-
-
-def generate_comparison_report(file1_path, file2_path, output_path):
-    with open(file1_path, "r") as f1, open(file2_path, "r") as f2:
-        lines1 = f1.readlines()
-        lines2 = f2.readlines()
-
-    max_lines = max(len(lines1), len(lines2))
-    report_lines = []
-
-    for i in range(max_lines):
-        line1 = lines1[i].strip() if i < len(lines1) else "[MISSING]"
-        line2 = lines2[i].strip() if i < len(lines2) else "[MISSING]"
-
-        if line1 == line2:
-            report_lines.append(f"=== LINE {i + 1} ===\n✅ IDENTICAL: {line1}\n")
-        else:
-            report_lines.append(f"=== LINE {i + 1} ===")
-            report_lines.append(f"🎥 1: {line1}")
-            report_lines.append(f"🎥 2: {line2}")
-            report_lines.append("🔍 DIFF:")
-            for d in difflib.ndiff([line1], [line2]):
-                report_lines.append(f"    {d}")
-            report_lines.append("")
-
-    with open(output_path, "w") as f:
-        f.write("\n".join(report_lines))
-
-    print(f"\n📄 Comparison report saved to: {output_path}")
+from text_diff import generate_comparison_report
+from audio_fingerprint import fingerprint_audio, match_fingerprints
+from multi_align import load_versions, align_versions, write_variant_report
 
 
 def main():
@@ -58,17 +31,44 @@ def main():
     data_dir = os.path.join(script_dir, "../data")
     video_files = [f for f in os.listdir(data_dir) if "watermarked" in f and f.endswith(".mp4")]
 
-    if len(video_files) != 2:
-        raise ValueError("Expected exactly two '*_watermarked.mp4' files in ./data")
+    if len(video_files) < 2:
+        raise ValueError("Expected at least two '*_watermarked.mp4' files in ./data")
 
     video_files.sort()
     video_paths = [os.path.join(data_dir, vf) for vf in video_files]
-    print(f"Found videos:\n1. {video_files[0]}\n2. {video_files[1]}")
+    print("Found videos:\n" + "\n".join(f"{i}. {vf}" for i, vf in enumerate(video_files, start=1)))
 
     # Build output path
-    compare_id = f"{os.path.splitext(video_files[0])[0]}_vs_{os.path.splitext(video_files[1])[0]}"
+    stems = [os.path.splitext(vf)[0] for vf in video_files]
+    compare_id = "_vs_".join(stems) if len(stems) == 2 else f"{stems[0]}_and_{len(stems) - 1}_versions"
     base_output_dir = create_subdir(base_dir="sources", subdir_name=compare_id)
 
+    # Audio alignment first: cheap, and independent of transcription errors
+    print("\n🔊 Aligning audio fingerprints...")
+    fingerprints = {}
+    for path in video_paths:
+        try:
+            fingerprints[path] = fingerprint_audio(path)
+        except Exception as e:
+            # No audio track, unreadable file or missing ffmpeg: skip its pairs, keep transcribing
+            logger.error(f"❌ Could not fingerprint {os.path.basename(path)}: {e}")
+    alignment = []
+    for i, path_a in enumerate(video_paths):
+        for path_b in video_paths[i + 1:]:
+            if path_a not in fingerprints or path_b not in fingerprints:
+                continue
+            regions = match_fingerprints(fingerprints[path_a], fingerprints[path_b])
+            alignment.append({"a": os.path.basename(path_a), "b": os.path.basename(path_b), "regions": regions})
+            shared = sum(region["a_end_ms"] - region["a_start_ms"] for region in regions) / 1000
+            print(f"🔗 {os.path.basename(path_a)} ↔ {os.path.basename(path_b)}: "
+                  f"{len(regions)} shared region(s), {shared:.0f}s"
+                  + (f" (first at offset {regions[0]['offset_ms'] / 1000:+.1f}s)" if regions else
+                     " (no shared audio: different recordings)"))
+    alignment_path = os.path.join(base_output_dir, "audio_alignment.json")
+    with open(alignment_path, "w") as f:
+        json.dump(alignment, f, indent=2)
+    print(f"📄 Audio alignment saved to {alignment_path}")
+
     transcript_paths = []
 
     for video_path in video_paths:
@@ -92,9 +92,17 @@ def main():
         print(f"📝 Minute-by-minute transcript saved to {minute_out_path}")
 
     # Generate comparison report
+    if len(transcript_paths) > 2:
+        print(f"\n🧬 Aligning {len(transcript_paths)} versions...")
+        result = align_versions(load_versions(transcript_paths))
+        outputs = write_variant_report(result, base_output_dir)
+        print(f"📄 Variant table saved to: {outputs['markdown']}")
+        return
+
     print("\n🔍 Generating comparison report...")
     report_path = os.path.join(data_dir, "comparison_report.txt")
-    generate_comparison_report(transcript_paths[0], transcript_paths[1], report_path)
+    html_path = report_path.replace(".txt", ".html") if "--html" in sys.argv else None
+    generate_comparison_report(transcript_paths[0], transcript_paths[1], report_path, html_path)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@ import sys
 import json
 import logging
 import traceback
+import multiprocessing
 from datetime import datetime
 
 # === Load from local utils ===
@@ -12,22 +13,94 @@ sys.path.append(lib_path)
 
 from utilities2 import initialize_logging, load_app_config
 from tasks_lib import get_task_states, find_url_json
+from job_queue import DEFAULT_DB_PATH, DEFAULT_STAGE_LIMITS, enqueue_metadata, run_worker, queue_status
 
 # Initialize the logger
 logger = initialize_logging()
 
-# === MAIN EXECUTION ===
-from tasks_lib import find_url_json, get_task_states
+USAGE = """Usage:
+  python continue_tasks.py <instagram_url>            Queue and run remaining tasks for one URL
+  python continue_tasks.py enqueue [metadata_dir]     Queue remaining tasks for every metadata entry
+  python continue_tasks.py work [--workers=N]         Run N worker processes until interrupted
+  python continue_tasks.py status                     Show queue depth and throughput
+Options: --db=<path> (default: ./metadata/job_queue.sqlite3)"""
+
+
+def get_option(name, default=None):
+    """Return the value of a --name=value flag from argv."""
+    for arg in sys.argv[2:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def start_workers(db_path, count, stage_limits, stop_when_idle=False):
+    """Start worker processes and wait for them."""
+    workers = [
+        multiprocessing.Process(
+            target=run_worker,
+            kwargs={
+                "db_path": db_path,
+                "worker_id": f"worker-{i + 1}",
+                "stage_limits": stage_limits,
+                "stop_when_idle": stop_when_idle,
+            },
+        )
+        for i in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping workers...")
+        for worker in workers:
+            worker.join()
+
+
+def print_status(db_path):
+    status = queue_status(db_path)
+    print(f"📊 Queue depth: {status['depth']}")
+    print(f"⚡ Throughput (last hour): {status['throughput_per_min']:.2f} jobs/min "
+          f"({status['finished_in_window']} finished)")
+    for task, states in sorted(status["by_task"].items()):
+        summary = ", ".join(f"{state}={count}" for state, count in sorted(states.items()))
+        print(f"  {task:<20} {summary}")
+    for failure in status["top_failures"]:
+        print(f"  ❌ {failure['task']}: {failure['last_error']} (x{failure['n']})")
+
 
 def main():
     try:
         app_config = load_app_config()
+        queue_config = app_config.get("job_queue", {})
+        stage_limits = {**DEFAULT_STAGE_LIMITS, **queue_config.get("stage_limits", {})}
 
         if len(sys.argv) < 2:
-            logger.error("Usage: python continue_tasks.py <instagram_url>")
+            logger.error(USAGE)
             sys.exit(1)
 
-        url = sys.argv[1]
+        command = sys.argv[1]
+        db_path = get_option("db", queue_config.get("db_path", DEFAULT_DB_PATH))
+
+        if command == "status":
+            print_status(db_path)
+            sys.exit(0)
+
+        if command == "enqueue":
+            args = [a for a in sys.argv[2:] if not a.startswith("--")]
+            metadata_dir = args[0] if args else "./metadata"
+            enqueue_metadata(db_path, metadata_dir)
+            print_status(db_path)
+            sys.exit(0)
+
+        if command == "work":
+            workers = int(get_option("workers", queue_config.get("workers", 4)))
+            start_workers(db_path, workers, stage_limits)
+            sys.exit(0)
+
+        url = command
 
         if not url.startswith("http"):
             logger.error(f"❌ Input must be an Instagram URL, not: {url}")
@@ -53,20 +126,10 @@ def main():
 
         logger.info(f"🎬 Found video path: {video_path}")
 
-        # Define task order
-        task_order = ["perform_download", "apply_watermark", "generate_captions", "post_processed"]
-
-        for task in task_order:
-            val = task_states.get(task)
-            if val is True:
-                logger.info(f"🔧 Next task to run: {task}")
-                # TODO: Replace this with actual task function
-                logger.info(f"✨ Simulated running task: {task} for {url}")
-                break
-            elif isinstance(val, str):
-                logger.info(f"✅ Task already completed: {task} → {val}")
-            else:
-                logger.debug(f"⏩ Task '{task}' not ready or missing.")
+        # Queue whatever is still flagged True and run only this entry's jobs
+        enqueue_metadata(db_path, os.path.dirname(json_path), url=url)
+        run_worker(db_path, worker_id="continue-tasks", stage_limits=stage_limits, stop_when_idle=True,
+                   metadata_path=os.path.abspath(json_path))
 
         logger.info(f"🏁 Task check complete for: {url}")
         sys.exit(0)
@@ -80,4 +143,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
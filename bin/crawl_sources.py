@@ -0,0 +1,68 @@
+# crawl_sources.py — discover articles for the comparison corpus 🕷️
+#
+# Crawls from seed URLs and/or sitemaps, politely (robots.txt, per-host delay),
+# and saves unique articles as <slug>.txt / -italics.txt / -html.txt plus a
+# crawl_manifest.json. Point mim2.py at the output directory to compare them.
+#
+# Usage:
+#   python bin/crawl_sources.py https://example.com/news/
+#   python bin/crawl_sources.py seeds.txt https://example.com/sitemap.xml
+#   Options: --output=<dir> --max-pages=N --depth=N --delay=SECONDS --workers=N
+#            --min-words=N --any-host (follow links off the seed hosts)
+
+import os
+import sys
+import traceback
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from utilities1 import initialize_logging, create_subdir
+from crawler import load_seeds, crawl, MAX_PAGES, MAX_DEPTH, DEFAULT_DELAY, MIN_WORDS
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main():
+    logger = initialize_logging()
+    try:
+        sources = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+        if not sources:
+            print("Usage: python crawl_sources.py <seed url | seeds.txt | sitemap.xml> ... [--output=dir]")
+            sys.exit(1)
+
+        seeds = load_seeds(sources)
+        if not seeds:
+            logger.error("❌ No seed URLs found")
+            sys.exit(1)
+
+        article_dir = get_option("output") or os.path.join(
+            create_subdir(base_dir="sources", subdir_name="crawl"), "articles")
+        summary = crawl(
+            seeds,
+            article_dir,
+            max_pages=int(get_option("max-pages", MAX_PAGES)),
+            max_depth=int(get_option("depth", MAX_DEPTH)),
+            delay=float(get_option("delay", DEFAULT_DELAY)),
+            workers=int(get_option("workers", 8)),
+            same_host="--any-host" not in sys.argv,
+            min_words=int(get_option("min-words", MIN_WORDS)),
+        )
+        logger.info(f"📂 {summary['articles']} articles in {article_dir} — compare with: "
+                    f"python bin/mim2.py {article_dir}")
+
+    except Exception as e:
+        logger.error(f"💥 Unexpected error: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
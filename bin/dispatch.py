@@ -3,7 +3,6 @@ import os
 import json
 import logging
 import traceback
-import subprocess
 from datetime import datetime
 
 # Add lib path to sys.path
@@ -14,39 +13,26 @@ sys.path.append(lib_path)
 # Import utilities
 from utilities2 import initialize_logging, load_config, load_app_config
 from utilities3 import find_url_json
-
-# Map tasks to their respective scripts
-TASK_DISPATCH = {
-    "perform_download": "bin/call_download.py",
-    "apply_watermark": "bin/call_watermark.py",
-    "make_clips": "bin/call_make_clips.py",
-    "extract_audio": "bin/call_extract_audio.py",
-    "generate_captions": "bin/call_captions.py",
-    "post_process": "bin/call_screenshots.py"
-}
-
-def execute_tasks(task_config, url, to_process, dry_run=False):
-    """Run appropriate script for each task based on its config."""
-    for task, status in task_config.items():
-        script = TASK_DISPATCH.get(task)
-
-        if not script:
-            logging.warning(f"No script defined for task: {task}")
-            continue
-
-        # Use URL for download; use file path for all others
-        task_input = url if task == "perform_download" else to_process
-
-        if status is True:  # Only execute if the task flag is True
-            logging.info(f"🚀 Running task: {task} -> {script}")
-            if dry_run:
-                logging.info(f"[Dry Run] Would run: python {script} {task_input}")
-            else:
-                subprocess.run(["python", script, task_input])
-        elif isinstance(status, str):  # Task already completed (status is a string)
-            logging.info(f"✅ Task already completed: {task} @ {status}")
-        else:
-            logging.info(f"⏭️  Skipping task: {task}")
+from tasks_lib import TASK_DISPATCH, TASK_DEPENDENCIES
+from task_runner import load_task_callable, run_task_graph
+
+def execute_tasks(task_config, url, to_process, dry_run=False, metadata_path=None):
+    """Run every enabled task in-process, overlapping tasks whose dependencies are met."""
+    stages = {
+        task: os.path.join(current_dir, "..", script)
+        for task, script in TASK_DISPATCH.items()
+    }
+
+    # Use URL for download; use file path for all others
+    return run_task_graph(
+        task_config,
+        stages,
+        TASK_DEPENDENCIES,
+        initial_inputs={"perform_download": url},
+        default_input=to_process,
+        metadata_path=metadata_path,
+        dry_run=dry_run,
+    )
 
 
 
@@ -54,21 +40,22 @@ def execute_tasks(task_config, url, to_process, dry_run=False):
 
 def run_my_existing_downloader(url, logger):
     """
-    Calls the known-good downloader script for the given URL.
+    Calls the known-good downloader script for the given URL, in-process.
     Waits for the download to finish and lets the usual metadata machinery do its thing.
     """
     logger.info(f"📥 Initiating download for: {url}")
 
-    result = subprocess.run(
-        ["python", "bin/call_download.py", url],
-        capture_output=True,
-        text=True
-    )
+    try:
+        result = load_task_callable(os.path.join(current_dir, "call_download.py"))(url)
+    except Exception as e:
+        logger.error(f"Download script failed: {e}")
+        return None
 
-    if result.returncode != 0:
-        logger.error(f"Download script failed:\n{result.stderr}")
+    if not result:
+        logger.error("Download script failed.")
     else:
-        logger.info(f"Download stdout:\n{result.stdout}")
+        logger.info(f"Download result: {result}")
+    return result
 
 def main():
     try:
@@ -132,7 +119,7 @@ def main():
             return
 
         logger.info(f"🛠 Tasks to evaluate: {list(default_tasks.keys())}")
-        execute_tasks(default_tasks, url, to_process, dry_run)
+        execute_tasks(default_tasks, url, to_process, dry_run, metadata_path=found_file)
 
     except Exception as e:
         logging.error(f"Unexpected error in main(): {e}")
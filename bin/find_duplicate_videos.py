@@ -0,0 +1,103 @@
+# find_duplicate_videos.py — triage re-uploads and re-edits before transcribing 🎞️
+#
+# Fingerprints each given video (default: data/*.mp4) from frames sampled
+# with OpenCV, reports which already-indexed videos share footage with it
+# and at what offsets, then adds it to the index. Run it on new downloads
+# to skip Whisper for videos that are already known.
+#
+# Usage:
+#   python bin/find_duplicate_videos.py                       # all data/*.mp4
+#   python bin/find_duplicate_videos.py new_upload.mp4
+#   Options: --db=<sqlite path> --fps=N --min-frames=N --max-distance=N
+#            --output=<report.json> --no-add (query only)
+
+import os
+import sys
+import glob
+import json
+import traceback
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from utilities1 import initialize_logging
+from video_fingerprint import (
+    open_video_index,
+    fingerprint_video,
+    add_fingerprint,
+    find_shared_segments,
+    DEFAULT_INDEX_PATH,
+    SAMPLE_FPS,
+    MIN_FRAMES,
+    MAX_DISTANCE,
+)
+
+repo_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def format_ms(ms):
+    sign = "-" if ms < 0 else ""
+    seconds = abs(ms) / 1000
+    return f"{sign}{int(seconds // 60)}:{seconds % 60:04.1f}"
+
+
+def main():
+    logger = initialize_logging()
+    try:
+        paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+        if not paths:
+            paths = sorted(glob.glob(os.path.join(repo_root, "data/*.mp4")))
+        if not paths:
+            print("Usage: python find_duplicate_videos.py <video> ... [--db=path] [--no-add]")
+            sys.exit(1)
+
+        conn = open_video_index(get_option("db", DEFAULT_INDEX_PATH))
+        sample_fps = float(get_option("fps", SAMPLE_FPS))
+        min_frames = int(get_option("min-frames", MIN_FRAMES))
+        max_distance = int(get_option("max-distance", MAX_DISTANCE))
+
+        report = {}
+        for path in paths:
+            video_id = os.path.splitext(os.path.basename(path))[0]
+            fingerprint = fingerprint_video(path, sample_fps)
+            matches = find_shared_segments(conn, fingerprint, max_distance, min_frames, exclude={video_id})
+            report[video_id] = matches
+
+            if not matches:
+                logger.info(f"🆕 {video_id}: no shared footage with indexed videos")
+            for match in matches:
+                logger.info(f"🔁 {video_id} shares {format_ms(match['shared_ms'])} ({match['coverage']:.0%}) "
+                            f"with {match['video_id']}")
+                for seg in match["segments"]:
+                    logger.info(f"    {format_ms(seg['query_start_ms'])}–{format_ms(seg['query_end_ms'])} ↔ "
+                                f"{format_ms(seg['match_start_ms'])}–{format_ms(seg['match_end_ms'])} "
+                                f"(offset {format_ms(seg['offset_ms'])}, {seg['frames']} frames)")
+
+            if "--no-add" not in sys.argv:
+                add_fingerprint(conn, video_id, fingerprint)
+
+        output = get_option("output")
+        if output:
+            tmp_path = f"{output}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            os.replace(tmp_path, output)
+            logger.info(f"📄 Report saved to {output}")
+
+    except Exception as e:
+        logger.error(f"💥 Unexpected error: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
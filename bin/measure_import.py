@@ -1,28 +1,165 @@
-import time
-import tracemalloc
-import importlib
+# measure_import.py — startup import cost of every bin/ entry point ⏱️
+#
+# Runs only the top-level import statements of each script in a fresh
+# interpreter (so nothing gets downloaded or transcribed), times them and
+# compares the result with conf/import_budget.json.
+#
+# Usage:
+#   python bin/measure_import.py                 # check all bin/*.py against the budget
+#   python bin/measure_import.py bin/mim.py      # check selected scripts
+#   python bin/measure_import.py --update        # record current timings as the budget
+#
+# Exit code 1 when any script is over budget, fails to import, has no budget
+# entry, or there is no budget file at all, so it can gate CI or a pre-commit hook.
+
+import os
 import sys
+import ast
+import json
+import glob
+import subprocess
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.abspath(os.path.join(current_dir, ".."))
+lib_path = os.path.join(repo_root, "lib/python_utils")
+
+BUDGET_PATH = os.path.join(repo_root, "conf/import_budget.json")
+RUNS = 3            # best-of-N to smooth out disk cache noise
+TOLERANCE = 0.25    # allowed growth over the recorded budget
+SLACK_MS = 30.0     # absolute allowance so tiny scripts don't flap
+
+# Executed in the child interpreter: time the imports, report JSON on stdout
+CHILD_CODE = """
+import sys, time, json
+sys.path.append(LIB_PATH)
+statements = json.loads(sys.argv[1])
+failed = []
+start = time.perf_counter()
+for stmt in statements:
+    try:
+        exec(stmt, {})
+    except BaseException as e:
+        failed.append(f"{stmt.splitlines()[0]} -> {type(e).__name__}: {e}")
+duration = time.perf_counter() - start
+try:
+    import resource
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024
+except ImportError:
+    peak_kb = None
+print(json.dumps({"ms": duration * 1000, "peak_kb": peak_kb, "modules": len(sys.modules), "failed": failed}))
+"""
+
+
+def collect_imports(script_path):
+    """Return the source of every module-level import in a script (including inside top-level try)."""
+    with open(script_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source, filename=script_path)
+
+    statements = []
+    nodes = list(tree.body)
+    while nodes:
+        node = nodes.pop(0)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+                continue
+            statements.append(ast.get_source_segment(source, node))
+        elif isinstance(node, ast.Try):
+            nodes = list(node.body) + nodes
+    return statements
+
+
+def measure_entry_point(script_path, runs=RUNS):
+    """Time the imports of one script in a fresh interpreter; best of `runs`."""
+    statements = collect_imports(script_path)
+    code = CHILD_CODE.replace("LIB_PATH", repr(lib_path))
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code, json.dumps(statements)],
+            capture_output=True, text=True, cwd=repo_root,
+        )
+        if result.returncode != 0 or not result.stdout.strip():
+            return {"ms": None, "peak_kb": None, "modules": 0, "failed": [result.stderr.strip()[-300:]]}
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        if best is None or sample["ms"] < best["ms"]:
+            best = sample
+    return best
+
+
+def load_budget():
+    if not os.path.exists(BUDGET_PATH):
+        return {}
+    with open(BUDGET_PATH, "r") as f:
+        return json.load(f)
+
+
+def main():
+    update = "--update" in sys.argv
+    targets = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not targets:
+        targets = sorted(glob.glob(os.path.join(current_dir, "*.py")))
+
+    budget = load_budget()
+    measurements = {}
+    regressions = []
+    broken = []
+    unbudgeted = []
+
+    print(f"{'entry point':<36} {'ms':>9} {'budget':>9} {'peak MB':>8} {'mods':>5}")
+    for target in targets:
+        key = os.path.relpath(os.path.abspath(target), repo_root)
+        m = measure_entry_point(target)
+        measurements[key] = m
+
+        limit = budget.get(key, {}).get("ms")
+        peak_mb = f"{m['peak_kb'] / 1024:.1f}" if m["peak_kb"] else "-"
+        ms = f"{m['ms']:.1f}" if m["ms"] is not None else "ERR"
+        flag = ""
+        if m["ms"] is None or m["failed"]:
+            # A crashed child or a failing import is a regression, whatever the timing
+            broken.append(key)
+            flag = "  ❌ import failed"
+        elif limit is None:
+            unbudgeted.append(key)
+            flag = "  ⚠️ no budget"
+        elif m["ms"] is not None and m["ms"] > limit * (1 + TOLERANCE) + SLACK_MS:
+            regressions.append(key)
+            flag = "  ❌ over budget"
+        print(f"{key:<36} {ms:>9} {(f'{limit:.1f}' if limit else '-'):>9} {peak_mb:>8} {m['modules']:>5}{flag}")
+        for failure in m["failed"]:
+            print(f"    ⚠️ {failure}")
+
+    if update:
+        budget.update({key: {"ms": round(m["ms"], 1)} for key, m in measurements.items() if m["ms"] is not None})
+        os.makedirs(os.path.dirname(BUDGET_PATH), exist_ok=True)
+        with open(BUDGET_PATH, "w") as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+        print(f"\n📝 Budget written to {BUDGET_PATH}")
+        return 0
+
+    if not budget:
+        print(f"\n❌ No budget at {BUDGET_PATH}; run with --update to record one.")
+        return 1
+
+    if broken:
+        print(f"\n❌ {len(broken)} entry point(s) failed to import: {', '.join(broken)}")
+        return 1
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} entry point(s) over their startup budget: {', '.join(regressions)}")
+        return 1
+
+    if unbudgeted:
+        print(f"\n❌ {len(unbudgeted)} entry point(s) without a budget: {', '.join(unbudgeted)}; "
+              f"run with --update to record them.")
+        return 1
+
+    print("\n✅ All entry points within their startup budget.")
+    return 0
+
 
-def measure_import(label, code_str):
-    print(f"\n=== Measuring: {label} ===")
-    
-    # Drop any existing reference
-    if 'datetime' in sys.modules:
-        del sys.modules['datetime']
-    
-    tracemalloc.start()
-    start_time = time.perf_counter()
-    exec(code_str, globals())
-    duration = time.perf_counter() - start_time
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    
-    print(f"Time: {duration * 1000:.4f} ms")
-    print(f"Memory: Current = {current / 1024:.2f} KB, Peak = {peak / 1024:.2f} KB")
-
-
-# Test: Full module import
-measure_import("import datetime", "import datetime")
-
-# Test: Selective class import
-measure_import("from datetime import datetime", "from datetime import datetime")
+if __name__ == "__main__":
+    sys.exit(main())
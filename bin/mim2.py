@@ -1,10 +1,17 @@
 
 import os
+import sys
 import json
 import logging
-from difflib import SequenceMatcher
 from datetime import datetime
 
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from corpus_index import build_index, query_index, all_pairs
+
 # === Setup Logging ===
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -12,14 +19,32 @@ logger = logging.getLogger(__name__)
 # === Paths ===
 article_dir = "sources/mimesis/20250527-232733/articles/20250527-232733"
 transcript_path = "data/Tim_Ballard_20250526_watermarked.minute.json"
+ARTICLE_NAMES = ["deseret", "foxnews", "presidency"]
+TOP_K = 10  # neighbours reported per document; pairs with no shared n-grams are not listed
 
 # === Utility: Load article texts ===
-def load_articles():
+def load_articles(directory=article_dir, names=ARTICLE_NAMES):
+    """
+    Loads articles from an article directory.
+
+    With names, the first file containing each name is loaded. With
+    names=None every <slug>.txt article is loaded (skipping -italics/-html),
+    e.g. a crawl_sources.py output directory.
+    """
     articles = {}
-    for name in ["deseret", "foxnews", "presidency"]:
-        match = next((f for f in os.listdir(article_dir) if name in f), None)
+    if names is None:
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(".txt") or file_name.endswith(("-italics.txt", "-html.txt")):
+                continue
+            with open(os.path.join(directory, file_name), "r", encoding="utf-8") as f:
+                articles[file_name[:-len(".txt")]] = f.read()
+        logger.info(f"Loaded {len(articles)} articles from {directory}")
+        return articles
+
+    for name in names:
+        match = next((f for f in os.listdir(directory) if name in f), None)
         if match:
-            path = os.path.join(article_dir, match)
+            path = os.path.join(directory, match)
             with open(path, "r", encoding="utf-8") as f:
                 content = f.read()
                 articles[name] = content
@@ -48,31 +73,25 @@ def load_transcript():
             logger.error("Unexpected transcript format.")
             return ""
 
-# === Utility: Compare two texts ===
-def compare_texts(t1, t2):
-    return SequenceMatcher(None, t1, t2).ratio()
-
 # === Main Routine ===
 def main():
     logger.info("Starting document similarity analysis...")
 
-    articles = load_articles()
+    # Optional argument: an article directory (e.g. from crawl_sources.py) to load in full
+    articles = load_articles(sys.argv[1], names=None) if len(sys.argv) > 1 else load_articles()
     transcript = load_transcript()
 
+    index = build_index(articles)
+
     # === Article-to-Article comparisons ===
     logger.info("\n--- Article to Article Similarity ---")
-    keys = list(articles.keys())
-    for i in range(len(keys)):
-        for j in range(i+1, len(keys)):
-            k1, k2 = keys[i], keys[j]
-            sim = compare_texts(articles[k1], articles[k2])
-            logger.info(f"{k1} ↔ {k2}: {sim:.3f}")
+    for pair in all_pairs(index, top_k=TOP_K):
+        logger.info(f"{pair['a']} ↔ {pair['b']}: {pair['score']:.3f}")
 
     # === Transcript-to-Article comparisons ===
     logger.info("\n--- Transcript to Article Similarity ---")
-    for name, content in articles.items():
-        sim = compare_texts(transcript, content)
-        logger.info(f"Transcript ↔ {name}: {sim:.3f}")
+    for match in query_index(index, transcript, top_k=TOP_K):
+        logger.info(f"Transcript ↔ {match['doc_id']}: {match['score']:.3f}")
 
     logger.info("Comparison complete.")
 
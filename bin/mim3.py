@@ -3,7 +3,6 @@ import os
 import sys
 import json
 import logging
-from difflib import SequenceMatcher
 from datetime import datetime
 
 # === Load from local utils ===
@@ -16,6 +15,8 @@ from transcription_utils import (
     whisper_transcribe_video_by_minute,
 )
 
+from corpus_index import build_index, query_index, all_pairs
+
 from utilities1 import (
     initialize_logging,
     load_app_config,
@@ -64,10 +65,6 @@ def load_transcript(video_path, logger):
             logger.error("Unexpected transcript format.")
             return ""
 
-# === Helper: Compare two texts ===
-def compare_texts(t1, t2):
-    return SequenceMatcher(None, t1, t2).ratio()
-
 # === MAIN EXECUTION ===
 if __name__ == "__main__":
     try:
@@ -91,18 +88,15 @@ if __name__ == "__main__":
         articles = load_articles(article_dir, logger)
         transcript = load_transcript(input_video_path, logger)
 
+        index = build_index(articles)
+
         logger.info("\n--- Article to Article Similarity ---")
-        keys = list(articles.keys())
-        for i in range(len(keys)):
-            for j in range(i + 1, len(keys)):
-                k1, k2 = keys[i], keys[j]
-                sim = compare_texts(articles[k1], articles[k2])
-                logger.info(f"{k1} ↔ {k2}: {sim:.3f}")
+        for pair in all_pairs(index, top_k=10):
+            logger.info(f"{pair['a']} ↔ {pair['b']}: {pair['score']:.3f}")
 
         logger.info("\n--- Transcript to Article Similarity ---")
-        for name, content in articles.items():
-            sim = compare_texts(transcript, content)
-            logger.info(f"Transcript ↔ {name}: {sim:.3f}")
+        for match in query_index(index, transcript, top_k=10):
+            logger.info(f"Transcript ↔ {match['doc_id']}: {match['score']:.3f}")
 
         logger.info("Comparison complete.")
 
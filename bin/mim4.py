@@ -3,7 +3,7 @@ import os
 import sys
 import json
 import logging
-from difflib import SequenceMatcher
+import traceback
 
 # === Load from local utils ===
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,22 +11,10 @@ lib_path = os.path.join(current_dir, "../lib/python_utils")
 sys.path.append(lib_path)
 
 from utilities1 import initialize_logging, load_app_config
+from text_similarity import compare_texts
 
-# === Translation dependencies ===
-from transformers import MarianMTModel, MarianTokenizer
-
-# === Load translation model ===
-model_name = "Helsinki-NLP/opus-mt-es-en"
-tokenizer = MarianTokenizer.from_pretrained(model_name)
-model = MarianMTModel.from_pretrained(model_name)
-
-# === Helper: Translate a text chunk ===
-def translate_text(text):
-    if not text.strip():
-        return ""
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-    translated = model.generate(**inputs)
-    return tokenizer.decode(translated[0], skip_special_tokens=True)
+from translation import translate_chunks, model_for_language
+from translation_memory import open_memory, DEFAULT_TM_PATH
 
 # === Helper: Load articles ===
 def load_articles(article_dir, logger):
@@ -44,11 +32,36 @@ def load_articles(article_dir, logger):
             logger.warning(f"Missing article for {name}")
     return articles
 
+# === Helper: Language recorded by the detection stage ===
+def load_language(base, logger, default="es"):
+    metadata_path = os.path.join("metadata", f"{base}.json")
+    if os.path.exists(metadata_path):
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            language = json.load(f).get("language", {}).get("language")
+        if language:
+            logger.info(f"Transcript language from metadata: {language}")
+            return language
+    logger.warning(f"No detected language for {base}; assuming '{default}'")
+    return default
+
+# === Helper: Minute keys ("0-60s", "60-120s", ...) in playback order ===
+def by_start_second(item):
+    return int(item[0].split("-")[0])
+
 # === Helper: Load and translate transcript ===
 def load_translated_transcript(video_path, logger):
     base = os.path.splitext(os.path.basename(video_path))[0]
     transcript_path = f"data/{base}.minute.json"
     output_txt_path = f"data/{base}.translated.en.txt"
+    whisper_translation_path = f"data/{base}.translated.minute.json"
+
+    # English already produced by Whisper's translate task (bin/transcribe_translate.py)
+    if os.path.exists(whisper_translation_path):
+        with open(whisper_translation_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        full_text = " ".join(str(v) for k, v in sorted(data.items(), key=by_start_second))
+        logger.info(f"Using Whisper translation from {whisper_translation_path} ({len(full_text)} characters)")
+        return full_text
 
     if not os.path.exists(transcript_path):
         logger.error(f"Transcript not found at {transcript_path}")
@@ -58,11 +71,32 @@ def load_translated_transcript(video_path, logger):
         data = json.load(f)
 
     if isinstance(data, dict):
-        chunks = [
-            translate_text(v.get("text", "") if isinstance(v, dict) else str(v))
-            for k, v in sorted(data.items())
-        ]
+        texts = [v.get("text", "") if isinstance(v, dict) else str(v) for k, v in sorted(data.items(), key=by_start_second)]
+        language = load_language(base, logger)
+        model_name = model_for_language(language)
+        if model_name is None:
+            full_text = " ".join(texts)
+            if language == "en":
+                logger.info(f"Transcript is already English ({len(full_text)} characters); no translation needed")
+            else:
+                logger.warning(f"No translation model for '{language}'; comparing the untranslated transcript")
+            return full_text
+
+        memory = open_memory(DEFAULT_TM_PATH)
+        stats = {}
+        try:
+            chunks = translate_chunks(texts, model_name=model_name, memory=memory, stats=stats)
+        except Exception:
+            logger.error(f"Failed to translate transcript with {model_name}")
+            logger.debug(traceback.format_exc())
+            return ""
+        finally:
+            memory.close()
         full_text = " ".join(chunks)
+        reused = stats.get("memory_exact", 0) + stats.get("memory_fuzzy", 0)
+        logger.info(f"Translation memory reused {reused} of {stats.get('sentences', 0)} sentences "
+                    f"({stats.get('memory_exact', 0)} exact, {stats.get('memory_fuzzy', 0)} fuzzy); "
+                    f"{stats.get('translated', 0)} sent to the model")
 
         with open(output_txt_path, "w", encoding="utf-8") as out_file:
             out_file.write(full_text)
@@ -75,10 +109,6 @@ def load_translated_transcript(video_path, logger):
         logger.error("Unexpected transcript format.")
         return ""
 
-# === Helper: Compare two texts ===
-def compare_texts(t1, t2):
-    return SequenceMatcher(None, t1, t2).ratio()
-
 # === MAIN EXECUTION ===
 if __name__ == "__main__":
     try:
@@ -0,0 +1,230 @@
+# profile_startup.py — per-module import profile for every bin/ entry point 🔬
+#
+# Each script is run in no-op mode: only its module-level imports execute, in a
+# fresh interpreter with `-X importtime`. For every script we record
+#   - total import time and peak RSS,
+#   - which import statement pulled in which heavy package (and how long it took),
+#   - the full import tree (pruned to modules above --min-ms),
+# then write a JSON report and diff it against a stored baseline.
+#
+# Usage:
+#   python bin/profile_startup.py                         # profile all bin/*.py, diff vs baseline
+#   python bin/profile_startup.py bin/compare_sources.py  # profile selected scripts
+#   python bin/profile_startup.py --save-baseline         # store this run as the new baseline
+#   Options: --report=<path> --baseline=<path> --heavy-ms=<ms> --min-ms=<ms>
+
+import os
+import sys
+import json
+import glob
+import subprocess
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from measure_import import collect_imports, CHILD_CODE, lib_path, repo_root
+
+DEFAULT_REPORT = os.path.join(repo_root, "logs/startup_profile.json")
+DEFAULT_BASELINE = os.path.join(repo_root, "conf/startup_baseline.json")
+HEAVY_MS = 50.0   # a package costing more than this is called out per statement
+MIN_MS = 1.0      # tree nodes cheaper than this are dropped from the report
+STMT_MARKER = "## profile_startup statement "
+
+# Same harness as measure_import, plus a stderr marker before each statement
+# so -X importtime lines can be attributed to the statement that caused them.
+PROFILE_CODE = CHILD_CODE.replace(
+    "for stmt in statements:\n",
+    "for i, stmt in enumerate(statements):\n"
+    f"    print({STMT_MARKER!r} + str(i), file=sys.stderr, flush=True)\n",
+)
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def parse_importtime(stderr):
+    """
+    Turns `-X importtime` output into trees grouped by statement.
+
+    importtime prints children before their parent, indented two spaces per
+    level, so pending nodes at depth+1 become the children of the next node
+    seen at depth.
+
+    Returns:
+        dict: statement index (-1 = interpreter startup) -> list of root nodes.
+    """
+    groups = {}
+    current = -1
+    pending = {}
+
+    def flush():
+        if pending.get(0):
+            groups.setdefault(current, []).extend(pending[0])
+        pending.clear()
+
+    for line in stderr.splitlines():
+        if line.startswith(STMT_MARKER):
+            flush()
+            current = int(line[len(STMT_MARKER):])
+            continue
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # column header
+        raw_name = parts[2]
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        node = {
+            "module": raw_name.strip(),
+            "self_ms": self_us / 1000,
+            "cumulative_ms": cumulative_us / 1000,
+            "children": pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    flush()
+    return groups
+
+
+def prune(node, min_ms):
+    """Drop subtrees cheaper than min_ms to keep the report readable."""
+    node["children"] = [prune(child, min_ms) for child in node["children"] if child["cumulative_ms"] >= min_ms]
+    return node
+
+
+def walk(nodes):
+    for node in nodes:
+        yield node
+        yield from walk(node["children"])
+
+
+def profile_entry_point(script_path, heavy_ms=HEAVY_MS, min_ms=MIN_MS):
+    """Profile one script's module-level imports."""
+    statements = collect_imports(script_path)
+    code = PROFILE_CODE.replace("LIB_PATH", repr(lib_path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, json.dumps(statements)],
+        capture_output=True, text=True, cwd=repo_root,
+    )
+    try:
+        summary = json.loads(result.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {"error": result.stderr.strip()[-500:]}
+
+    groups = parse_importtime(result.stderr)
+    by_statement = []
+    for i, stmt in enumerate(statements):
+        roots = groups.get(i, [])
+        heavy = sorted(
+            ({"module": n["module"], "cumulative_ms": round(n["cumulative_ms"], 2)}
+             for n in walk(roots)
+             if n["cumulative_ms"] >= heavy_ms and "." not in n["module"]),
+            key=lambda n: -n["cumulative_ms"],
+        )
+        by_statement.append({
+            "statement": stmt.splitlines()[0],
+            "cumulative_ms": round(sum(n["cumulative_ms"] for n in roots), 2),
+            "heavy": heavy,
+            "tree": [prune(n, min_ms) for n in roots if n["cumulative_ms"] >= min_ms],
+        })
+
+    modules = {}
+    for roots in groups.values():
+        for node in walk(roots):
+            modules[node["module"]] = round(node["cumulative_ms"], 2)
+
+    return {
+        "total_ms": round(summary["ms"], 2),
+        "peak_kb": summary["peak_kb"],
+        "module_count": summary["modules"],
+        "failed": summary["failed"],
+        "statements": by_statement,
+        "modules": modules,
+    }
+
+
+def diff_reports(baseline, report, heavy_ms=HEAVY_MS):
+    """Compare two reports: total time, peak memory and heavy packages per script."""
+    diff = {}
+    for script, current in report["scripts"].items():
+        before = baseline.get("scripts", {}).get(script)
+        if not before or "total_ms" not in before or "total_ms" not in current:
+            diff[script] = {"status": "new" if not before else "error"}
+            continue
+
+        heavy_now = {m for m, ms in current["modules"].items() if ms >= heavy_ms and "." not in m}
+        heavy_before = {m for m, ms in before["modules"].items() if ms >= heavy_ms and "." not in m}
+        diff[script] = {
+            "total_ms_delta": round(current["total_ms"] - before["total_ms"], 2),
+            "peak_kb_delta": (current["peak_kb"] or 0) - (before["peak_kb"] or 0),
+            "new_heavy": sorted(heavy_now - heavy_before),
+            "dropped_heavy": sorted(heavy_before - heavy_now),
+        }
+    return diff
+
+
+def main():
+    report_path = get_option("report", DEFAULT_REPORT)
+    baseline_path = get_option("baseline", DEFAULT_BASELINE)
+    heavy_ms = float(get_option("heavy-ms", HEAVY_MS))
+    min_ms = float(get_option("min-ms", MIN_MS))
+
+    targets = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not targets:
+        targets = sorted(glob.glob(os.path.join(current_dir, "*.py")))
+
+    report = {"created": datetime.now().isoformat(), "python": sys.version.split()[0], "scripts": {}}
+    for target in targets:
+        key = os.path.relpath(os.path.abspath(target), repo_root)
+        print(f"🔬 Profiling {key}...")
+        profile = profile_entry_point(target, heavy_ms, min_ms)
+        report["scripts"][key] = profile
+
+        if "error" in profile:
+            print(f"    ❌ {profile['error']}")
+            continue
+        print(f"    {profile['total_ms']:.1f} ms, {profile['module_count']} modules")
+        for stmt in profile["statements"]:
+            if stmt["heavy"]:
+                pulled = ", ".join(f"{h['module']} {h['cumulative_ms']:.0f}ms" for h in stmt["heavy"][:5])
+                print(f"    {stmt['statement'][:60]:<60} → {pulled}")
+
+    if os.path.exists(baseline_path):
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)
+        report["diff"] = diff_reports(baseline, report, heavy_ms)
+        print(f"\n=== Diff vs {os.path.relpath(baseline_path, repo_root)} ===")
+        for script, d in report["diff"].items():
+            if "total_ms_delta" not in d:
+                print(f"{script:<36} {d['status']}")
+                continue
+            extra = ""
+            if d["new_heavy"]:
+                extra += f"  ➕ {', '.join(d['new_heavy'])}"
+            if d["dropped_heavy"]:
+                extra += f"  ➖ {', '.join(d['dropped_heavy'])}"
+            print(f"{script:<36} {d['total_ms_delta']:+9.1f} ms {d['peak_kb_delta'] / 1024:+7.1f} MB{extra}")
+
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {report_path}")
+
+    if "--save-baseline" in sys.argv:
+        report.pop("diff", None)
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Baseline saved to {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,6 @@
 import sys
 import os
 import logging
-import requests
-import subprocess
-import re
-from bs4 import BeautifulSoup
 from datetime import datetime as dt
 import sys
 
@@ -26,15 +22,13 @@ from utilities1 import (
     create_output_directory,
     create_subdir
 )
+from podcast_stream import stream_transcribe
+from tts_engine import synthesize_long_text, DEFAULT_TTS_MODEL, DEFAULT_WORKERS
 
 print(">>> [POST-utilities1] dt type:", type(dt))
 print(">>> [POST-utilities1] sys.modules['datetime']:", sys.modules.get('datetime'))
 
-import whisper
-print(">>> [POST-whisper] dt type:", type(dt))
 
-from TTS.api import TTS
-print(">>> [POST-TTS] dt type:", type(dt))
 
 # === Init logging ===
 logger = initialize_logging()
@@ -45,86 +39,53 @@ logger.info(f"[🧠 DEBUG] sys.modules['datetime']: {sys.modules.get('datetime')
 # === Config ===
 config = load_app_config()
 
-# === Podcast Utilities (inline for now) ===
-
-def download_podcast_audio(url: str, output_path="podcast.mp3") -> str:
-    try:
-        subprocess.run([
-            "yt-dlp",
-            "-x", "--audio-format", "mp3",
-            "-o", output_path,
-            url
-        ], check=True)
-        if os.path.exists(output_path):
-            return output_path
-    except Exception as e:
-        logger.warning(f"[yt-dlp] Failed: {e}")
-
-    try:
-        logger.info("Falling back to scraping for .mp3...")
-        res = requests.get(url)
-        mp3_links = re.findall(r'https?://[^\"\']+\.mp3', res.text)
-        if not mp3_links:
-            raise Exception("No .mp3 found")
-        mp3_url = mp3_links[0]
-
-        with requests.get(mp3_url, stream=True) as r:
-            with open(output_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        return output_path
-    except Exception as e:
-        logger.error(f"Scraping failed: {e}")
-        raise RuntimeError(f"Could not retrieve podcast audio.")
-
-def transcribe_audio_file(audio_path: str) -> str:
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
-    return result["text"]
-
-def synthesize_text_to_speech(text: str, output_path: str):
-    tts = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False)
-    tts.tts_to_file(text=text, file_path=output_path)
-
 # === Main Entry Point ===
+# TTS workers are spawned processes that re-import this script, so the
+# pipeline only runs under the __main__ guard.
 
-if len(sys.argv) < 2:
-    print("Usage: python transcribe_podcast.py <podcast_url>")
-    sys.exit(1)
-
-podcast_url = sys.argv[1]
-logger.info(f"🎧 Processing podcast: {podcast_url}")
-
-try:
-    logger.info(f"[🧠 PRE-TIMESTAMP] dt type: {type(dt)}")
-    logger.info(f"[🧠 PRE-TIMESTAMP] dt repr: {repr(dt)}")
-    logger.info(f"[🧠 PRE-TIMESTAMP] sys.modules['datetime']: {sys.modules.get('datetime')}")
-
-    timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
-    logger.info(f"[⏰ TIMESTAMP] {timestamp}")
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python transcribe_podcast.py <podcast_url>")
+        sys.exit(1)
 
-    output_dir = create_output_directory("podcasts")
-    run_dir = create_subdir(output_dir, f"run_{timestamp}")
+    podcast_url = sys.argv[1]
+    logger.info(f"🎧 Processing podcast: {podcast_url}")
 
-    audio_path = os.path.join(run_dir, "podcast.mp3")
-    tts_path = os.path.join(run_dir, "speech.wav")
-    transcript_path = os.path.join(run_dir, "transcript.txt")
-
-    # Step 1: Download
-    audio_file = download_podcast_audio(podcast_url, audio_path)
-    logger.info(f"Audio saved to: {audio_file}")
+    try:
+        logger.info(f"[🧠 PRE-TIMESTAMP] dt type: {type(dt)}")
+        logger.info(f"[🧠 PRE-TIMESTAMP] dt repr: {repr(dt)}")
+        logger.info(f"[🧠 PRE-TIMESTAMP] sys.modules['datetime']: {sys.modules.get('datetime')}")
+
+        timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
+        logger.info(f"[⏰ TIMESTAMP] {timestamp}")
+
+        output_dir = create_output_directory("podcasts")
+        run_dir = create_subdir(output_dir, f"run_{timestamp}")
+
+        tts_path = os.path.join(run_dir, "speech.wav")
+
+        # Step 1+2: Download and transcribe concurrently (transcript.txt grows as windows complete)
+        result = stream_transcribe(podcast_url, run_dir)
+        transcript = result["text"]
+        logger.info(f"Audio saved to: {result['audio_path']}")
+        logger.info(f"Transcription written to: {result['transcript_path']} "
+                    f"(first text after {result['first_text_seconds'] or 0:.1f}s)")
+
+        # Step 3: TTS
+        tts_config = config.get("tts", {})
+        tts = synthesize_long_text(
+            transcript, tts_path,
+            model_name=tts_config.get("model", DEFAULT_TTS_MODEL),
+            workers=tts_config.get("workers", DEFAULT_WORKERS),
+        )
+        logger.info(f"Speech audio saved to: {tts_path} "
+                    f"({tts['synthesized']} sentences synthesized, {tts['cached']} from cache)")
 
-    # Step 2: Transcribe
-    transcript = transcribe_audio_file(audio_file)
-    with open(transcript_path, "w") as f:
-        f.write(transcript)
-    logger.info(f"Transcription written to: {transcript_path}")
+    except Exception as e:
+        logger.error(f"💥 Error during podcast processing: {e}")
+        logger.debug("[DEBUG] Exception traceback:", exc_info=True)
+        sys.exit(1)
 
-    # Step 3: TTS
-    synthesize_text_to_speech(transcript, tts_path)
-    logger.info(f"Speech audio saved to: {tts_path}")
 
-except Exception as e:
-    logger.error(f"💥 Error during podcast processing: {e}")
-    logger.debug("[DEBUG] Exception traceback:", exc_info=True)
-    sys.exit(1)
+if __name__ == "__main__":
+    main()
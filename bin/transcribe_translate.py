@@ -0,0 +1,84 @@
+# transcribe_translate.py — Spanish (or any language) transcript + English translation in one pass 🗣️🌐
+#
+# Runs Whisper once over the audio and decodes every window twice from the
+# same encoder output (task="transcribe" and task="translate"), so the English
+# text gets Whisper timestamps and no separate MarianMT pass is needed.
+#
+# Writes to data/ (or --output):
+#   <base>.minute.json              source-language minute transcript
+#   <base>.translated.minute.json   English minute transcript (mim4.py uses it when present)
+#   <base>.translated.en.txt        English full text
+#   <base>.segments.json            all timestamped segments, both languages
+#   <base>.srt / <base>.en.srt      subtitles in both languages
+#
+# Usage:
+#   python bin/transcribe_translate.py <video_or_audio>
+#   Options: --model=base --language=es --output=data --separate (two full transcribe() passes)
+
+import os
+import sys
+import json
+import traceback
+
+# === Load from local utils ===
+current_dir = os.path.dirname(os.path.abspath(__file__))
+lib_path = os.path.join(current_dir, "../lib/python_utils")
+sys.path.append(lib_path)
+
+from utilities1 import initialize_logging
+from transcription_utils import whisper_transcribe_and_translate, segments_by_minute, write_srt
+
+
+def get_option(name, default=None):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main():
+    logger = initialize_logging()
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not paths:
+        print("Usage: python transcribe_translate.py <video_or_audio> [--model=base] [--language=es] [--output=data]")
+        sys.exit(1)
+
+    try:
+        media_path = paths[0]
+        output_dir = get_option("output", "data")
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, os.path.splitext(os.path.basename(media_path))[0])
+
+        result = whisper_transcribe_and_translate(
+            media_path,
+            model_name=get_option("model", "base"),
+            language=get_option("language"),
+            shared_encoder="--separate" not in sys.argv,
+        )
+
+        outputs = {
+            f"{base}.minute.json": segments_by_minute(result["segments"]),
+            f"{base}.translated.minute.json": segments_by_minute(result["translation"]),
+            f"{base}.segments.json": result,
+        }
+        for path, data in outputs.items():
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            logger.info(f"📝 Saved {path}")
+
+        with open(f"{base}.translated.en.txt", "w", encoding="utf-8") as f:
+            f.write(result["translated_text"])
+        write_srt(result["segments"], f"{base}.srt")
+        write_srt(result["translation"], f"{base}.en.srt")
+
+        logger.info(f"✅ {result['language']} → en: {len(result['segments'])} source segments, "
+                    f"{len(result['translation'])} English segments")
+
+    except Exception as e:
+        logger.error(f"💥 Unexpected error: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
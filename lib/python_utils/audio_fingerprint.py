@@ -0,0 +1,402 @@
+# === AUDIO FINGERPRINT INDEX ===
+# --------------------------------------------------
+# Aligns media files that share audio without going through ASR, using
+# spectrogram landmarks (peak pairs).
+#
+# - Audio is decoded by ffmpeg to 8 kHz mono. A log-magnitude spectrogram
+#   is computed with NumPy (512-sample Hann windows, 32 ms hop).
+# - Peaks are spectrogram cells that are the maximum of their
+#   PEAK_NEIGHBORHOOD and stand out from the file's median level.
+# - The spectrogram is computed and searched BLOCK_FRAMES at a time, each
+#   block extended by the peak neighbourhood on both sides, so every block
+#   finds the same local maxima as the whole file would. The median level
+#   comes from a histogram accumulated over the blocks (exact to
+#   DB_RESOLUTION). Memory stays at a few blocks instead of ~1.25 GB for an
+#   hour of audio.
+# - Each peak is paired with the next FAN_OUT peaks up to MAX_DT frames
+#   later. A pair is hashed as (f1, f2, dt) into 24 bits and stored at the
+#   anchor's time. Peaks and their relative timing survive re-encoding,
+#   volume changes and added intros, and do not depend on transcription
+#   errors.
+# - Two files share audio where many hash matches agree on one time
+#   offset. Runs of such matches without long gaps are reported as regions,
+#   with their position on both timelines in milliseconds. A run counts
+#   only with MIN_HITS distinct anchor times spanning MIN_REGION_MS, so a
+#   burst of repeated hashes at a single instant is not a region.
+# - Hashes can be kept in a SQLite inverted index (hash -> media, time) to
+#   find every stored file that shares audio with a new one.
+#
+# Landmarks match the same recording, re-cut or re-encoded. A separate
+# performance of the same script (e.g. re-recorded years later) has
+# different peaks, so it shows up as "no shared audio". That result is
+# itself the signal that tells reused audio apart from a re-recording.
+#
+# Requires: numpy, ffmpeg
+# --------------------------------------------------
+#
+# Function: decode_audio(path: str, sample_rate: int) -> np.ndarray
+#   Mono float32 samples of any media file.
+#
+# Function: fingerprint_audio(source: str | np.ndarray) -> dict
+#   {"path", "duration_ms", "hop_ms", "hashes": np.ndarray, "times": np.ndarray}.
+#
+# Function: match_fingerprints(a: dict, b: dict, min_hits: int) -> list[dict]
+#   Regions of shared audio between two fingerprints, with offsets.
+#
+# Function: compare_media(path_a: str, path_b: str, min_hits: int) -> dict
+#   Fingerprints two files and matches them.
+#
+# Function: open_audio_index(db_path: str) -> sqlite3.Connection
+#   Opens (and creates if needed) the inverted hash index.
+#
+# Function: add_audio(conn, path: str, media_id: str) -> dict
+#   Fingerprints a file and stores it (replacing an earlier version).
+#
+# Function: find_audio_matches(conn, fingerprint: dict, min_hits: int, exclude: set) -> list[dict]
+#   Stored files sharing audio with a fingerprint, with their regions.
+# --------------------------------------------------
+
+import os
+import time
+import sqlite3
+import logging
+import subprocess
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "./cache/audio_fingerprints.sqlite3"
+SAMPLE_RATE = 8000
+N_FFT = 512
+HOP = 256                      # 32 ms at 8 kHz
+PEAK_NEIGHBORHOOD = (15, 11)   # (frequency bins, frames) each side
+MIN_PEAK_DB = 10.0             # above the file's median level
+BLOCK_FRAMES = 4096            # spectrogram frames (~2 min) computed at a time
+DB_RESOLUTION = 0.01           # histogram bin width for the median level
+SILENCE_DB = -120.0            # 20 * log10(1e-6): level of a silent cell
+FAN_OUT = 5
+MAX_DT = 63                    # frames (~2 s); fits in 6 bits
+MIN_HITS = 20                  # distinct anchor times with agreeing matches needed for a region
+MIN_REGION_MS = 2000           # shorter runs are chance alignments
+MAX_GAP_MS = 3000              # longer gaps split a region
+MAX_HASH_OCCURRENCES = 50      # hashes more frequent than this in one file are ignored
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    media_id    TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    hashes      INTEGER NOT NULL,
+    created     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS audio_hashes (
+    hash     INTEGER NOT NULL,
+    media_id TEXT NOT NULL,
+    t        INTEGER NOT NULL          -- anchor frame (HOP samples)
+);
+CREATE INDEX IF NOT EXISTS audio_hashes_hash ON audio_hashes (hash);
+CREATE INDEX IF NOT EXISTS audio_hashes_media ON audio_hashes (media_id);
+"""
+
+
+def decode_audio(path, sample_rate=SAMPLE_RATE):
+    """Decodes a media file's audio to mono float32 at sample_rate."""
+    import numpy as np
+
+    out = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-vn",
+         "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"],
+        capture_output=True, check=True,
+    ).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def _spectrogram(samples):
+    """Log-magnitude spectrogram, shape (frames, N_FFT // 2 + 1)."""
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+    frames = sliding_window_view(samples, N_FFT)[::HOP]
+    magnitude = np.abs(np.fft.rfft(frames * np.hanning(N_FFT).astype(np.float32), axis=1))
+    return 20 * np.log10(magnitude + 1e-6)
+
+
+def _max_filter(values, size, axis):
+    """Running maximum over 2*size+1 cells along one axis (same shape as values)."""
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (size, size)
+    padded = np.pad(values, pad, constant_values=-np.inf)
+    return sliding_window_view(padded, 2 * size + 1, axis=axis).max(axis=-1)
+
+
+def _peaks(samples):
+    """
+    (frame, bin) of spectrogram local maxima that stand out from the file's
+    median level, computed BLOCK_FRAMES at a time.
+    """
+    import numpy as np
+
+    freq_size, time_size = PEAK_NEIGHBORHOOD
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+    n_frames = 1 + (len(samples) - N_FFT) // HOP
+    n_levels = int((100 - SILENCE_DB) / DB_RESOLUTION)  # -120 .. +100 dB; cells peak near +48 dB
+    histogram = np.zeros(n_levels, np.int64)
+    times, bins, values = [], [], []
+
+    for first in range(0, n_frames, BLOCK_FRAMES):
+        last = min(first + BLOCK_FRAMES, n_frames)
+        # Extend by the time neighbourhood so the block's own frames see all their neighbours
+        lo, hi = max(0, first - time_size), min(n_frames, last + time_size)
+        spectrogram = _spectrogram(samples[lo * HOP:(hi - 1) * HOP + N_FFT])
+        local_max = _max_filter(_max_filter(spectrogram, freq_size, axis=1), time_size, axis=0)
+        core = spectrogram[first - lo:last - lo]
+
+        levels = ((core - SILENCE_DB) / DB_RESOLUTION).astype(np.int64)
+        histogram += np.bincount(np.clip(levels, 0, n_levels - 1).ravel(), minlength=n_levels)
+        # Silent plateaus are all local maxima but never above the floor; skip them here
+        block_times, block_bins = np.nonzero((core == local_max[first - lo:last - lo]) & (core > SILENCE_DB))
+        times.append(block_times + first)
+        bins.append(block_bins)
+        values.append(core[block_times, block_bins])
+
+    median_level = np.searchsorted(np.cumsum(histogram), histogram.sum() / 2)
+    floor = SILENCE_DB + (median_level + 0.5) * DB_RESOLUTION + MIN_PEAK_DB
+    times, bins, values = np.concatenate(times), np.concatenate(bins), np.concatenate(values)
+    keep = values > floor
+    return times[keep], bins[keep]
+
+
+def fingerprint_audio(source):
+    """
+    Peak-pair fingerprint of a media file (path) or of samples decoded at
+    SAMPLE_RATE.
+
+    Returns:
+        dict: {"path", "duration_ms", "hop_ms", "hashes": int64 array,
+               "times": int64 array of anchor frames}
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    path = source if isinstance(source, str) else None
+    samples = decode_audio(source) if path else np.asarray(source, dtype=np.float32)
+
+    times, bins = _peaks(samples)
+    hashes, anchors = [], []
+    for k in range(1, FAN_OUT + 1):
+        dt = times[k:] - times[:-k]
+        keep = (dt > 0) & (dt <= MAX_DT)
+        hashes.append((bins[:-k][keep] << 15) | (bins[k:][keep] << 6) | dt[keep])
+        anchors.append(times[:-k][keep])
+    hashes = np.concatenate(hashes).astype(np.int64) if len(times) > 1 else np.zeros(0, np.int64)
+    anchors = np.concatenate(anchors).astype(np.int64) if len(times) > 1 else np.zeros(0, np.int64)
+
+    hop_ms = 1000 * HOP / SAMPLE_RATE
+    duration_ms = int(len(samples) * 1000 / SAMPLE_RATE)
+    logger.info(f"🔊 Fingerprinted {os.path.basename(path) if path else 'audio'}: {len(times)} peaks, "
+                f"{len(hashes)} hashes over {duration_ms / 1000:.0f}s in {time.perf_counter() - start:.1f}s")
+    return {"path": path, "duration_ms": duration_ms, "hop_ms": hop_ms, "hashes": hashes, "times": anchors}
+
+
+def _pairs(a, b):
+    """(times in a, times in b) of every hash shared by two fingerprints, minus over-frequent hashes."""
+    import numpy as np
+
+    order = np.argsort(b["hashes"], kind="stable")
+    b_hashes, b_times = b["hashes"][order], b["times"][order]
+    left = np.searchsorted(b_hashes, a["hashes"], side="left")
+    right = np.searchsorted(b_hashes, a["hashes"], side="right")
+    counts = right - left
+    counts[counts > MAX_HASH_OCCURRENCES] = 0
+
+    a_index = np.repeat(np.arange(len(a["hashes"])), counts)
+    starts = np.repeat(left - np.cumsum(counts) + counts, counts)
+    b_index = starts + np.arange(counts.sum())
+    return a["times"][a_index], b_times[b_index]
+
+
+def _regions(a_times, b_times, hop_ms, min_hits):
+    """Groups matches that agree on an offset (±1 frame) and are close in time into regions."""
+    import numpy as np
+
+    if len(a_times) < min_hits:
+        return []
+    offsets = b_times - a_times
+    values, counts = np.unique(offsets, return_counts=True)
+    # Offsets +-1 frame apart are the same alignment split by frame jitter
+    next_adjacent = np.diff(values, append=values[-1]) == 1
+    previous_adjacent = np.diff(values, prepend=values[0]) == 1
+    smoothed = counts + np.pad(counts[1:], (0, 1)) * next_adjacent + np.pad(counts[:-1], (1, 0)) * previous_adjacent
+
+    regions = []
+    used = np.zeros(len(offsets), dtype=bool)
+    max_gap = MAX_GAP_MS / hop_ms
+    for index in np.argsort(-smoothed):
+        if smoothed[index] < min_hits:
+            break
+        selected = np.nonzero((np.abs(offsets - values[index]) <= 1) & ~used)[0]
+        if len(np.unique(a_times[selected])) < min_hits:
+            continue
+        used[selected] = True
+        selected = selected[np.argsort(a_times[selected], kind="stable")]
+        splits = np.nonzero(np.diff(a_times[selected]) > max_gap)[0] + 1
+        for run in np.split(selected, splits):
+            anchors = len(np.unique(a_times[run]))
+            span_ms = (a_times[run].max() - a_times[run].min()) * hop_ms
+            if anchors < min_hits or span_ms < MIN_REGION_MS:
+                continue
+            regions.append({
+                "offset_ms": int(round(float(np.median(offsets[run])) * hop_ms)),
+                "a_start_ms": int(a_times[run].min() * hop_ms),
+                "a_end_ms": int(a_times[run].max() * hop_ms),
+                "b_start_ms": int(b_times[run].min() * hop_ms),
+                "b_end_ms": int(b_times[run].max() * hop_ms),
+                "hits": int(len(run)),
+                "anchors": int(anchors),
+            })
+    return sorted(regions, key=lambda region: region["a_start_ms"])
+
+
+def match_fingerprints(a, b, min_hits=MIN_HITS):
+    """
+    Regions of audio shared by two fingerprints.
+
+    Returns:
+        list[dict]: Regions in order of their position in a:
+        {"offset_ms" (time in b - time in a), "a_start_ms", "a_end_ms",
+         "b_start_ms", "b_end_ms", "hits", "anchors" (distinct times in a)}
+    """
+    a_times, b_times = _pairs(a, b)
+    return _regions(a_times, b_times, a["hop_ms"], min_hits)
+
+
+def compare_media(path_a, path_b, min_hits=MIN_HITS):
+    """
+    Fingerprints two media files and finds their shared audio.
+
+    Returns:
+        dict: {"a", "b", "regions", "shared_ms", "coverage_a", "coverage_b", "elapsed"}
+    """
+    start = time.perf_counter()
+    a = fingerprint_audio(path_a)
+    b = fingerprint_audio(path_b)
+    regions = match_fingerprints(a, b, min_hits)
+    shared_ms = sum(region["a_end_ms"] - region["a_start_ms"] for region in regions)
+    elapsed = time.perf_counter() - start
+    logger.info(f"🔗 {len(regions)} shared audio region(s), {shared_ms / 1000:.0f}s, found in {elapsed:.1f}s")
+    return {
+        "a": path_a,
+        "b": path_b,
+        "regions": regions,
+        "shared_ms": shared_ms,
+        "coverage_a": shared_ms / a["duration_ms"] if a["duration_ms"] else 0.0,
+        "coverage_b": shared_ms / b["duration_ms"] if b["duration_ms"] else 0.0,
+        "elapsed": elapsed,
+    }
+
+
+def open_audio_index(db_path=DEFAULT_INDEX_PATH):
+    """
+    Opens (and creates if needed) the inverted hash index.
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode with WAL enabled.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def add_fingerprint(conn, media_id, fingerprint):
+    """Stores a fingerprint under media_id, replacing any earlier one."""
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DELETE FROM audio_hashes WHERE media_id = ?", (media_id,))
+        conn.execute("INSERT OR REPLACE INTO media (media_id, path, duration_ms, hashes, created) "
+                     "VALUES (?, ?, ?, ?, ?)",
+                     (media_id, fingerprint["path"] or media_id, fingerprint["duration_ms"],
+                      len(fingerprint["hashes"]), time.time()))
+        conn.executemany("INSERT INTO audio_hashes (hash, media_id, t) VALUES (?, ?, ?)",
+                         zip(fingerprint["hashes"].tolist(), [media_id] * len(fingerprint["hashes"]),
+                             fingerprint["times"].tolist()))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def add_audio(conn, path, media_id=None):
+    """
+    Fingerprints a media file and stores it under media_id (default: file
+    name without extension).
+
+    Returns:
+        dict: {"media_id", "hashes", "duration_ms"}
+    """
+    media_id = media_id or os.path.splitext(os.path.basename(path))[0]
+    fingerprint = fingerprint_audio(path)
+    add_fingerprint(conn, media_id, fingerprint)
+    return {"media_id": media_id, "hashes": len(fingerprint["hashes"]), "duration_ms": fingerprint["duration_ms"]}
+
+
+def _stored_fingerprint(conn, media_id, hop_ms):
+    import numpy as np
+
+    rows = conn.execute("SELECT hash, t FROM audio_hashes WHERE media_id = ?", (media_id,)).fetchall()
+    data = np.array([(row["hash"], row["t"]) for row in rows], dtype=np.int64).reshape(-1, 2)
+    return {"hashes": data[:, 0], "times": data[:, 1], "hop_ms": hop_ms}
+
+
+def find_audio_matches(conn, fingerprint, min_hits=MIN_HITS, exclude=()):
+    """
+    Finds stored media that share audio with a fingerprint.
+
+    Candidates are the media with at least min_hits // 3 hash matches at
+    a single offset (one SQL pass over the index); each candidate is then
+    matched in full with match_fingerprints().
+
+    Returns:
+        list[dict]: Best first: {"media_id", "path", "shared_ms", "regions"},
+        regions as in match_fingerprints() with a = the query, b = the stored file.
+    """
+    start = time.perf_counter()
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS query_hashes (hash INTEGER NOT NULL, t INTEGER NOT NULL)")
+    conn.execute("DELETE FROM query_hashes")
+    conn.executemany("INSERT INTO query_hashes (hash, t) VALUES (?, ?)",
+                     zip(fingerprint["hashes"].tolist(), fingerprint["times"].tolist()))
+    candidates = [row["media_id"] for row in conn.execute(
+        "SELECT DISTINCT media_id FROM ("
+        "  SELECT a.media_id, a.t - q.t AS offset, COUNT(*) AS hits"
+        "  FROM query_hashes q JOIN audio_hashes a ON a.hash = q.hash"
+        "  GROUP BY a.media_id, offset HAVING hits >= ?)",
+        (max(2, min_hits // 3),),
+    ).fetchall() if row["media_id"] not in set(exclude)]
+    conn.execute("DELETE FROM query_hashes")
+
+    results = []
+    for media_id in candidates:
+        regions = match_fingerprints(fingerprint, _stored_fingerprint(conn, media_id, fingerprint["hop_ms"]),
+                                     min_hits)
+        if not regions:
+            continue
+        row = conn.execute("SELECT path FROM media WHERE media_id = ?", (media_id,)).fetchone()
+        results.append({
+            "media_id": media_id,
+            "path": row["path"] if row else None,
+            "shared_ms": sum(region["a_end_ms"] - region["a_start_ms"] for region in regions),
+            "regions": regions,
+        })
+
+    results.sort(key=lambda result: result["shared_ms"], reverse=True)
+    logger.info(f"🔍 {len(candidates)} candidate(s) checked in {time.perf_counter() - start:.2f}s: "
+                f"{len(results)} file(s) share audio")
+    return results
@@ -0,0 +1,253 @@
+# === POOLED HEADLESS BROWSER ===
+# --------------------------------------------------
+# Finds podcast media URLs on pages that need a real browser (Cloudflare,
+# JS players), without paying for a Chrome launch and a fixed sleep per URL.
+#
+# - A pool of headless Chrome instances is started once and reused. Each
+#   worker thread borrows a driver, loads a page and returns the driver
+#   warm, so Cloudflare clearance cookies are reused too. A driver that
+#   errors out is replaced, or dropped if no new browser can be started.
+# - Pages are loaded with pageLoadStrategy "none" and Chrome's performance
+#   log is polled instead of sleeping. A page is ready as soon as:
+#     "media": a request for an audio file (by extension or audio/* MIME
+#              type) shows up in the network log, or
+#     "idle":  the load event has fired and no network activity was seen
+#              for idle_seconds with at most MAX_IDLE_INFLIGHT requests
+#              still open (players and analytics keep long polls open), or
+#     "timeout": timeout seconds have passed.
+#   Without a media request, the page HTML is scanned for .mp3 links.
+# - Any page server works, including a local http.server serving stub
+#   pages.
+#
+# Requires: pip install selenium (and Chrome)
+# --------------------------------------------------
+#
+# Function: create_driver(headless: bool) -> WebDriver
+#   Headless Chrome with performance (network) logging.
+#
+# Function: browser_pool(size: int, headless: bool) -> ContextManager[queue.Queue]
+#   Warm drivers for find_media(); quits them on exit.
+#
+# Function: find_media(driver, url: str, timeout: float, idle_seconds: float) -> dict
+#   Loads a page and waits until a media request is seen or the network is idle.
+#
+# Function: fetch_media_urls(urls: list[str], pool_size: int, **wait_kwargs) -> list[dict]
+#   find_media() for many pages concurrently on a browser pool.
+# --------------------------------------------------
+
+import re
+import json
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 3
+DEFAULT_TIMEOUT = 30
+IDLE_SECONDS = 1.0
+MAX_IDLE_INFLIGHT = 2
+POLL_SECONDS = 0.2
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".aac", ".ogg", ".opus")
+_MP3_LINK_RE = re.compile(r'https?://[^"\'\s<>]+\.mp3[^"\'\s<>]*')
+
+
+def create_driver(headless=True):
+    """Headless Chrome that returns from get() immediately and logs network events."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--mute-audio")
+    options.add_argument("--window-size=1920,1080")
+    options.page_load_strategy = "none"
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return webdriver.Chrome(options=options)
+
+
+@contextmanager
+def browser_pool(size=DEFAULT_POOL_SIZE, headless=True):
+    """
+    Starts size Chrome instances (in parallel) and yields them in a queue.
+
+    Borrow with drivers.get() and give back with drivers.put(); every
+    driver in the queue on exit is quit.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=size) as launcher:
+        futures = [launcher.submit(create_driver, headless) for _ in range(size)]
+    started = []
+    errors = []
+    for future in futures:
+        try:
+            started.append(future.result())
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        # Don't leak the Chromes that did start
+        for driver in started:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        raise errors[0]
+    drivers = queue.Queue()
+    for driver in started:
+        drivers.put(driver)
+    logger.info(f"🌐 Started {size} headless Chrome instances in {time.perf_counter() - start:.1f}s")
+
+    try:
+        yield drivers
+    finally:
+        while not drivers.empty():
+            try:
+                drivers.get_nowait().quit()
+            except Exception:
+                pass
+
+
+def _is_media(url, mime_type=""):
+    return url.lower().split("?")[0].endswith(AUDIO_EXTENSIONS) or mime_type.startswith("audio/")
+
+
+def find_media(driver, url, timeout=DEFAULT_TIMEOUT, idle_seconds=IDLE_SECONDS):
+    """
+    Loads a page and waits for a media request or network idle.
+
+    Args:
+        driver: WebDriver from create_driver().
+        url (str): Page URL.
+        timeout (float): Maximum wait.
+        idle_seconds (float): Quiet period that counts as network idle.
+
+    Returns:
+        dict: {"url", "media_url", "media_urls", "ready", "elapsed"}.
+        ready is "media", "idle" or "timeout"; media_url is None when
+        nothing was found.
+    """
+    # Stop the previous page first: with pageLoadStrategy "none" its requests
+    # would otherwise keep landing in the log after the drain below.
+    driver.get("about:blank")
+    driver.get_log("performance")
+    start = time.perf_counter()
+    driver.get(url)
+
+    inflight = set()
+    media_urls = []
+    loaded = False
+    last_activity = start
+    ready = "timeout"
+    while time.perf_counter() - start < timeout:
+        entries = driver.get_log("performance")
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method = message.get("method", "")
+            params = message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                inflight.add(params.get("requestId"))
+                request_url = params.get("request", {}).get("url", "")
+                if _is_media(request_url):
+                    media_urls.append(request_url)
+            elif method == "Network.responseReceived":
+                response = params.get("response", {})
+                if _is_media(response.get("url", ""), response.get("mimeType", "")):
+                    media_urls.append(response["url"])
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                inflight.discard(params.get("requestId"))
+            elif method == "Page.loadEventFired":
+                loaded = True
+        now = time.perf_counter()
+        if entries:
+            last_activity = now
+
+        if media_urls:
+            ready = "media"
+            break
+        if loaded and len(inflight) <= MAX_IDLE_INFLIGHT and now - last_activity >= idle_seconds:
+            ready = "idle"
+            break
+        time.sleep(POLL_SECONDS)
+
+    if not media_urls:
+        media_urls = _MP3_LINK_RE.findall(driver.page_source)
+
+    media_urls = list(dict.fromkeys(media_urls))
+    elapsed = time.perf_counter() - start
+    logger.info(f"{'🎧' if media_urls else '❌'} {url}: {len(media_urls)} media URL(s), "
+                f"ready on {ready} after {elapsed:.1f}s")
+    return {
+        "url": url,
+        "media_url": media_urls[0] if media_urls else None,
+        "media_urls": media_urls,
+        "ready": ready,
+        "elapsed": elapsed,
+    }
+
+
+def fetch_media_urls(urls, pool_size=DEFAULT_POOL_SIZE, headless=True, **wait_kwargs):
+    """
+    Runs find_media() for many pages concurrently on a browser pool.
+
+    Args:
+        urls (list[str]): Page URLs.
+        pool_size (int): Browser instances (and concurrent pages).
+        headless (bool): Run Chrome headless.
+        **wait_kwargs: timeout, idle_seconds (see find_media()).
+
+    Returns:
+        list[dict]: One find_media() result per URL, in input order. Failed
+        pages have media_url None and an "error" entry.
+    """
+    from selenium.common.exceptions import WebDriverException
+
+    pool_size = max(1, min(pool_size, len(urls)))
+    with browser_pool(pool_size, headless) as drivers:
+        alive = [pool_size]
+        alive_lock = threading.Lock()
+
+        def borrow():
+            while True:
+                try:
+                    return drivers.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    with alive_lock:
+                        if alive[0] == 0:
+                            return None
+
+        def visit(url):
+            driver = borrow()
+            if driver is None:
+                return {"url": url, "media_url": None, "media_urls": [], "ready": "error",
+                        "elapsed": None, "error": "no browser left in the pool"}
+            try:
+                return find_media(driver, url, **wait_kwargs)
+            except WebDriverException as e:
+                logger.warning(f"⚠️ {url}: {e.msg or e}; replacing browser")
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                try:
+                    driver = create_driver(headless)
+                except Exception as launch_error:
+                    # Never hand the dead driver back; the pool shrinks by one instead
+                    logger.error(f"❌ Could not start a replacement browser: {launch_error}")
+                    driver = None
+                    with alive_lock:
+                        alive[0] -= 1
+                return {"url": url, "media_url": None, "media_urls": [], "ready": "error",
+                        "elapsed": None, "error": str(e)}
+            finally:
+                if driver is not None:
+                    drivers.put(driver)
+
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            return list(executor.map(visit, urls))
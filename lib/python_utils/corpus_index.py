@@ -0,0 +1,170 @@
+# === CORPUS SIMILARITY INDEX ===
+# --------------------------------------------------
+# All-pairs / top-k similarity over many documents without comparing every
+# pair. Each document is tokenized and shingled once
+# (text_similarity.shingle_text; the MinHash/SimHash signatures are never
+# used here) and its 3-word shingles go into an inverted index: shingle
+# hash -> documents.
+#
+# A query walks the postings of its own shingles, counting shared shingles per
+# document. That gives the exact shingle Jaccard for every document that has
+# anything in common with the query; only the best of those are aligned with
+# text_similarity.aligned_ratio, so reported scores are on the same scale as
+# compare_texts(). Documents sharing no shingle are never touched.
+#
+# Shingles that occur in more than `max_postings` documents (site boilerplate,
+# disclaimers) are ignored when scoring; they would make every query scan the
+# whole corpus.
+# --------------------------------------------------
+#
+# Function: build_index(documents: dict[str, str], max_postings: int) -> dict
+#   Shingles every document and builds the inverted shingle index.
+#
+# Function: add_document(index: dict, doc_id: str, text: str) -> None
+#   Adds (or replaces) one document.
+#
+# Function: query_index(index: dict, text: str, top_k: int, exclude: set) -> list[dict]
+#   Top-k most similar indexed documents for a text.
+#
+# Function: all_pairs(index: dict, top_k: int, min_score: float) -> list[dict]
+#   Top-k neighbours of every indexed document, one row per unordered pair.
+#
+# Function: load_corpus(directory: str, extensions: tuple) -> dict[str, str]
+#   Reads every text file under a directory into {relative path: text}.
+# --------------------------------------------------
+
+import os
+import logging
+from collections import Counter
+
+from text_similarity import shingle_text, aligned_ratio
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+MAX_POSTINGS = 500      # shingles in more documents than this are treated as boilerplate
+ALIGN_FACTOR = 3        # align up to top_k * ALIGN_FACTOR best Jaccard candidates
+
+
+def build_index(documents, max_postings=MAX_POSTINGS):
+    """
+    Builds an inverted shingle index over a set of documents.
+
+    Args:
+        documents (dict): doc_id -> text.
+        max_postings (int): Document frequency above which a shingle is ignored.
+
+    Returns:
+        dict: {"docs": doc_id -> shingled text, "sizes": doc_id -> unique shingles,
+               "postings": shingle -> set(doc_id), "max_postings": int}
+    """
+    index = {"docs": {}, "sizes": {}, "postings": {}, "max_postings": max_postings}
+    for doc_id, text in documents.items():
+        add_document(index, doc_id, text)
+    logger.info(f"📚 Indexed {len(index['docs'])} documents, {len(index['postings'])} distinct shingles")
+    return index
+
+
+def add_document(index, doc_id, text):
+    """Adds a document to the index, replacing any earlier version with the same id."""
+    if doc_id in index["docs"]:
+        for shingle in set(index["docs"][doc_id]["shingles"]):
+            index["postings"][shingle].discard(doc_id)
+
+    signature = shingle_text(text)
+    unique = set(signature["shingles"])
+    index["docs"][doc_id] = signature
+    index["sizes"][doc_id] = len(unique)
+    for shingle in unique:
+        index["postings"].setdefault(shingle, set()).add(doc_id)
+
+
+def _candidates(index, signature, exclude=()):
+    """Shared-shingle counts per indexed document, via the postings lists."""
+    shared = Counter()
+    for shingle in set(signature["shingles"]):
+        docs = index["postings"].get(shingle)
+        if not docs or len(docs) > index["max_postings"]:
+            continue
+        shared.update(docs)
+    for doc_id in exclude:
+        shared.pop(doc_id, None)
+    return shared
+
+
+def _rank(index, signature, shared, top_k, min_score):
+    size = len(set(signature["shingles"]))
+    by_jaccard = sorted(
+        ((doc_id, count / (size + index["sizes"][doc_id] - count)) for doc_id, count in shared.items()),
+        key=lambda item: -item[1],
+    )
+    if top_k:
+        by_jaccard = by_jaccard[:top_k * ALIGN_FACTOR]
+
+    results = []
+    for doc_id, jaccard in by_jaccard:
+        score = aligned_ratio(signature, index["docs"][doc_id])
+        if score >= min_score:
+            results.append({"doc_id": doc_id, "score": score, "jaccard": jaccard})
+    results.sort(key=lambda r: -r["score"])
+    return results[:top_k] if top_k else results
+
+
+def query_index(index, text, top_k=5, exclude=(), min_score=0.0):
+    """
+    Finds the indexed documents most similar to a text.
+
+    Args:
+        index (dict): Index from build_index().
+        text (str): Query text (e.g. a transcript).
+        top_k (int): Number of results; None for every document with shared shingles.
+        exclude (iterable): doc_ids to leave out.
+        min_score (float): Drop results scoring below this.
+
+    Returns:
+        list[dict]: {"doc_id", "score", "jaccard"} sorted by score, best first.
+    """
+    signature = shingle_text(text)
+    return _rank(index, signature, _candidates(index, signature, exclude), top_k, min_score)
+
+
+def all_pairs(index, top_k=5, min_score=0.0):
+    """
+    Similar-document table for the whole index.
+
+    Each document is queried against the index (excluding itself); pairs found
+    from both sides are reported once.
+
+    Returns:
+        list[dict]: {"a", "b", "score", "jaccard"} sorted by score, best first.
+    """
+    pairs = {}
+    for doc_id, signature in index["docs"].items():
+        shared = _candidates(index, signature, exclude=(doc_id,))
+        for result in _rank(index, signature, shared, top_k, min_score):
+            key = tuple(sorted((doc_id, result["doc_id"])))
+            if key not in pairs:
+                pairs[key] = {"a": key[0], "b": key[1], "score": result["score"], "jaccard": result["jaccard"]}
+    return sorted(pairs.values(), key=lambda p: -p["score"])
+
+
+def load_corpus(directory, extensions=(".txt",)):
+    """
+    Reads every text file under a directory.
+
+    Returns:
+        dict: path relative to `directory` -> file contents.
+    """
+    documents = {}
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.endswith(extensions):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    documents[os.path.relpath(path, directory)] = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"⚠️ Could not read {path}: {e}")
+    logger.info(f"📂 Loaded {len(documents)} documents from {directory}")
+    return documents
@@ -0,0 +1,352 @@
+# === SOURCE CRAWLER ===
+# --------------------------------------------------
+# Discovers articles for the comparison corpus instead of relying on
+# hard-coded URL lists.
+#
+# Starts from seed URLs and/or sitemaps, then follows links breadth-first
+# within the seed hosts. The crawl is polite:
+# - robots.txt is honoured, including Crawl-delay. As in
+#   urllib.robotparser, a 401/403 on robots.txt disallows the whole host
+#   and any other error allows it.
+# - Requests to each host are spaced by a minimum delay.
+# - Fetches go through scraper.fetch(), so they use the pooled session
+#   and the on-disk cache, and re-crawls revalidate instead of downloading
+#   pages again.
+#
+# Every page is parsed once with lxml for links and article extraction.
+# An article is kept when it has at least MIN_WORDS words and its text
+# hash has not been seen yet. Kept articles are written in the article
+# layout (<slug>.txt, <slug>-italics.txt, <slug>-html.txt) that mim2's
+# load_articles() reads. crawl_manifest.json maps slugs back to URLs.
+# --------------------------------------------------
+#
+# Function: normalize_url(url: str, base: str) -> str | None
+#   Absolute http(s) URL without fragment or tracking parameters.
+#
+# Function: page_slug(url: str) -> str
+#   Filename-safe slug of host + path (unique per page, unlike slugify_url).
+#
+# Function: parse_sitemap(xml: str | bytes) -> dict
+#   {"urls": [...], "sitemaps": [...]} from a urlset or sitemap index.
+#
+# Function: load_seeds(sources: list[str]) -> list[str]
+#   Seed URLs from URLs, text files of URLs, and sitemap files/URLs.
+#
+# Function: crawl(seeds: list[str], article_dir: str, ...) -> dict
+#   Runs the crawl and returns a summary (pages, articles, pages per minute).
+# --------------------------------------------------
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from scraper import USER_AGENT, DEFAULT_TIMEOUT, fetch, get_session, parse_html, extract_article, save_article
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELAY = 1.0        # seconds between requests to the same host
+MAX_PAGES = 200
+MAX_DEPTH = 2
+MIN_WORDS = 150            # shorter pages are used for link discovery only
+MAX_SITEMAPS = 50          # nested sitemap files followed per crawl
+SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".mp3", ".mp4",
+    ".zip", ".css", ".js", ".json", ".xml", ".ico",
+)
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid)$")
+
+
+def normalize_url(url, base=None):
+    """
+    Makes a URL absolute and canonical enough for deduplication.
+
+    Returns:
+        str | None: URL without fragment and tracking parameters, or None
+        for non-http(s) links (mailto:, javascript:, ...).
+    """
+    url = urljoin(base, url.strip()) if base else url.strip()
+    parts = urlparse(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not TRACKING_PARAMS.match(k)])
+    return urlunparse((parts.scheme, parts.netloc.lower(), parts.path or "/", "", query, ""))
+
+
+def page_slug(url):
+    """Slug of host + path; long or query-bearing URLs get a short hash suffix."""
+    parts = urlparse(url)
+    slug = re.sub(r"\W+", "-", f"{parts.netloc.replace('www.', '')}{parts.path}").strip("-").lower()
+    if parts.query or len(slug) > 100:
+        slug = f"{slug[:100].rstrip('-')}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+    return slug
+
+
+def content_hash(text):
+    """Hash of the article text with case and whitespace normalised."""
+    return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def parse_sitemap(xml):
+    """
+    Reads a sitemap (<urlset>) or sitemap index (<sitemapindex>).
+
+    Returns:
+        dict: {"urls": page URLs, "sitemaps": nested sitemap URLs}
+    """
+    from lxml import etree
+
+    if isinstance(xml, str):
+        xml = xml.encode("utf-8")
+    root = etree.fromstring(xml, parser=etree.XMLParser(recover=True))
+    if root is None:
+        return {"urls": [], "sitemaps": []}
+
+    def locs(parent):
+        return [loc.strip() for loc in root.xpath(f"//*[local-name()='{parent}']/*[local-name()='loc']/text()")]
+
+    return {"urls": locs("url"), "sitemaps": locs("sitemap")}
+
+
+def _is_sitemap(source, content=None):
+    if content is not None:
+        return content.lstrip()[:200].startswith("<")
+    return urlparse(source).path.endswith(".xml") or source.endswith(".xml.gz")
+
+
+def load_seeds(sources, **fetch_kwargs):
+    """
+    Expands seed sources into URLs.
+
+    Args:
+        sources (list[str]): Page URLs, sitemap URLs (*.xml), local sitemap
+            files, or local text files with one URL per line.
+        **fetch_kwargs: Passed to scraper.fetch() for remote sitemaps.
+
+    Returns:
+        list[str]: Normalised seed URLs, in order, without duplicates.
+    """
+    seeds = []
+    pending = deque(sources)
+    sitemaps_read = 0
+    while pending:
+        source = pending.popleft()
+        if os.path.exists(source):
+            with open(source, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+            if not _is_sitemap(source, content):
+                seeds.extend(line.strip() for line in content.splitlines()
+                             if line.strip() and not line.startswith("#"))
+                continue
+        elif _is_sitemap(source):
+            result = fetch(source, **fetch_kwargs)
+            if not result:
+                logger.warning(f"⚠️ Could not fetch sitemap {source}")
+                continue
+            content = result["text"]
+        else:
+            seeds.append(source)
+            continue
+
+        sitemaps_read += 1
+        sitemap = parse_sitemap(content)
+        logger.info(f"🗺️ {source}: {len(sitemap['urls'])} URLs, {len(sitemap['sitemaps'])} nested sitemaps")
+        seeds.extend(sitemap["urls"])
+        if sitemaps_read < MAX_SITEMAPS:
+            pending.extend(sitemap["sitemaps"])
+
+    return list(dict.fromkeys(filter(None, (normalize_url(url) for url in seeds))))
+
+
+def _fetch_robots(robots_url, fetch_kwargs):
+    """
+    RobotFileParser for a robots.txt URL, following RobotFileParser.read():
+    401/403 disallow everything, other errors (404, 5xx, unreachable) allow
+    everything. Fetched directly rather than through fetch(), which hides
+    the status of failed requests.
+    """
+    import requests
+
+    parser = RobotFileParser(robots_url)
+    session = fetch_kwargs.get("session") or get_session()
+    try:
+        response = session.get(robots_url, timeout=fetch_kwargs.get("timeout", DEFAULT_TIMEOUT))
+    except requests.RequestException as e:
+        logger.warning(f"⚠️ {robots_url}: {e}; assuming allow-all")
+        parser.parse([])
+        return parser
+
+    if response.status_code in (401, 403):
+        logger.warning(f"🚫 {robots_url}: HTTP {response.status_code}; host disallowed")
+        parser.disallow_all = True
+    elif response.status_code >= 400:
+        parser.parse([])
+    else:
+        parser.parse(response.text.splitlines())
+    return parser
+
+
+def _robots(state, url, fetch_kwargs):
+    """Parsed robots.txt for the URL's host (fetched once per crawl)."""
+    parts = urlparse(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with state["lock"]:
+        host_lock = state["robots_locks"].setdefault(key, threading.Lock())
+    with host_lock:
+        if key not in state["robots"]:
+            state["robots"][key] = _fetch_robots(f"{key}/robots.txt", fetch_kwargs)
+        return state["robots"][key]
+
+
+def _wait_turn(state, host, delay):
+    """Reserves the host's next request slot and sleeps until it comes."""
+    with state["lock"]:
+        slot = max(time.monotonic(), state["next_slot"].get(host, 0.0))
+        state["next_slot"][host] = slot + delay
+    pause = slot - time.monotonic()
+    if pause > 0:
+        time.sleep(pause)
+
+
+def _crawl_page(url, state, delay, fetch_kwargs):
+    """Fetches one page politely and extracts its links and article."""
+    robots = _robots(state, url, fetch_kwargs)
+    if not robots.can_fetch(USER_AGENT, url):
+        return {"url": url, "status": "disallowed"}
+
+    host = urlparse(url).netloc
+    _wait_turn(state, host, max(delay, robots.crawl_delay(USER_AGENT) or 0))
+    result = fetch(url, **fetch_kwargs)
+    if not result:
+        return {"url": url, "status": "failed"}
+    if result["content_type"] and "html" not in result["content_type"]:
+        return {"url": url, "status": "skipped"}
+
+    root = parse_html(result["text"])
+    links = [normalize_url(href, url) for href in root.xpath("//a/@href")]
+    return {
+        "url": url,
+        "status": "ok",
+        "from_cache": result["from_cache"],
+        "links": [link for link in links if link],
+        "article": extract_article(root),
+    }
+
+
+def crawl(seeds, article_dir, max_pages=MAX_PAGES, max_depth=MAX_DEPTH, delay=DEFAULT_DELAY,
+          workers=8, same_host=True, min_words=MIN_WORDS, **fetch_kwargs):
+    """
+    Crawls from seed URLs and saves unique articles in the article layout.
+
+    Args:
+        seeds (list[str]): Start URLs (see load_seeds()).
+        article_dir (str): Output directory for articles and crawl_manifest.json.
+        max_pages (int): Pages to fetch at most.
+        max_depth (int): Link hops followed from the seeds (0 = seeds only).
+        delay (float): Minimum seconds between requests to one host;
+            robots.txt Crawl-delay wins when it is longer.
+        workers (int): Concurrent fetches.
+        same_host (bool): Only follow links to the seeds' hosts.
+        min_words (int): Minimum article length to save.
+        **fetch_kwargs: Passed to scraper.fetch() (cache_dir, timeout, max_age).
+
+    Returns:
+        dict: {"pages", "articles", "duplicates", "disallowed", "failed",
+               "elapsed", "pages_per_minute", "manifest"}
+    """
+    os.makedirs(article_dir, exist_ok=True)
+    fetch_kwargs.setdefault("session", get_session(workers))
+    state = {"lock": threading.Lock(), "next_slot": {}, "robots": {}, "robots_locks": {}}
+
+    seeds = [url for url in (normalize_url(seed) for seed in seeds) if url]
+    hosts = {urlparse(url).netloc for url in seeds}
+    frontier = deque((url, 0) for url in seeds)
+    seen = set(seeds)
+    hashes = {}
+    pages = {}
+    articles = {}
+    start = time.monotonic()
+
+    logger.info(f"🕷️ Crawling from {len(seeds)} seeds ({len(hosts)} hosts), up to {max_pages} pages, depth {max_depth}")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        submitted = 0
+        while frontier or running:
+            while frontier and len(running) < workers and submitted < max_pages:
+                url, depth = frontier.popleft()
+                running[pool.submit(_crawl_page, url, state, delay, fetch_kwargs)] = depth
+                submitted += 1
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth = running.pop(future)
+                try:
+                    page = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Crawl worker failed: {e}")
+                    continue
+
+                url = page["url"]
+                pages[url] = {"status": page["status"], "depth": depth}
+                if page["status"] != "ok":
+                    logger.info(f"⏭️ {page['status']}: {url}")
+                    continue
+
+                if depth < max_depth:
+                    for link in page["links"]:
+                        if link in seen or urlparse(link).path.lower().endswith(SKIP_EXTENSIONS):
+                            continue
+                        if same_host and urlparse(link).netloc not in hosts:
+                            continue
+                        seen.add(link)
+                        frontier.append((link, depth + 1))
+
+                article = page["article"]
+                words = len(article["text"].split())
+                if words < min_words:
+                    continue
+                digest = content_hash(article["text"])
+                if digest in hashes:
+                    pages[url]["duplicate_of"] = hashes[digest]
+                    logger.info(f"♻️ Duplicate of {hashes[digest]}: {url}")
+                    continue
+
+                slug = page_slug(url)
+                save_article(article, article_dir, slug)
+                hashes[digest] = slug
+                pages[url]["slug"] = slug
+                articles[slug] = {"url": url, "words": words, "hash": digest}
+                logger.info(f"✅ Saved article: {slug} ({words} words)")
+
+    elapsed = time.monotonic() - start
+    statuses = [page["status"] for page in pages.values()]
+    summary = {
+        "pages": len(pages),
+        "articles": len(articles),
+        "duplicates": sum(1 for page in pages.values() if "duplicate_of" in page),
+        "disallowed": statuses.count("disallowed"),
+        "failed": statuses.count("failed"),
+        "elapsed": round(elapsed, 2),
+        "pages_per_minute": round(len(pages) / elapsed * 60, 1) if elapsed else 0.0,
+    }
+
+    manifest_path = os.path.join(article_dir, "crawl_manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"seeds": seeds, "summary": summary, "articles": articles, "pages": pages}, f, indent=2)
+    summary["manifest"] = manifest_path
+
+    logger.info(f"🏁 Crawled {summary['pages']} pages in {summary['elapsed']}s "
+                f"({summary['pages_per_minute']}/min): {summary['articles']} articles, "
+                f"{summary['duplicates']} duplicates, {summary['disallowed']} disallowed")
+    return summary
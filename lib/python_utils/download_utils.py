@@ -0,0 +1,327 @@
+# === RESUMABLE HTTP DOWNLOAD HELPERS ===
+# --------------------------------------------------
+# Plain-HTTP download layer for large media (podcast mp3s, direct video
+# links) that yt-dlp is not involved in.
+#
+# - Resumes interrupted downloads with HTTP Range requests (".part" files
+#   are kept next to the output until the download is verified).
+# - Splits large files into byte-range segments fetched concurrently.
+# - Picks a read chunk size from the file size instead of a fixed 8 KB.
+# - Verifies final size and (optionally) hash before publishing the file.
+# - Works against any local server. The stdlib http.server ignores Range
+#   headers, so resume and segments need one that answers 206 with
+#   Content-Range and sends Accept-Ranges/ETag (tests/test_download_utils.py
+#   has such a fixture).
+# Requires: pip install requests
+# --------------------------------------------------
+#
+# Function: pick_chunk_size(total_size: int | None) -> int
+#   Chooses a streaming chunk size scaled to the file size.
+#
+# Function: probe_remote_file(url: str, session=None, headers=None) -> dict
+#   Returns final URL, content length, range support, ETag and Last-Modified.
+#
+# Function: verify_download(path, expected_size=None, expected_hash=None, hash_algo="sha256") -> bool
+#   Checks file size and hash after download.
+#
+# Function: download_file(params: dict) -> dict | None
+#   Resumable, optionally segmented download. Returns {"to_process": path}.
+# --------------------------------------------------
+
+import os
+import time
+import shutil
+import hashlib
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+SEGMENT_THRESHOLD = 16 * 1024 * 1024  # Only split files larger than this
+DEFAULT_SEGMENTS = 4
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 30
+
+
+def pick_chunk_size(total_size):
+    """
+    Chooses a read chunk size for streaming based on the file size.
+
+    Small files keep a 64 KB chunk; large files scale up to 4 MB so we are not
+    paying Python-level overhead for every 8 KB of a multi-GB file.
+
+    Args:
+        total_size (int | None): Remote file size in bytes, if known.
+
+    Returns:
+        int: Chunk size in bytes.
+    """
+    if not total_size:
+        return MIN_CHUNK_SIZE
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, total_size // 256))
+
+
+def probe_remote_file(url, session=None, headers=None):
+    """
+    Asks the server about a file without downloading it.
+
+    Tries HEAD first and falls back to a one-byte ranged GET for servers that
+    reject HEAD or omit Content-Length on it.
+
+    Args:
+        url (str): File URL.
+        session (requests.Session): Optional session to reuse connections.
+        headers (dict): Extra request headers.
+
+    Returns:
+        dict: url, content_length, accept_ranges, etag, last_modified.
+    """
+    http = session or requests
+    request_headers = {**DEFAULT_HEADERS, **(headers or {})}
+    info = {
+        "url": url,
+        "content_length": None,
+        "accept_ranges": False,
+        "etag": None,
+        "last_modified": None,
+    }
+
+    try:
+        response = http.head(url, headers=request_headers, allow_redirects=True, timeout=DEFAULT_TIMEOUT)
+        if response.status_code < 400:
+            info["url"] = response.url or url
+            length = response.headers.get("Content-Length")
+            info["content_length"] = int(length) if length and length.isdigit() else None
+            info["accept_ranges"] = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+            info["etag"] = response.headers.get("ETag")
+            info["last_modified"] = response.headers.get("Last-Modified")
+    except requests.RequestException as e:
+        logger.warning(f"⚠️ HEAD failed for {url}: {e}")
+
+    if info["content_length"] is None or not info["accept_ranges"]:
+        try:
+            range_headers = {**request_headers, "Range": "bytes=0-0"}
+            with http.get(url, headers=range_headers, stream=True, allow_redirects=True, timeout=DEFAULT_TIMEOUT) as response:
+                info["url"] = response.url or info["url"]
+                content_range = response.headers.get("Content-Range", "")
+                if response.status_code == 206 and "/" in content_range:
+                    total = content_range.rsplit("/", 1)[-1]
+                    info["content_length"] = int(total) if total.isdigit() else info["content_length"]
+                    info["accept_ranges"] = True
+                elif response.status_code == 200:
+                    length = response.headers.get("Content-Length")
+                    info["content_length"] = int(length) if length and length.isdigit() else None
+                info["etag"] = info["etag"] or response.headers.get("ETag")
+                info["last_modified"] = info["last_modified"] or response.headers.get("Last-Modified")
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Range probe failed for {url}: {e}")
+
+    logger.info(
+        f"🔎 Probed {url}: size={info['content_length']} ranges={info['accept_ranges']} etag={info['etag']}"
+    )
+    return info
+
+
+def verify_download(path, expected_size=None, expected_hash=None, hash_algo="sha256"):
+    """
+    Checks a downloaded file against an expected size and hash.
+
+    Args:
+        path (str): File to check.
+        expected_size (int): Expected size in bytes (skipped if None).
+        expected_hash (str): Expected hex digest (skipped if None).
+        hash_algo (str): hashlib algorithm name for expected_hash.
+
+    Returns:
+        bool: True if every provided check passes.
+    """
+    if not os.path.exists(path):
+        logger.error(f"❌ Downloaded file missing: {path}")
+        return False
+
+    actual_size = os.path.getsize(path)
+    if expected_size is not None and actual_size != expected_size:
+        logger.error(f"❌ Size mismatch for {path}: expected {expected_size}, got {actual_size}")
+        return False
+
+    if expected_hash:
+        digest = hashlib.new(hash_algo)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(MAX_CHUNK_SIZE), b""):
+                digest.update(block)
+        if digest.hexdigest().lower() != expected_hash.lower():
+            logger.error(f"❌ {hash_algo} mismatch for {path}")
+            return False
+
+    logger.info(f"✅ Verified {path} ({actual_size} bytes)")
+    return True
+
+
+def _fetch_range(http, url, part_path, start, end, chunk_size, headers, retries, if_range=None, segmented=False):
+    """
+    Downloads bytes [start, end] (inclusive; end=None means to EOF) into part_path,
+    resuming from whatever part_path already holds. A segment cannot restart
+    from byte 0, so a full 200 response raises ValueError when segmented=True.
+
+    Returns the number of bytes in part_path when done.
+    """
+    expected = None if end is None else end - start + 1
+
+    for attempt in range(retries):
+        have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if expected is not None and have >= expected:
+            return have
+
+        request_headers = dict(headers)
+        offset = start + have
+        if offset > 0 or end is not None:
+            request_headers["Range"] = f"bytes={offset}-" + ("" if end is None else str(end))
+            if if_range and have:
+                request_headers["If-Range"] = if_range
+
+        try:
+            with http.get(url, headers=request_headers, stream=True, timeout=DEFAULT_TIMEOUT) as response:
+                if response.status_code == 416:
+                    # Nothing left to send for this range.
+                    return have
+                response.raise_for_status()
+
+                mode = "ab"
+                if response.status_code == 200 and "Range" in request_headers:
+                    if segmented:
+                        raise ValueError("Server ignored the Range header for a segmented download")
+                    # Server restarted from byte 0 (no range support or file changed).
+                    logger.warning(f"⚠️ Server ignored resume for {url}; restarting from 0")
+                    mode = "wb"
+
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            f.write(chunk)
+
+            have = os.path.getsize(part_path)
+            if expected is None or have >= expected:
+                return have
+            logger.warning(f"⚠️ Short read on {part_path}: {have}/{expected} bytes")
+        except (requests.RequestException, IOError) as e:
+            logger.warning(f"⚠️ Range {start}-{end} attempt {attempt + 1} failed: {e}")
+
+        if attempt + 1 < retries:
+            time.sleep(2**attempt)
+
+    raise IOError(f"Failed to fetch bytes {start}-{end} of {url} after {retries} attempts")
+
+
+def download_file(params):
+    """
+    Downloads a file over HTTP with resume, optional segmentation and verification.
+
+    Args:
+        params (dict): Parameters for the download including:
+            - url (str): File URL.
+            - output_path (str): Final file path.
+            - expected_size (int): Optional size to verify against (defaults to Content-Length).
+            - expected_hash (str): Optional hex digest to verify against.
+            - hash_algo (str): Digest algorithm for expected_hash (default "sha256").
+            - segments (int): Max concurrent byte-range segments (default 4, 1 disables).
+            - chunk_size (int): Override the adaptive chunk size.
+            - retries (int): Attempts per range (default 3).
+            - headers (dict): Extra request headers.
+            - session (requests.Session): Optional session to reuse.
+
+    Returns:
+        dict: {"to_process": output_path}, or None if download or verification fails.
+    """
+    url = params.get("url")
+    output_path = params.get("output_path")
+
+    if not url or not output_path:
+        logger.error("download_file needs both 'url' and 'output_path'.")
+        return None
+
+    own_session = params.get("session") is None
+    http = params.get("session") or requests.Session()
+    headers = {**DEFAULT_HEADERS, **(params.get("headers") or {})}
+    retries = params.get("retries", DEFAULT_RETRIES)
+    start_time = time.time()
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+        info = probe_remote_file(url, session=http, headers=params.get("headers"))
+        total = info["content_length"]
+        expected_size = params.get("expected_size", total)
+        chunk_size = params.get("chunk_size") or pick_chunk_size(total)
+        if_range = info["etag"] or info["last_modified"]
+        url = info["url"]
+
+        segments = max(1, int(params.get("segments", DEFAULT_SEGMENTS)))
+        use_segments = segments > 1 and info["accept_ranges"] and total and total >= SEGMENT_THRESHOLD
+
+        if use_segments:
+            segment_size = -(-total // segments)
+            ranges = [
+                (i, offset, min(offset + segment_size, total) - 1)
+                for i, offset in enumerate(range(0, total, segment_size))
+            ]
+            logger.info(f"⬇️ Downloading {url} in {len(ranges)} segments (chunk {chunk_size} bytes)")
+
+            with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                futures = [
+                    pool.submit(
+                        _fetch_range, http, url, f"{output_path}.part{i}", start, end,
+                        chunk_size, headers, retries, if_range, True,
+                    )
+                    for i, start, end in ranges
+                ]
+                for future in futures:
+                    future.result()
+
+            with open(f"{output_path}.part", "wb") as out:
+                for i, _, _ in ranges:
+                    with open(f"{output_path}.part{i}", "rb") as part:
+                        shutil.copyfileobj(part, out, MAX_CHUNK_SIZE)
+            for i, _, _ in ranges:
+                os.remove(f"{output_path}.part{i}")
+        else:
+            logger.info(f"⬇️ Downloading {url} (chunk {chunk_size} bytes)")
+            if info["accept_ranges"] and total:
+                _fetch_range(http, url, f"{output_path}.part", 0, total - 1, chunk_size, headers, retries, if_range)
+            else:
+                # Still resumes an existing .part, so If-Range must guard it here too
+                _fetch_range(http, url, f"{output_path}.part", 0, None, chunk_size, headers, retries, if_range)
+
+        if not verify_download(
+            f"{output_path}.part",
+            expected_size=expected_size,
+            expected_hash=params.get("expected_hash"),
+            hash_algo=params.get("hash_algo", "sha256"),
+        ):
+            # A corrupt partial cannot be resumed safely; start clean next time.
+            os.remove(f"{output_path}.part")
+            return None
+
+        os.replace(f"{output_path}.part", output_path)
+        logger.info(f"Download completed in {time.time() - start_time:.2f} seconds: {output_path}")
+        return {"to_process": output_path}
+    except ValueError as e:
+        # Remote file changed or lost range support mid-download: segments are stale.
+        logger.error(f"Failed to download {url}: {e}")
+        for name in os.listdir(os.path.dirname(os.path.abspath(output_path))):
+            if name.startswith(os.path.basename(output_path) + ".part"):
+                os.remove(os.path.join(os.path.dirname(os.path.abspath(output_path)), name))
+        return None
+    except Exception as e:
+        logger.error(f"Failed to download {url}: {e}")
+        logger.debug(traceback.format_exc())
+        return None
+    finally:
+        if own_session:
+            http.close()
@@ -9,8 +9,16 @@ import os
 import json
 import traceback
 import time
+import hashlib
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+
+from utilities1 import unique_output_path
+
 ####################
 # Logger setup
 # Set up logging
@@ -30,26 +38,6 @@ logger.addHandler(console_handler)
 
 
 
-def unique_output_path(path, filename):
-    """
-    Generates a unique output file path by appending a counter to the filename if it already exists.
-
-    Args:
-        path (str): Directory path.
-        filename (str): Original filename.
-
-    Returns:
-        str: A unique file path.
-    """
-    base, ext = os.path.splitext(filename)
-    counter = 1
-    unique_filename = filename
-    while os.path.exists(os.path.join(path, unique_filename)):
-        unique_filename = f"{base}_{counter}{ext}"
-        counter += 1
-    return os.path.join(path, unique_filename)
-
-
 def extract_metadata(params):
     """
     Extracts all available metadata from a YouTube video without downloading it and saves it to a file.
@@ -215,6 +203,15 @@ def create_original_filename(params):
 
 
 
+def _discard(*paths):
+    """Removes a failed download's temp files and/or its name reservation."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
 def download_video(params):
     """
     Downloads a video from a given URL using yt-dlp.
@@ -239,17 +236,47 @@ def download_video(params):
         logger.error("No URL provided for download.")
         return None
 
+    # original_filename is an empty placeholder reserved by unique_output_path.
+    # yt-dlp writes to a temp name derived from the URL and the result is
+    # renamed onto the reservation, so the placeholder is never deleted
+    # while another process could claim the same name. The temp name is the
+    # same on every run, so a rerun resumes yt-dlp's .part files even though
+    # it reserves a new output name; a lock keeps two processes off it.
+    output_file = params.get("original_filename")
+    if not output_file:
+        logger.error("No original_filename reserved for the download.")
+        return None
+    ext = os.path.splitext(output_file)[1]
+    url_key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    temp_file = os.path.join(os.path.dirname(output_file), f".{url_key}.download{ext}")
+
+    lock_file = open(f"{temp_file}.lock", "a")
+    try:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        logger.error(f"{url} is already being downloaded by another process.")
+        _discard(output_file)
+        return None
+
     try:
         start_time = time.time()
         logger.info(f"Starting download for URL: {url}")
 
         # Set up yt-dlp options for actual download based on video_download_config
         ydl_opts = {
-            "outtmpl": params["original_filename"],
+            "outtmpl": temp_file,
             "cookiefile": video_download_config.get("cookie_path"),
             "format": video_download_config.get("format", "bestvideo+bestaudio/best"),
             "noplaylist": video_download_config.get("noplaylist", True),
-            "verbose": True,
+            "verbose": video_download_config.get("verbose", False),
+            # Resume .part files and fetch DASH/HLS fragments in parallel
+            "continuedl": True,
+            "concurrent_fragment_downloads": video_download_config.get("concurrent_fragments", 4),
+            "http_chunk_size": video_download_config.get("http_chunk_size", 10 * 1024 * 1024),
+            "retries": video_download_config.get("retries", 10),
+            "fragment_retries": video_download_config.get("fragment_retries", 10),
         }
 
         logger.debug(f"yt-dlp options: {ydl_opts}")
@@ -260,6 +287,14 @@ def download_video(params):
             ydl.download([url])
             logger.info("Video download completed.")
 
+        # yt-dlp leaves nothing (or an empty file) behind on some silent failures
+        if not os.path.exists(temp_file) or os.path.getsize(temp_file) == 0:
+            logger.error(f"Download produced no data for: {output_file}")
+            _discard(temp_file, f"{temp_file}.part", output_file)
+            return None
+        os.replace(temp_file, output_file)
+        _discard(f"{temp_file}.lock")
+
         end_time = time.time()
         logger.info(f"Download completed in {end_time - start_time:.2f} seconds")
         #save params
@@ -268,7 +303,11 @@ def download_video(params):
     except Exception as e:
         logger.error(f"Failed to download video: {e}")
         logger.debug(traceback.format_exc())
+        # Keep the partial for the next run to resume; release the name
+        _discard(output_file)
         return None
+    finally:
+        lock_file.close()
         
 
 def save_params_to_json(params):
@@ -0,0 +1,490 @@
+# === DURABLE MULTI-VIDEO JOB QUEUE ===
+# --------------------------------------------------
+# SQLite-backed queue that drives every metadata entry through the
+# default_tasks pipeline. One row per (metadata file, task); a job becomes
+# claimable once all of its TASK_DEPENDENCIES for the same video are done.
+#
+# - Workers claim jobs with a time-limited lease (renewed while running), so a
+#   crashed worker's job is picked up again after the lease expires.
+# - Failed jobs are retried with exponential backoff up to max_attempts.
+# - Per-stage concurrency limits (e.g. 2 downloads, 8 caption renders).
+# - queue_status() reports depth per stage/state and recent throughput.
+# --------------------------------------------------
+#
+# Function: init_queue(db_path: str) -> sqlite3.Connection
+# Function: enqueue_metadata(db_path, metadata_dir="./metadata", url=None) -> int
+# Function: claim_job(conn, worker_id, stage_limits=None, lease_seconds=..., metadata_path=None) -> dict | None
+# Function: complete_job(conn, job, output_path) -> bool / fail_job(conn, job, error) -> str
+# Function: run_worker(db_path, worker_id, stage_limits=None, stop_when_idle=False, metadata_path=None)
+# Function: queue_status(db_path, window_seconds=3600) -> dict
+# --------------------------------------------------
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+import traceback
+
+from tasks_lib import TASK_DISPATCH, TASK_DEPENDENCIES, record_task_state
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+
+DEFAULT_DB_PATH = "./metadata/job_queue.sqlite3"
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+# Few network-bound downloads at a time, many CPU-bound renders
+DEFAULT_STAGE_LIMITS = {
+    "perform_download": 2,
+    "apply_watermark": 4,
+    "extract_audio": 4,
+    "make_clips": 4,
+    "generate_captions": 8,
+    "post_process": 4,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    url           TEXT,
+    metadata_path TEXT NOT NULL,
+    task          TEXT NOT NULL,
+    state         TEXT NOT NULL DEFAULT 'pending',  -- pending, leased, done, failed
+    input         TEXT,
+    output        TEXT,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    not_before    REAL NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    last_error    TEXT,
+    created       REAL NOT NULL,
+    updated       REAL NOT NULL,
+    finished      REAL,
+    UNIQUE (metadata_path, task)
+);
+CREATE TABLE IF NOT EXISTS job_deps (
+    job_id     INTEGER NOT NULL REFERENCES jobs(id),
+    depends_on INTEGER NOT NULL REFERENCES jobs(id),
+    PRIMARY KEY (job_id, depends_on)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, not_before);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished);
+"""
+
+
+def init_queue(db_path=DEFAULT_DB_PATH):
+    """
+    Opens (and creates if needed) the queue database.
+
+    Args:
+        db_path (str): Path to the SQLite file.
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode with WAL enabled.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue_metadata(db_path=DEFAULT_DB_PATH, metadata_dir="./metadata", url=None,
+                     max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Adds a job for every task flag in every metadata JSON (or only the one for url).
+
+    Tasks flagged True become pending jobs, tasks holding an output path become
+    done jobs (so dependents can start), anything else is not queued.
+    Re-running is safe: existing (metadata_path, task) rows are left alone.
+
+    Args:
+        db_path (str): Queue database.
+        metadata_dir (str): Directory of metadata JSON files.
+        url (str): Only enqueue the metadata entry for this URL.
+        max_attempts (int): Attempts before a job is marked failed.
+
+    Returns:
+        int: Number of new jobs inserted.
+    """
+    logger.info(f"📥 Enqueueing tasks from {metadata_dir}")
+
+    if not os.path.exists(metadata_dir):
+        logger.warning(f"Metadata directory not found: {metadata_dir}")
+        return 0
+
+    conn = init_queue(db_path)
+    inserted = 0
+    now = time.time()
+
+    try:
+        for filename in sorted(os.listdir(metadata_dir)):
+            if not filename.endswith(".json"):
+                continue
+            json_path = os.path.abspath(os.path.join(metadata_dir, filename))
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error(f"Error reading {json_path}: {e}")
+                continue
+
+            if not isinstance(data, dict) or (url and data.get("url") != url):
+                continue
+
+            task_flags = data.get("default_tasks", {})
+            downloaded = task_flags.get("perform_download")
+            job_ids = {}
+
+            conn.execute("BEGIN IMMEDIATE")
+            for task, status in task_flags.items():
+                if task not in TASK_DISPATCH or not (status is True or isinstance(status, str)):
+                    continue
+                done = isinstance(status, str)
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (url, metadata_path, task, state, input, output, "
+                    "max_attempts, created, updated, finished) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        data.get("url"), json_path, task, "done" if done else "pending",
+                        data.get("url") if task == "perform_download"
+                        else (downloaded if isinstance(downloaded, str) else None),
+                        status if done else None, max_attempts, now, now, now if done else None,
+                    ),
+                )
+                inserted += cursor.rowcount
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE metadata_path = ? AND task = ?", (json_path, task)
+                ).fetchone()
+                job_ids[task] = row["id"]
+
+            for task, job_id in job_ids.items():
+                for dep in TASK_DEPENDENCIES.get(task, []):
+                    if dep in job_ids:
+                        conn.execute(
+                            "INSERT OR IGNORE INTO job_deps (job_id, depends_on) VALUES (?, ?)",
+                            (job_id, job_ids[dep]),
+                        )
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    logger.info(f"✅ Enqueued {inserted} new jobs")
+    return inserted
+
+
+def _fail_downstream(conn, job_ids, now):
+    """Marks every pending job downstream of job_ids failed (call inside a transaction)."""
+    for job_id in job_ids:
+        conn.execute(
+            "WITH RECURSIVE downstream(id) AS ("
+            "  SELECT job_id FROM job_deps WHERE depends_on = ? "
+            "  UNION SELECT d.job_id FROM job_deps d JOIN downstream s ON d.depends_on = s.id) "
+            "UPDATE jobs SET state = 'failed', last_error = 'upstream failed', updated = ?, finished = ? "
+            "WHERE id IN downstream AND state = 'pending'",
+            (job_id, now, now),
+        )
+
+
+def claim_job(conn, worker_id, stage_limits=None, lease_seconds=DEFAULT_LEASE_SECONDS, metadata_path=None):
+    """
+    Atomically leases the next runnable job.
+
+    A job is runnable when it is pending (or its lease expired), its backoff
+    has elapsed, every upstream job is done, and its stage is under its limit.
+
+    Args:
+        conn (sqlite3.Connection): Queue connection.
+        worker_id (str): Identifier stored as the lease owner.
+        stage_limits (dict): task -> max concurrently leased jobs.
+        lease_seconds (int): Lease duration.
+        metadata_path (str): Only claim jobs of this metadata entry.
+
+    Returns:
+        dict | None: The claimed job row (with resolved input), or None.
+    """
+    stage_limits = stage_limits or DEFAULT_STAGE_LIMITS
+    now = time.time()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Jobs whose worker died on the last allowed attempt are not retried again,
+        # and nothing downstream of them can ever run
+        expired = [row["id"] for row in conn.execute(
+            "SELECT id FROM jobs WHERE state = 'leased' AND lease_expires <= ? AND attempts >= max_attempts",
+            (now,),
+        )]
+        if expired:
+            conn.execute(
+                f"UPDATE jobs SET state = 'failed', last_error = 'lease expired', lease_owner = NULL, "
+                f"lease_expires = NULL, updated = ?, finished = ? WHERE id IN ({','.join('?' * len(expired))})",
+                (now, now, *expired),
+            )
+            _fail_downstream(conn, expired, now)
+
+        running = {
+            row["task"]: row["n"]
+            for row in conn.execute(
+                "SELECT task, COUNT(*) AS n FROM jobs WHERE state = 'leased' AND lease_expires > ? GROUP BY task",
+                (now,),
+            )
+        }
+        full = [task for task, limit in stage_limits.items() if running.get(task, 0) >= limit]
+
+        query = (
+            "SELECT * FROM jobs j WHERE "
+            "((j.state = 'pending' AND j.not_before <= ?) OR (j.state = 'leased' AND j.lease_expires <= ?)) "
+            "AND NOT EXISTS (SELECT 1 FROM job_deps d JOIN jobs u ON u.id = d.depends_on "
+            "                WHERE d.job_id = j.id AND u.state != 'done') "
+        )
+        args = [now, now]
+        if metadata_path:
+            query += "AND j.metadata_path = ? "
+            args.append(metadata_path)
+        if full:
+            query += f"AND j.task NOT IN ({','.join('?' * len(full))}) "
+            args += full
+        query += "ORDER BY j.id LIMIT 1"
+
+        row = conn.execute(query, args).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        upstream = conn.execute(
+            "SELECT u.output FROM job_deps d JOIN jobs u ON u.id = d.depends_on "
+            "WHERE d.job_id = ? AND u.output IS NOT NULL ORDER BY u.id LIMIT 1",
+            (row["id"],),
+        ).fetchone()
+
+        conn.execute(
+            "UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+            "attempts = attempts + 1, updated = ? WHERE id = ?",
+            (worker_id, now + lease_seconds, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    job = dict(row)
+    job["attempts"] += 1
+    if upstream:
+        job["input"] = upstream["output"]
+    return job
+
+
+def renew_lease(conn, job, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Extends the lease on a running job. Returns False if it was lost."""
+    cursor = conn.execute(
+        "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+        (time.time() + lease_seconds, time.time(), job["id"], job["lease_owner"]),
+    )
+    return cursor.rowcount == 1
+
+
+def complete_job(conn, job, output_path):
+    """
+    Marks a job done and records its output.
+
+    Returns:
+        bool: False if the lease was lost (another worker holds the job now);
+        nothing is written then.
+    """
+    now = time.time()
+    cursor = conn.execute(
+        "UPDATE jobs SET state = 'done', output = ?, lease_owner = NULL, lease_expires = NULL, "
+        "last_error = NULL, updated = ?, finished = ? WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+        (output_path, now, now, job["id"], job["lease_owner"]),
+    )
+    return cursor.rowcount == 1
+
+
+def fail_job(conn, job, error):
+    """
+    Schedules a retry with exponential backoff, or marks the job (and every
+    job downstream of it) failed once max_attempts is reached.
+
+    Returns:
+        str: The new state ("pending" or "failed"), or "lost" if the lease
+        was lost (another worker holds the job now; nothing is written).
+    """
+    now = time.time()
+    if job["attempts"] < job["max_attempts"]:
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (job["attempts"] - 1))
+        cursor = conn.execute(
+            "UPDATE jobs SET state = 'pending', not_before = ?, lease_owner = NULL, lease_expires = NULL, "
+            "last_error = ?, updated = ? WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+            (now + delay, error, now, job["id"], job["lease_owner"]),
+        )
+        if cursor.rowcount != 1:
+            return "lost"
+        logger.warning(f"🔁 Job {job['id']} ({job['task']}) retry {job['attempts']}/{job['max_attempts']} in {delay}s")
+        return "pending"
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cursor = conn.execute(
+            "UPDATE jobs SET state = 'failed', lease_owner = NULL, lease_expires = NULL, "
+            "last_error = ?, updated = ?, finished = ? WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+            (error, now, now, job["id"], job["lease_owner"]),
+        )
+        if cursor.rowcount != 1:
+            conn.execute("ROLLBACK")
+            return "lost"
+        _fail_downstream(conn, [job["id"]], now)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    logger.error(f"❌ Job {job['id']} ({job['task']}) failed permanently: {error}")
+    return "failed"
+
+
+def _execute_job(job):
+    """Runs one job in this process. Returns (output_path, error)."""
+    # Imported here so the status command never loads stage scripts
+    from task_runner import load_task_callable
+
+    script = os.path.join(REPO_ROOT, TASK_DISPATCH[job["task"]])
+    try:
+        output = load_task_callable(script)(job["input"])
+    except Exception as e:
+        logger.debug(traceback.format_exc())
+        return None, f"{type(e).__name__}: {e}"
+
+    if not output:
+        return None, "task returned no output"
+    return (output if isinstance(output, str) else None), None
+
+
+def run_worker(db_path=DEFAULT_DB_PATH, worker_id=None, stage_limits=None,
+               lease_seconds=DEFAULT_LEASE_SECONDS, poll_interval=5, stop_when_idle=False, metadata_path=None):
+    """
+    Claims and runs jobs until interrupted (or until the queue has nothing
+    runnable, when stop_when_idle is set).
+
+    Args:
+        db_path (str): Queue database.
+        worker_id (str): Lease owner name (defaults to host pid).
+        stage_limits (dict): task -> max concurrently leased jobs.
+        lease_seconds (int): Lease duration; renewed every third of it.
+        poll_interval (float): Sleep between empty claims.
+        stop_when_idle (bool): Exit when nothing is pending or leased.
+        metadata_path (str): Only run (and wait for) jobs of this metadata entry.
+
+    Returns:
+        int: Number of jobs processed by this worker.
+    """
+    worker_id = worker_id or f"worker-{os.getpid()}"
+    conn = init_queue(db_path)
+    processed = 0
+    logger.info(f"👷 {worker_id} started on {db_path}")
+
+    try:
+        while True:
+            job = claim_job(conn, worker_id, stage_limits, lease_seconds, metadata_path)
+            if job is None:
+                if stop_when_idle:
+                    active = conn.execute(
+                        "SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased')"
+                        + (" AND metadata_path = ?" if metadata_path else ""),
+                        (metadata_path,) if metadata_path else (),
+                    ).fetchone()[0]
+                    if not active:
+                        break
+                time.sleep(poll_interval)
+                continue
+
+            job["lease_owner"] = worker_id
+            logger.info(f"🚀 {worker_id} running job {job['id']}: {job['task']} ← {job['input']}")
+            record_task_state(job["metadata_path"], job["task"], "running")
+
+            # Keep the lease alive while long renders run
+            stop_heartbeat = threading.Event()
+
+            def heartbeat():
+                hb_conn = init_queue(db_path)
+                while not stop_heartbeat.wait(lease_seconds / 3):
+                    if not renew_lease(hb_conn, job, lease_seconds):
+                        logger.warning(f"⚠️ Lost lease on job {job['id']}")
+                        break
+                hb_conn.close()
+
+            hb_thread = threading.Thread(target=heartbeat, daemon=True)
+            hb_thread.start()
+            started = time.time()
+            try:
+                output_path, error = _execute_job(job)
+            finally:
+                stop_heartbeat.set()
+                hb_thread.join()
+
+            if error is None:
+                if complete_job(conn, job, output_path):
+                    record_task_state(job["metadata_path"], job["task"], "done", output_path)
+                    logger.info(f"✅ Job {job['id']} done in {time.time() - started:.1f}s → {output_path}")
+                else:
+                    logger.warning(f"⚠️ Job {job['id']} finished after its lease was taken over; result dropped")
+            else:
+                state = fail_job(conn, job, error)
+                if state == "lost":
+                    logger.warning(f"⚠️ Job {job['id']} failed after its lease was taken over; not recorded")
+                else:
+                    record_task_state(job["metadata_path"], job["task"], state)
+            processed += 1
+    except KeyboardInterrupt:
+        logger.info(f"🛑 {worker_id} interrupted")
+    finally:
+        conn.close()
+
+    logger.info(f"🏁 {worker_id} processed {processed} jobs")
+    return processed
+
+
+def queue_status(db_path=DEFAULT_DB_PATH, window_seconds=3600):
+    """
+    Summarizes the queue.
+
+    Args:
+        db_path (str): Queue database.
+        window_seconds (int): Window for throughput figures.
+
+    Returns:
+        dict: depth (pending + leased), counts per task and state, jobs finished
+              in the window, and throughput in jobs per minute.
+    """
+    conn = init_queue(db_path)
+    try:
+        now = time.time()
+        counts = {}
+        for row in conn.execute("SELECT task, state, COUNT(*) AS n FROM jobs GROUP BY task, state"):
+            counts.setdefault(row["task"], {})[row["state"]] = row["n"]
+
+        depth = conn.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased')").fetchone()[0]
+        finished = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state = 'done' AND finished >= ? AND attempts > 0",
+            (now - window_seconds,),
+        ).fetchone()[0]
+        failed = conn.execute(
+            "SELECT task, last_error, COUNT(*) AS n FROM jobs WHERE state = 'failed' "
+            "GROUP BY task, last_error ORDER BY n DESC LIMIT 10"
+        ).fetchall()
+
+        return {
+            "depth": depth,
+            "by_task": counts,
+            "finished_in_window": finished,
+            "throughput_per_min": finished / (window_seconds / 60),
+            "top_failures": [dict(row) for row in failed],
+        }
+    finally:
+        conn.close()
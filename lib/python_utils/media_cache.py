@@ -0,0 +1,208 @@
+# === MEDIA URL RESOLVER CACHE ===
+# --------------------------------------------------
+# Remembers which media file a podcast page resolves to, so repeat runs
+# skip yt-dlp, page scraping and browser launches and go straight to the
+# download.
+#
+# - Entries map page URL -> media URL, the request headers the download
+#   needs (e.g. Referer), content length, ETag and Last-Modified. They are
+#   stored in SQLite next to the other caches.
+# - An entry is used only while it is younger than its TTL (default one
+#   day; CDN links are often signed and expire).
+# - A fresh entry is validated with a single HEAD request. The entry is
+#   dropped and the page resolved again if the server answers with an
+#   error, or the length, ETag or Last-Modified changed.
+# - resolve_media() wraps any resolver (podcast_stream.resolve_audio_url,
+#   browser_pool.find_media, ...) with the cache.
+# --------------------------------------------------
+#
+# Function: open_media_cache(db_path: str) -> sqlite3.Connection
+#   Opens (and creates if needed) the resolver cache.
+#
+# Function: lookup_media(conn, page_url: str, ttl: float, validate: bool) -> dict | None
+#   Cached, still-valid resolution of a page, or None.
+#
+# Function: store_media(conn, page_url: str, media_url: str, headers: dict, probe: bool) -> dict
+#   Records a resolution (probing the media for length and validators).
+#
+# Function: resolve_media(page_url: str, resolver, conn, ttl: float, headers: dict) -> dict
+#   Cached lookup, falling back to resolver(page_url) -> media URL.
+# --------------------------------------------------
+
+import os
+import json
+import time
+import sqlite3
+import logging
+
+import requests
+
+from download_utils import DEFAULT_HEADERS, probe_remote_file
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEDIA_CACHE_PATH = "./cache/media_urls.sqlite3"
+DEFAULT_TTL = 24 * 3600
+VALIDATE_TIMEOUT = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_urls (
+    page_url       TEXT PRIMARY KEY,
+    media_url      TEXT NOT NULL,
+    headers        TEXT NOT NULL DEFAULT '{}',   -- JSON request headers for the download
+    content_length INTEGER,
+    etag           TEXT,
+    last_modified  TEXT,
+    resolved       REAL NOT NULL,
+    validated      REAL,
+    hits           INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def open_media_cache(db_path=DEFAULT_MEDIA_CACHE_PATH):
+    """
+    Opens (and creates if needed) the resolver cache.
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode with WAL enabled.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _entry(row):
+    return {
+        "page_url": row["page_url"],
+        "media_url": row["media_url"],
+        "headers": json.loads(row["headers"]),
+        "content_length": row["content_length"],
+        "etag": row["etag"],
+        "last_modified": row["last_modified"],
+        "resolved": row["resolved"],
+    }
+
+
+def _still_valid(entry, session=None):
+    """One HEAD request: the media must still be there, unchanged."""
+    http = session or requests
+    try:
+        response = http.head(entry["media_url"], headers={**DEFAULT_HEADERS, **entry["headers"]},
+                             allow_redirects=True, timeout=VALIDATE_TIMEOUT)
+    except requests.RequestException as e:
+        logger.info(f"♻️ Cached media URL unreachable ({e}); resolving again")
+        return False
+
+    if response.status_code == 405:  # HEAD not allowed: nothing to compare, trust the TTL
+        return True
+    if response.status_code >= 400:
+        logger.info(f"♻️ Cached media URL answered {response.status_code}; resolving again")
+        return False
+
+    length = response.headers.get("Content-Length")
+    if entry["content_length"] and length and length.isdigit() and int(length) != entry["content_length"]:
+        logger.info("♻️ Cached media changed size; resolving again")
+        return False
+    etag = response.headers.get("ETag")
+    if entry["etag"] and etag and etag != entry["etag"]:
+        logger.info("♻️ Cached media ETag changed; resolving again")
+        return False
+    last_modified = response.headers.get("Last-Modified")
+    if entry["last_modified"] and last_modified and last_modified != entry["last_modified"]:
+        logger.info("♻️ Cached media Last-Modified changed; resolving again")
+        return False
+    return True
+
+
+def lookup_media(conn, page_url, ttl=DEFAULT_TTL, validate=True, session=None):
+    """
+    Returns the cached resolution of a page, or None when there is none,
+    it is older than ttl, or (with validate) the HEAD check fails. Stale
+    and invalid entries are deleted.
+    """
+    row = conn.execute("SELECT * FROM media_urls WHERE page_url = ?", (page_url,)).fetchone()
+    if row is None:
+        return None
+
+    entry = _entry(row)
+    if time.time() - entry["resolved"] > ttl or (validate and not _still_valid(entry, session)):
+        conn.execute("DELETE FROM media_urls WHERE page_url = ?", (page_url,))
+        return None
+
+    conn.execute("UPDATE media_urls SET hits = hits + 1, validated = ? WHERE page_url = ?",
+                 (time.time() if validate else row["validated"], page_url))
+    return entry
+
+
+def store_media(conn, page_url, media_url, headers=None, probe=True, session=None):
+    """
+    Records page_url -> media_url. With probe, the media is asked (HEAD,
+    see download_utils.probe_remote_file) for its final URL, length and
+    validators first.
+
+    Returns:
+        dict: The stored entry.
+    """
+    headers = headers or {}
+    info = probe_remote_file(media_url, session=session, headers=headers) if probe else {}
+    entry = {
+        "page_url": page_url,
+        "media_url": info.get("url") or media_url,
+        "headers": headers,
+        "content_length": info.get("content_length"),
+        "etag": info.get("etag"),
+        "last_modified": info.get("last_modified"),
+        "resolved": time.time(),
+    }
+    conn.execute(
+        "INSERT OR REPLACE INTO media_urls "
+        "(page_url, media_url, headers, content_length, etag, last_modified, resolved) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (page_url, entry["media_url"], json.dumps(headers), entry["content_length"],
+         entry["etag"], entry["last_modified"], entry["resolved"]),
+    )
+    return entry
+
+
+def resolve_media(page_url, resolver, conn=None, ttl=DEFAULT_TTL, headers=None, validate=True):
+    """
+    Resolves a page to its media URL through the cache.
+
+    Args:
+        page_url (str): Podcast page URL.
+        resolver (callable): page_url -> media URL (raises or returns None on failure).
+        conn (sqlite3.Connection): From open_media_cache(); opened on demand
+            (and closed again) when None.
+        ttl (float): Maximum age of a cached entry in seconds.
+        headers (dict): Request headers the media download needs.
+        validate (bool): HEAD-check cached entries before using them.
+
+    Returns:
+        dict: Cache entry plus "from_cache" and "elapsed".
+
+    Raises:
+        RuntimeError: When the resolver finds no media URL.
+    """
+    start = time.perf_counter()
+    opened = conn is None
+    conn = conn or open_media_cache()
+    try:
+        entry = lookup_media(conn, page_url, ttl, validate)
+        if entry:
+            logger.info(f"⚡ Media URL from cache ({time.perf_counter() - start:.2f}s): {entry['media_url']}")
+            return {**entry, "from_cache": True, "elapsed": time.perf_counter() - start}
+
+        media_url = resolver(page_url)
+        if not media_url:
+            raise RuntimeError(f"No media URL found for {page_url}")
+        entry = store_media(conn, page_url, media_url, headers)
+        logger.info(f"🔎 Resolved media URL in {time.perf_counter() - start:.1f}s: {entry['media_url']}")
+        return {**entry, "from_cache": False, "elapsed": time.perf_counter() - start}
+    finally:
+        if opened:
+            conn.close()
@@ -0,0 +1,280 @@
+# === N-WAY TRANSCRIPT ALIGNMENT ===
+# --------------------------------------------------
+# Compares many versions of the same script (e.g. the same talk recorded in
+# different years) instead of exactly two transcripts.
+#
+# 1. Every pair of versions is diffed word by word (text_diff.diff_tokens)
+#    in a process pool, giving a similarity matrix.
+# 2. The version most similar to all others (the medoid) becomes the
+#    reference, unless one is given.
+# 3. Progressive alignment: starting from the reference, the remaining
+#    versions are added closest-first, each one diffed against the current
+#    consensus (the most common word in every column). Words that line up
+#    share a column; extra words open new columns with gaps for the others.
+# 4. Runs of columns where the versions disagree become the variant table:
+#    what each version says at that point, and which versions agree.
+# --------------------------------------------------
+#
+# Function: load_versions(paths: list[str]) -> dict[str, list[str]]
+#   Transcript name -> words. Names are file names without .full.txt/.txt;
+#   files that would share a name get their parent directories prefixed
+#   (2019/talk, 2025/talk).
+#
+# Function: similarity_matrix(versions: dict, workers: int) -> dict[tuple, float]
+#   Pairwise word-level similarity, computed in parallel.
+#
+# Function: align_versions(versions: dict, reference: str, workers: int) -> dict
+#   Progressive multiple alignment, variant table and per-version agreement.
+#
+# Function: write_variant_report(result: dict, output_dir: str) -> dict
+#   Writes variants.json and variants.md.
+# --------------------------------------------------
+
+import os
+import json
+import logging
+from itertools import combinations
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from text_diff import tokenize_for_diff, normalize_word, diff_tokens, diff_stats
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+MAX_CELL_CHARS = 300   # longer readings are truncated in the markdown table (not in JSON)
+
+
+def _version_names(paths):
+    """
+    File names without .full.txt/.txt, with as many parent directories
+    prefixed as it takes to tell colliding names apart.
+
+    Raises:
+        ValueError: When the same file is listed more than once.
+    """
+    full_paths = [os.path.abspath(path) for path in paths]
+    repeated = [path for path, count in Counter(full_paths).items() if count > 1]
+    if repeated:
+        raise ValueError(f"Transcripts listed more than once: {', '.join(repeated)}")
+
+    parts = [path.split(os.sep) for path in full_paths]
+    stems = []
+    for path in full_paths:
+        name = os.path.basename(path)
+        for suffix in (".full.txt", ".txt"):
+            if name.endswith(suffix):
+                name = name[: -len(suffix)]
+                break
+        stems.append(name)
+
+    depth = [0] * len(paths)  # parent directories in the name
+    while True:
+        names = ["/".join(part[len(part) - 1 - d:-1] + [stem]) if d < len(part) - 1 else path
+                 for part, d, stem, path in zip(parts, depth, stems, full_paths)]
+        counts = Counter(names)
+        clashes = [i for i, name in enumerate(names) if counts[name] > 1]
+        if not clashes:
+            return names
+        for i in clashes:
+            depth[i] += 1
+
+
+def load_versions(paths):
+    """
+    Reads transcripts as word lists.
+
+    Returns:
+        dict: version name -> words. The name is the file name without
+        .full.txt/.txt, prefixed with parent directories where two files
+        would otherwise share it (e.g. "2019/talk" and "2025/talk").
+
+    Raises:
+        ValueError: When the same file is listed more than once.
+    """
+    versions = {}
+    for path, name in zip(paths, _version_names(paths)):
+        with open(path, "r", encoding="utf-8") as f:
+            versions[name] = tokenize_for_diff(f.read())
+    return versions
+
+
+def _pair_similarity(task):
+    name_a, name_b, words_a, words_b = task
+    return name_a, name_b, diff_stats(diff_tokens(words_a, words_b))["similarity"]
+
+
+def similarity_matrix(versions, workers=None):
+    """
+    Word-level similarity of every pair of versions.
+
+    Args:
+        versions (dict): name -> words.
+        workers (int): Worker processes; None = one per core, 1 = run inline.
+
+    Returns:
+        dict: (name_a, name_b) -> similarity, both orders present.
+    """
+    tasks = [(a, b, versions[a], versions[b]) for a, b in combinations(versions, 2)]
+    if workers == 1 or len(tasks) < 2:
+        results = map(_pair_similarity, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_pair_similarity, tasks))
+
+    matrix = {}
+    for name_a, name_b, similarity in results:
+        matrix[(name_a, name_b)] = matrix[(name_b, name_a)] = similarity
+    for name in versions:
+        matrix[(name, name)] = 1.0
+    return matrix
+
+
+def _consensus(column):
+    """Most common word in a column (by comparison key), or None for an all-gap column."""
+    words = [w for w in column if w is not None]
+    if not words:
+        return None
+    key, _ = Counter(normalize_word(w) for w in words).most_common(1)[0]
+    return next(w for w in words if normalize_word(w) == key)
+
+
+def _add_version(columns, width, words):
+    """Aligns one more version against the consensus of the columns so far."""
+    consensus = [_consensus(col) or "" for col in columns]
+    gap = [None] * width
+    merged = []
+    for tag, i1, i2, j1, j2 in diff_tokens(consensus, words):
+        if tag == "equal":
+            merged.extend(columns[i1 + k] + [words[j1 + k]] for k in range(i2 - i1))
+        elif tag == "delete":
+            merged.extend(columns[i] + [None] for i in range(i1, i2))
+        elif tag == "insert":
+            merged.extend(gap + [words[j]] for j in range(j1, j2))
+        else:
+            for k in range(max(i2 - i1, j2 - j1)):
+                column = columns[i1 + k] if i1 + k < i2 else gap
+                merged.append(column + [words[j1 + k] if j1 + k < j2 else None])
+    return merged
+
+
+def _variants(columns, names):
+    """Groups consecutive disagreeing columns into variant rows."""
+    variants = []
+    current = None
+    for index, column in enumerate(columns):
+        keys = {normalize_word(w) if w is not None else None for w in column}
+        if len(keys) == 1:
+            current = None
+            continue
+        if current is None:
+            current = {"column": index, "columns": []}
+            variants.append(current)
+        current["columns"].append(column)
+
+    rows = []
+    for variant in variants:
+        readings = {
+            name: " ".join(col[n] for col in variant["columns"] if col[n] is not None)
+            for n, name in enumerate(names)
+        }
+        consensus = " ".join(w for w in (_consensus(col) for col in variant["columns"]) if w)
+        groups = {}
+        for name, reading in readings.items():
+            groups.setdefault(reading, []).append(name)
+        rows.append({
+            "column": variant["column"],
+            "length": len(variant["columns"]),
+            "consensus": consensus,
+            "readings": readings,
+            "groups": [{"reading": r, "versions": v} for r, v in sorted(groups.items(), key=lambda g: -len(g[1]))],
+        })
+    return rows
+
+
+def align_versions(versions, reference=None, workers=None):
+    """
+    Progressive multiple alignment of many transcript versions.
+
+    Args:
+        versions (dict): name -> words (see load_versions()).
+        reference (str): Version to start from; defaults to the medoid.
+        workers (int): Processes for the pairwise similarity matrix.
+
+    Returns:
+        dict: {"reference", "order", "matrix", "columns", "agreement", "variants"}
+    """
+    if len(versions) < 2:
+        raise ValueError("Need at least two versions to compare")
+
+    names = list(versions)
+    logger.info(f"🔢 Pairwise similarity for {len(names)} versions ({len(names) * (len(names) - 1) // 2} pairs)...")
+    matrix = similarity_matrix(versions, workers)
+
+    if reference is None:
+        reference = max(names, key=lambda n: sum(matrix[(n, other)] for other in names))
+    elif reference not in versions:
+        raise ValueError(f"Unknown reference version: {reference}")
+    order = [reference] + sorted((n for n in names if n != reference), key=lambda n: -matrix[(reference, n)])
+    logger.info(f"📌 Reference: {reference}; alignment order: {', '.join(order[1:])}")
+
+    columns = [[word] for word in versions[reference]]
+    for width, name in enumerate(order[1:], start=1):
+        columns = _add_version(columns, width, versions[name])
+        logger.info(f"➕ Aligned {name} ({len(columns)} columns)")
+
+    consensus = [normalize_word(_consensus(col)) for col in columns]
+    agreement = {
+        name: sum(1 for col, key in zip(columns, consensus) if col[n] is not None and normalize_word(col[n]) == key)
+        / max(1, len(columns))
+        for n, name in enumerate(order)
+    }
+
+    return {
+        "reference": reference,
+        "order": order,
+        "matrix": {f"{a} ↔ {b}": round(s, 4) for (a, b), s in matrix.items() if a < b},
+        "columns": len(columns),
+        "agreement": agreement,
+        "variants": _variants(columns, order),
+    }
+
+
+def _cell(text):
+    text = text.replace("|", "\\|").replace("\n", " ") or "—"
+    return text if len(text) <= MAX_CELL_CHARS else text[:MAX_CELL_CHARS] + "…"
+
+
+def write_variant_report(result, output_dir):
+    """
+    Writes the alignment result as variants.json (complete) and variants.md
+    (similarity matrix, agreement per version and the variant table).
+
+    Returns:
+        dict: {"json": path, "markdown": path}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, "variants.json")
+    md_path = os.path.join(output_dir, "variants.md")
+
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    order = result["order"]
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write(f"# Version comparison\n\nReference: **{result['reference']}** — "
+                f"{result['columns']} aligned columns, {len(result['variants'])} variant passages\n\n")
+        f.write("## Agreement with consensus\n\n| version | agreement |\n|---|---|\n")
+        for name in order:
+            f.write(f"| {name} | {result['agreement'][name]:.1%} |\n")
+        f.write("\n## Pairwise similarity\n\n| pair | similarity |\n|---|---|\n")
+        for pair, similarity in sorted(result["matrix"].items(), key=lambda p: -p[1]):
+            f.write(f"| {pair} | {similarity:.3f} |\n")
+        f.write("\n## Variants\n\n| column | consensus | " + " | ".join(order) + " |\n")
+        f.write("|---" * (len(order) + 2) + "|\n")
+        for row in result["variants"]:
+            cells = [_cell(row["readings"][name]) for name in order]
+            f.write(f"| {row['column']} | {_cell(row['consensus'])} | " + " | ".join(cells) + " |\n")
+
+    logger.info(f"📄 Variant table written to {md_path}")
+    return {"json": json_path, "markdown": md_path}
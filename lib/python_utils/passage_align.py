@@ -0,0 +1,232 @@
+# === PASSAGE-LEVEL TRANSCRIPT ↔ ARTICLE ALIGNMENT ===
+# --------------------------------------------------
+# Finds which transcript sentences/segments reuse which article paragraphs.
+#
+# Every article paragraph is fingerprinted once by its 3-word shingles and put
+# into an inverted index (shingle -> paragraphs). Each transcript segment then
+# looks up only its own shingles, so candidate filtering costs
+# O(segment shingles × posting length) per segment — linear in the transcript.
+# Only the best few candidates per segment get an exact token alignment, which
+# yields the character span inside the article and the final score.
+#
+# Score = share of the segment's normalized characters found, in order, in the
+# paragraph (1.0 = the whole sentence appears in the article).
+# --------------------------------------------------
+#
+# Function: split_paragraphs(text: str) -> list[dict]
+#   Paragraphs with their character offsets in the article.
+#
+# Function: load_segments(path: str) -> list[dict]
+#   Reads a transcript (chunk_sentences JSON, Whisper result, minute JSON) as
+#   [{"start", "end", "text"}].
+#
+# Function: build_passage_index(articles: dict[str, str]) -> dict
+#   Fingerprints every paragraph of every article.
+#
+# Function: align_segments(index: dict, segments: list, min_score: float, top_k: int) -> list[dict]
+#   Timestamp → article span matches with scores.
+# --------------------------------------------------
+
+import re
+import json
+import logging
+from collections import Counter
+from difflib import SequenceMatcher
+
+from text_similarity import tokenize_with_offsets, shingle_hashes
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+MIN_SCORE = 0.5          # share of a segment that must be found in the paragraph
+MAX_POSTINGS = 200       # shingles in more paragraphs than this are boilerplate
+CANDIDATES = 3           # paragraphs aligned exactly per segment
+MAX_SEGMENT_WORDS = 60   # longer segments (e.g. minute chunks) are split into sentences
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_MINUTE_KEY_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)\s*s?\s*$")
+
+
+def split_paragraphs(text):
+    """
+    Splits an article into paragraphs on blank lines (single newlines when
+    the text has no blank lines).
+
+    Returns:
+        list[dict]: {"start", "end", "text"} with offsets into `text`.
+    """
+    separator = r"\n\s*\n" if re.search(r"\n\s*\n", text) else r"\n"
+    paragraphs = []
+    cursor = 0
+    for match in list(re.finditer(separator, text)) + [None]:
+        end = match.start() if match else len(text)
+        chunk = text[cursor:end]
+        if chunk.strip():
+            lead = len(chunk) - len(chunk.lstrip())
+            paragraphs.append({
+                "start": cursor + lead,
+                "end": cursor + len(chunk.rstrip()),
+                "text": chunk.strip(),
+            })
+        cursor = match.end() if match else len(text)
+    return paragraphs
+
+
+def load_segments(path):
+    """
+    Reads a transcript in any of the formats the pipeline writes.
+
+    Supports chunk_sentences output ([{"text", "start", "end"}]), a Whisper
+    result ({"segments": [...]}), and minute JSON ({"0-60s": "text"} or
+    {"0-60s": {"text": ...}}).
+
+    Returns:
+        list[dict]: {"start", "end", "text"} in transcript order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if isinstance(data, dict) and isinstance(data.get("segments"), list):
+        data = data["segments"]
+
+    if isinstance(data, list):
+        return [
+            {"start": item.get("start"), "end": item.get("end"), "text": item.get("text", "").strip()}
+            for item in data if isinstance(item, dict) and item.get("text", "").strip()
+        ]
+
+    if isinstance(data, dict):
+        segments = []
+        for key, value in data.items():
+            text = value.get("text", "") if isinstance(value, dict) else str(value)
+            match = _MINUTE_KEY_RE.match(key)
+            start, end = (float(match.group(1)), float(match.group(2))) if match else (None, None)
+            if text.strip():
+                segments.append({"start": start, "end": end, "text": text.strip()})
+        return sorted(segments, key=lambda s: (s["start"] is None, s["start"] or 0))
+
+    logger.error(f"❌ Unrecognized transcript format: {path}")
+    return []
+
+
+def build_passage_index(articles, max_postings=MAX_POSTINGS):
+    """
+    Fingerprints every paragraph of every article.
+
+    Args:
+        articles (dict): article name -> text.
+        max_postings (int): Paragraph frequency above which a shingle is ignored.
+
+    Returns:
+        dict: {"paragraphs": [...], "postings": shingle -> [paragraph ids], "max_postings": int}
+    """
+    index = {"paragraphs": [], "postings": {}, "max_postings": max_postings}
+    for name, text in articles.items():
+        for number, para in enumerate(split_paragraphs(text), start=1):
+            tokens, offsets = tokenize_with_offsets(para["text"])
+            if not tokens:
+                continue
+            pid = len(index["paragraphs"])
+            index["paragraphs"].append({
+                "article": name,
+                "paragraph": number,
+                "start": para["start"],
+                "text": para["text"],
+                "tokens": tokens,
+                "offsets": offsets,
+            })
+            for shingle in set(shingle_hashes(tokens)):
+                index["postings"].setdefault(shingle, []).append(pid)
+    logger.info(f"📚 Indexed {len(index['paragraphs'])} paragraphs from {len(articles)} articles")
+    return index
+
+
+def _align(segment_tokens, para):
+    """Exact token alignment of a segment inside one paragraph."""
+    matcher = SequenceMatcher(None, segment_tokens, para["tokens"], autojunk=False)
+    blocks = [b for b in matcher.get_matching_blocks() if b.size]
+    if not blocks:
+        return 0.0, None
+    matched = sum(len(t) + 1 for b in blocks for t in segment_tokens[b.a:b.a + b.size])
+    total = sum(len(t) + 1 for t in segment_tokens)
+    first, last = blocks[0], blocks[-1]
+    span = (
+        para["start"] + para["offsets"][first.b][0],
+        para["start"] + para["offsets"][last.b + last.size - 1][1],
+    )
+    return matched / total, span
+
+
+def _split_long(segment):
+    """
+    Splits a long segment into sentences, interpolating timestamps by
+    character position, so each piece can match its own paragraph.
+    """
+    text = segment["text"]
+    if len(text.split()) <= MAX_SEGMENT_WORDS:
+        return [segment]
+    start, end = segment.get("start"), segment.get("end")
+    pieces, cursor = [], 0
+    for sentence in _SENTENCE_RE.split(text):
+        offset = text.find(sentence, cursor)
+        cursor = offset + len(sentence)
+        if start is None or end is None:
+            times = (None, None)
+        else:
+            times = tuple(round(start + (end - start) * pos / len(text), 2) for pos in (offset, cursor))
+        if sentence.strip():
+            pieces.append({**segment, "start": times[0], "end": times[1], "text": sentence.strip()})
+    return pieces
+
+
+def align_segments(index, segments, min_score=MIN_SCORE, top_k=1):
+    """
+    Matches each transcript segment against the paragraph index.
+
+    Args:
+        index (dict): From build_passage_index().
+        segments (list[dict]): {"start", "end", "text"} from load_segments()/chunk_sentences.
+            Segments longer than MAX_SEGMENT_WORDS are split into sentences first.
+        min_score (float): Minimum share of the segment found in the paragraph.
+        top_k (int): Matches kept per segment.
+
+    Returns:
+        list[dict]: One row per segment with a match:
+            {"start", "end", "text", "matches": [{"article", "paragraph",
+             "span": [start, end], "excerpt", "score"}]}
+    """
+    rows = []
+    segments = [piece for segment in segments for piece in _split_long(segment)]
+    for segment in segments:
+        tokens, _ = tokenize_with_offsets(segment["text"])
+        shingles = set(shingle_hashes(tokens))
+        if not shingles:
+            continue
+
+        shared = Counter()
+        for shingle in shingles:
+            pids = index["postings"].get(shingle)
+            if pids and len(pids) <= index["max_postings"]:
+                shared.update(pids)
+        if not shared:
+            continue
+
+        matches = []
+        for pid, count in shared.most_common(CANDIDATES):
+            if count / len(shingles) < min_score / 2:
+                break  # too little n-gram overlap to be worth aligning
+            para = index["paragraphs"][pid]
+            score, span = _align(tokens, para)
+            if score >= min_score:
+                matches.append({
+                    "article": para["article"],
+                    "paragraph": para["paragraph"],
+                    "span": list(span),
+                    "excerpt": para["text"][span[0] - para["start"]:span[1] - para["start"]],
+                    "score": round(score, 3),
+                })
+        if matches:
+            matches.sort(key=lambda m: -m["score"])
+            rows.append({**segment, "matches": matches[:top_k]})
+
+    logger.info(f"🔗 {len(rows)}/{len(segments)} segments matched an article passage")
+    return rows
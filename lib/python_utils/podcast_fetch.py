@@ -0,0 +1,134 @@
+# === PODCAST MP3 FETCH (SELENIUM) ===
+# --------------------------------------------------
+# Shared flow behind bin/fetch_podcast_with_selenium.py and its
+# 1030fetch_/etch_ copies, which are thin wrappers around main().
+#
+# - Pages resolved on an earlier run come from the media URL cache (one
+#   HEAD check each); only the rest are opened on a warm browser pool.
+# - The mp3s are downloaded concurrently through download_file. Each goes
+#   to a name derived from its URL (basename plus a short URL hash), so two
+#   episodes that share a basename never overwrite each other, and a rerun
+#   finds the same .part to resume (or the finished file to skip).
+#
+# Requires: pip install selenium requests (and Chrome)
+# --------------------------------------------------
+#
+# Function: download_mp3(media: dict, download_dir: str) -> str | None
+#   Downloads one resolved media entry to its per-URL path in download_dir.
+#
+# Function: fetch_mp3s_from_pages(urls: list[str], download_dir: str, pool_size: int) -> list[str | None]
+#   Resolves (cache, then browser pool) and downloads the mp3 of every page.
+#
+# Function: fetch_mp3_from_page(url: str, download_dir: str) -> str | None
+#   fetch_mp3s_from_pages() for a single page.
+#
+# Function: main(argv: list[str]) -> int
+#   CLI: <podcast_url> ... [--pool=N] [--out=dir]
+# --------------------------------------------------
+
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from download_utils import download_file
+from browser_pool import fetch_media_urls, DEFAULT_POOL_SIZE
+from media_cache import open_media_cache, lookup_media, store_media
+
+DEFAULT_DOWNLOAD_DIR = "downloads"
+
+
+def _output_path(mp3_url, download_dir):
+    """<basename>_<url hash><ext>: the same path for the same URL on every run."""
+    base, ext = os.path.splitext(os.path.basename(mp3_url.split("?")[0]) or "podcast.mp3")
+    url_key = hashlib.sha1(mp3_url.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(download_dir, f"{base}_{url_key}{ext or '.mp3'}")
+
+
+def download_mp3(media, download_dir=DEFAULT_DOWNLOAD_DIR):
+    """
+    Downloads a resolved media entry (from lookup_media/store_media).
+
+    A file already downloaded from the same URL (with the expected size) is
+    kept; a partial left by a failed run is resumed.
+
+    Returns:
+        str | None: Path of the downloaded file, None on failure.
+    """
+    mp3_url = media["media_url"]
+    filename = _output_path(mp3_url, download_dir)
+    if os.path.exists(filename) and (not media["content_length"]
+                                     or os.path.getsize(filename) == media["content_length"]):
+        print(f"[⚡] Already downloaded: {filename}")
+        return filename
+    print(f"[🎧] Downloading {mp3_url} to {filename}")
+
+    params = {"url": mp3_url, "output_path": filename, "headers": media["headers"]}
+    if media["content_length"]:
+        params["expected_size"] = media["content_length"]
+    if not download_file(params):
+        # download_file drops partials it cannot trust; the rest resume next run
+        print(f"[❌] Download failed: {mp3_url}")
+        return None
+
+    print(f"[✅] Download complete: {filename}")
+    return filename
+
+
+def fetch_mp3s_from_pages(urls, download_dir=DEFAULT_DOWNLOAD_DIR, pool_size=DEFAULT_POOL_SIZE):
+    """
+    Finds the mp3 of every page, then downloads them concurrently.
+
+    Returns:
+        list[str | None]: One downloaded path (or None) per page whose mp3
+        was found, in input order.
+    """
+    os.makedirs(download_dir, exist_ok=True)
+    cache = open_media_cache()
+
+    found = []
+    for url in urls:
+        media = lookup_media(cache, url)
+        if media:
+            print(f"[⚡] Cached: {url} → {media['media_url']}")
+            found.append(media)
+    cached = {media["page_url"] for media in found}
+    todo = [url for url in urls if url not in cached]
+
+    if todo:
+        print(f"[🌐] Checking {len(todo)} page(s) with up to {pool_size} headless Chrome instances...")
+        for page in fetch_media_urls(todo, pool_size):
+            if page["media_url"]:
+                found.append(store_media(cache, page["url"], page["media_url"], {"Referer": page["url"]}))
+    cache.close()
+    if len(found) < len(urls):
+        print(f"[❌] No .mp3 files found on {len(urls) - len(found)} page(s).")
+
+    order = {url: i for i, url in enumerate(urls)}
+    found.sort(key=lambda media: order[media["page_url"]])
+    with ThreadPoolExecutor(max_workers=max(1, pool_size)) as executor:
+        return list(executor.map(lambda media: download_mp3(media, download_dir), found))
+
+
+def fetch_mp3_from_page(url, download_dir=DEFAULT_DOWNLOAD_DIR):
+    files = fetch_mp3s_from_pages([url], download_dir, pool_size=1)
+    return files[0] if files else None
+
+
+def _get_option(argv, name, default=None):
+    for arg in argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main(argv):
+    """Command line entry point shared by the Selenium fetch scripts. Returns the exit code."""
+    podcast_urls = [arg for arg in argv[1:] if not arg.startswith("--")]
+    if not podcast_urls:
+        print(f"Usage: python {os.path.basename(argv[0])} <podcast_url> [<podcast_url> ...] "
+              f"[--pool={DEFAULT_POOL_SIZE}] [--out={DEFAULT_DOWNLOAD_DIR}]")
+        return 1
+
+    files = fetch_mp3s_from_pages(podcast_urls, _get_option(argv, "out", DEFAULT_DOWNLOAD_DIR),
+                                  int(_get_option(argv, "pool", DEFAULT_POOL_SIZE)))
+    return 0 if len(files) == len(podcast_urls) and all(files) else 1
@@ -0,0 +1,286 @@
+# === STREAMING PODCAST TRANSCRIPTION ===
+# --------------------------------------------------
+# Transcribes a podcast while it downloads instead of after.
+#
+# 1. The page URL is resolved to a direct audio URL: the URL itself for
+#    .mp3/.m4a/..., else yt-dlp -g, else the first .mp3 link on the page.
+#    Resolutions are cached (media_cache), so repeat runs of an episode
+#    only pay for one HEAD request.
+# 2. A download thread streams the bytes into the output file and into
+#    ffmpeg's stdin. ffmpeg decodes them to 16 kHz mono PCM as they arrive,
+#    and a reader thread queues the PCM, so transcription never stalls the
+#    download.
+# 3. PCM is buffered. Once WINDOW_SECONDS are available, Whisper transcribes
+#    the buffer. Every segment except the last is emitted. The last one may
+#    be cut off at the window edge, so its audio is carried into the next
+#    window.
+#
+# Segments are appended to the transcript files as they are produced, so
+# the first text appears after one window rather than after the whole
+# episode. The language is detected on the first window and pinned.
+# When the consumer stops early (an error, or closing the generator), the
+# download thread is told to stop and ffmpeg is killed, so the rest of the
+# episode is not downloaded.
+# --------------------------------------------------
+#
+# Function: resolve_audio_url(page_url: str) -> str
+#   Direct audio URL for a podcast page.
+#
+# Function: iter_pcm(audio_url: str, save_path: str, block_seconds: float, headers: dict) -> Iterator[np.ndarray]
+#   Float32 16 kHz PCM blocks decoded while the file downloads.
+#
+# Function: stream_transcribe(page_url: str, run_dir: str, model_name: str, language: str) -> dict
+#   Downloads, decodes and transcribes concurrently; writes transcript files incrementally.
+# --------------------------------------------------
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+import subprocess
+from urllib.parse import urlparse
+
+from download_utils import DEFAULT_HEADERS, DEFAULT_TIMEOUT, MIN_CHUNK_SIZE
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30          # Whisper's native window
+MIN_CARRY_PROGRESS = 5.0     # emit everything if the last segment starts earlier than this
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".aac", ".ogg", ".opus", ".wav", ".flac")
+_MP3_LINK_RE = re.compile(r'https?://[^"\'\s<>]+\.mp3[^"\'\s<>]*')
+
+
+def resolve_audio_url(page_url):
+    """
+    Finds the direct audio URL for a podcast page.
+
+    Raises:
+        RuntimeError: When no audio URL can be found.
+    """
+    if page_url.lower().split("?")[0].endswith(AUDIO_EXTENSIONS):
+        return page_url
+
+    try:
+        out = subprocess.run(["yt-dlp", "-g", "-f", "bestaudio/best", page_url],
+                             capture_output=True, text=True, check=True, timeout=120).stdout.split()
+        if out:
+            return out[0]
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"[yt-dlp] Could not resolve audio URL: {e}")
+
+    from scraper import fetch
+
+    logger.info("Falling back to scraping for .mp3...")
+    result = fetch(page_url, cache_dir=None)
+    links = _MP3_LINK_RE.findall(result["text"]) if result else []
+    if not links:
+        raise RuntimeError("Could not retrieve podcast audio.")
+    return links[0]
+
+
+def _download_into(audio_url, save_path, ffmpeg_stdin, state, headers=None):
+    """Download thread: streams the response into the file and ffmpeg."""
+    from scraper import get_session
+
+    try:
+        with get_session().get(audio_url, headers={**DEFAULT_HEADERS, **(headers or {})}, stream=True, timeout=DEFAULT_TIMEOUT) as response:
+            response.raise_for_status()
+            with open(save_path, "wb") if save_path else open(os.devnull, "wb") as out:
+                for chunk in response.iter_content(MIN_CHUNK_SIZE):
+                    if state["stop"].is_set():
+                        break
+                    out.write(chunk)
+                    ffmpeg_stdin.write(chunk)
+                    state["bytes"] += len(chunk)
+    except Exception as e:
+        state["error"] = e
+    finally:
+        try:
+            ffmpeg_stdin.close()
+        except OSError:
+            pass
+
+
+def _drain(stream, block_bytes, blocks):
+    """Reader thread: moves decoded PCM off ffmpeg's stdout as soon as it appears."""
+    while True:
+        data = stream.read(block_bytes)
+        if not data:
+            break
+        blocks.put(data)
+    blocks.put(None)
+
+
+def iter_pcm(audio_url, save_path=None, block_seconds=1.0, headers=None):
+    """
+    Yields decoded audio while the file is still downloading.
+
+    ffmpeg's output is drained by a reader thread into a queue, so a slow
+    consumer (Whisper) never back-pressures the download.
+
+    Args:
+        audio_url (str): Direct audio URL.
+        save_path (str): Where to keep the downloaded file (None = discard).
+        block_seconds (float): Size of the yielded blocks.
+        headers (dict): Extra request headers for the download.
+
+    Yields:
+        np.ndarray: float32 mono samples at 16 kHz.
+
+    Raises:
+        RuntimeError: When the download fails or ffmpeg exits with an error
+        (e.g. a truncated or undecodable file).
+    """
+    import queue
+    import numpy as np
+
+    proc = subprocess.Popen(
+        ["ffmpeg", "-v", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    state = {"bytes": 0, "error": None, "stop": threading.Event()}
+    blocks = queue.Queue()
+    block_bytes = int(SAMPLE_RATE * block_seconds) * 2
+    threads = [
+        threading.Thread(target=_download_into, args=(audio_url, save_path, proc.stdin, state, headers), daemon=True),
+        threading.Thread(target=_drain, args=(proc.stdout, block_bytes, blocks), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    pending = b""
+    finished = False
+    try:
+        while True:
+            data = blocks.get()
+            if data is None:
+                finished = True
+                break
+            data = pending + data
+            usable = len(data) // 2 * 2
+            pending = data[usable:]
+            yield np.frombuffer(data[:usable], np.int16).astype(np.float32) / 32768.0
+    finally:
+        if not finished:
+            # Consumer gave up: stop the download instead of fetching the rest
+            state["stop"].set()
+            proc.kill()
+        for thread in threads:
+            thread.join()
+        proc.stdout.close()
+        proc.wait()
+
+    if state["error"]:
+        raise RuntimeError(f"Download failed after {state['bytes']} bytes: {state['error']}")
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {audio_url} (exit code {proc.returncode})")
+    logger.info(f"⬇️ Downloaded {state['bytes'] / 1e6:.1f} MB{f' to {save_path}' if save_path else ''}")
+
+
+def stream_transcribe(page_url, run_dir, model_name="base", language=None, window_seconds=WINDOW_SECONDS):
+    """
+    Transcribes a podcast while it downloads.
+
+    Writes, incrementally:
+        <run_dir>/podcast<ext>        the downloaded audio, with the media URL's
+                                      extension (.mp3 when it has none)
+        <run_dir>/transcript.txt      one line per segment
+        <run_dir>/segments.jsonl      {"start", "end", "text"} per segment
+
+    Args:
+        page_url (str): Podcast page or direct audio URL.
+        run_dir (str): Output directory.
+        model_name (str): Whisper model.
+        language (str): Language code; detected on the first window when None.
+        window_seconds (float): Audio transcribed per Whisper call.
+
+    Returns:
+        dict: {"audio_path", "transcript_path", "segments_path", "language",
+               "segments", "text", "first_text_seconds", "elapsed"}
+    """
+    import numpy as np
+    from media_cache import resolve_media
+    from transcription_utils import load_whisper_model
+
+    os.makedirs(run_dir, exist_ok=True)
+    transcript_path = os.path.join(run_dir, "transcript.txt")
+    segments_path = os.path.join(run_dir, "segments.jsonl")
+
+    media = resolve_media(page_url, resolve_audio_url)
+    audio_url = media["media_url"]
+    extension = os.path.splitext(urlparse(audio_url).path)[1].lower()
+    audio_path = os.path.join(run_dir, "podcast" + (extension if extension in AUDIO_EXTENSIONS else ".mp3"))
+    logger.info(f"🎧 Streaming {audio_url}")
+    model = load_whisper_model(model_name)
+    fp16 = model.device.type == "cuda"
+
+    start = time.perf_counter()
+    first_text = None
+    segments = []
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0.0  # seconds of audio before buffer[0]
+
+    with open(transcript_path, "w", encoding="utf-8") as transcript_file, \
+            open(segments_path, "w", encoding="utf-8") as segments_file:
+
+        def transcribe_buffer(final):
+            nonlocal buffer, offset, language, first_text
+            prompt = " ".join(seg["text"] for seg in segments[-3:]) or None
+            result = model.transcribe(buffer, language=language, fp16=fp16, initial_prompt=prompt,
+                                      condition_on_previous_text=False)
+            if language is None:
+                language = result["language"]
+                logger.info(f"🌍 Language: {language} (pinned for the rest of the episode)")
+
+            window = result["segments"]
+            # Carry the last (possibly cut) segment's audio into the next window
+            if not final and len(window) > 1 and window[-1]["start"] >= MIN_CARRY_PROGRESS:
+                keep_from = window[-1]["start"]
+                window = window[:-1]
+            else:
+                keep_from = len(buffer) / SAMPLE_RATE
+
+            for seg in window:
+                text = seg["text"].strip()
+                if not text:
+                    continue
+                entry = {"start": round(float(offset + seg["start"]), 2),
+                         "end": round(float(offset + seg["end"]), 2), "text": text}
+                segments.append(entry)
+                transcript_file.write(text + "\n")
+                segments_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            transcript_file.flush()
+            segments_file.flush()
+
+            if first_text is None and segments:
+                first_text = time.perf_counter() - start
+                logger.info(f"🕐 First text after {first_text:.1f}s: {segments[0]['text'][:80]}")
+            logger.info(f"📝 {offset + keep_from:.0f}s transcribed ({len(segments)} segments)")
+
+            cut = int(keep_from * SAMPLE_RATE)
+            buffer = buffer[cut:]
+            offset += cut / SAMPLE_RATE
+
+        for block in iter_pcm(audio_url, audio_path, headers=media["headers"]):
+            buffer = np.concatenate([buffer, block])
+            if len(buffer) >= window_seconds * SAMPLE_RATE:
+                transcribe_buffer(final=False)
+        if len(buffer):
+            transcribe_buffer(final=True)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"✅ Transcribed {offset:.0f}s of audio in {elapsed:.1f}s → {transcript_path}")
+    return {
+        "audio_path": audio_path,
+        "transcript_path": transcript_path,
+        "segments_path": segments_path,
+        "language": language,
+        "segments": segments,
+        "text": " ".join(seg["text"] for seg in segments),
+        "first_text_seconds": first_text,
+        "elapsed": elapsed,
+    }
@@ -0,0 +1,432 @@
+# === ARTICLE SCRAPING ===
+# --------------------------------------------------
+# One place for fetching and extracting editorial articles (previously copied
+# into transcription_utils, whisper_utils, compare_sources and mim).
+#
+# - A shared requests.Session with a sized connection pool and retries on
+#   transient errors, so repeated fetches reuse TCP/TLS connections.
+# - An on-disk HTTP cache (./cache/http by default). Cached responses are
+#   revalidated with If-None-Match / If-Modified-Since; a 304 reuses the
+#   stored body. When the network fails, a stale cached copy is served.
+# - Concurrent fetching with a global worker limit plus a per-host limit,
+#   so one site is never hit by more than a couple of requests at once.
+#
+# Requires: pip install requests beautifulsoup4 lxml
+# --------------------------------------------------
+#
+# Function: get_session(pool_size: int) -> requests.Session
+#   Shared, connection-pooled session (one per pool size).
+#
+# Function: fetch(url: str, cache_dir: str, timeout: float, max_age: float) -> dict | None
+#   GET through the on-disk cache; {"url", "status", "content_type", "text", "from_cache"}.
+#
+# Function: fetch_all(urls: list[str], max_workers: int, per_host: int, ...) -> dict
+#   Concurrent fetch() with per-host limits; url -> result.
+#
+# Function: parse_html(html: str | bytes) -> lxml.html.HtmlElement
+#   lxml document for a page.
+#
+# Function: extract_article(html: str | bytes | HtmlElement) -> dict
+#   Plain text, italics-marked text and cleaned HTML of the main article
+#   element in one lxml pass.
+#
+# Function: parse_editorial_content(html: str) -> bs4.Tag
+#   Main article element of a page, without scripts/navigation (BeautifulSoup).
+#
+# Function: extract_editorial_content(url: str) -> bs4.Tag | None
+#   fetch() + parse_editorial_content().
+#
+# Function: get_text_with_italics(element) -> str
+#   Text with <em>/<i> marked as *...*.
+#
+# Function: slugify_url(url: str) -> str
+#   Host name as a filename-safe slug.
+#
+# Function: scrape_articles(urls: list[str], article_dir: str, ...) -> dict
+#   Fetches articles concurrently and writes <slug>.txt / -italics.txt / -html.txt.
+# --------------------------------------------------
+#
+# extract_article() is the fast path used by scrape_articles(). It parses
+# with lxml directly and does one C-level walk over the article, collecting
+# plain text and italics text together. The BeautifulSoup path walked the
+# tree three times, once each for get_text, the italics walk and prettify.
+# The BeautifulSoup helpers stay for callers that want a bs4 Tag.
+# --------------------------------------------------
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+# requests, lxml and bs4 are imported where they are used, so importing this module
+# (e.g. through transcription_utils) stays cheap.
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "./cache/http"
+DEFAULT_TIMEOUT = 20      # seconds (connect and read)
+MAX_WORKERS = 8           # concurrent fetches overall
+PER_HOST = 2              # concurrent fetches per host
+USER_AGENT = "Mozilla/5.0"
+STRIP_TAGS = ("script", "style", "nav", "footer", "header", "aside")
+ITALIC_TAGS = ("em", "i")
+MAX_FALLBACK_PARAGRAPHS = 200
+
+_sessions = {}
+_session_lock = threading.Lock()
+_host_locks = {}
+_host_locks_guard = threading.Lock()
+
+
+def get_session(pool_size=MAX_WORKERS):
+    """
+    Returns the process-wide session for a pool size, creating it on first use.
+
+    Args:
+        pool_size (int): Connections kept per host.
+
+    Returns:
+        requests.Session
+    """
+    with _session_lock:
+        if pool_size not in _sessions:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=("GET", "HEAD"))
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _sessions[pool_size] = session
+        return _sessions[pool_size]
+
+
+def _cache_paths(cache_dir, url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{key}.json"), os.path.join(cache_dir, f"{key}.body")
+
+
+def _load_cached(cache_dir, url):
+    meta_path, body_path = _cache_paths(cache_dir, url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    return meta, body
+
+
+def _store_cached(cache_dir, url, meta, body):
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path, body_path = _cache_paths(cache_dir, url)
+    # Body first, metadata last: a reader never sees metadata without its body
+    for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta, indent=2), "w")):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, mode, **({} if mode == "wb" else {"encoding": "utf-8"})) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+def _decode(body, encoding):
+    return body.decode(encoding or "utf-8", errors="replace")
+
+
+def _cached_result(url, meta, body):
+    return {"url": url, "status": meta["status"], "content_type": meta.get("content_type", ""),
+            "text": _decode(body, meta.get("encoding")), "from_cache": True}
+
+
+def fetch(url, session=None, cache_dir=DEFAULT_CACHE_DIR, timeout=DEFAULT_TIMEOUT, max_age=None):
+    """
+    GETs a URL through the on-disk cache.
+
+    Args:
+        url (str): Page to fetch.
+        session (requests.Session): Defaults to get_session().
+        cache_dir (str): Cache directory; None disables caching.
+        timeout (float): Connect/read timeout in seconds.
+        max_age (float): Serve the cached copy without revalidating when it
+            is younger than this many seconds (None = always revalidate).
+
+    Returns:
+        dict | None: {"url", "status", "content_type", "text", "from_cache"},
+        or None on failure.
+    """
+    import requests
+
+    meta, body = _load_cached(cache_dir, url) if cache_dir else (None, None)
+    if meta and max_age is not None and time.time() - meta.get("fetched_at", 0) < max_age:
+        return _cached_result(url, meta, body)
+
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    http = session or get_session()
+    try:
+        response = http.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        if meta:
+            logger.warning(f"⚠️ {url}: {e} — serving cached copy from {time.ctime(meta.get('fetched_at', 0))}")
+            return _cached_result(url, meta, body)
+        logger.error(f"❌ Failed to fetch {url}: {e}")
+        return None
+
+    if response.status_code == 304 and meta:
+        logger.info(f"♻️ Not modified: {url}")
+        meta["fetched_at"] = time.time()
+        _store_cached(cache_dir, url, meta, body)
+        return _cached_result(url, meta, body)
+
+    if not 200 <= response.status_code < 300:
+        logger.error(f"❌ HTTP {response.status_code} for {url}")
+        return None
+
+    encoding = response.encoding or response.apparent_encoding
+    content_type = response.headers.get("Content-Type", "")
+    if cache_dir:
+        _store_cached(cache_dir, url, {
+            "url": url,
+            "status": response.status_code,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": content_type,
+            "encoding": encoding,
+            "fetched_at": time.time(),
+        }, response.content)
+    return {"url": url, "status": response.status_code, "content_type": content_type,
+            "text": _decode(response.content, encoding), "from_cache": False}
+
+
+def _host_lock(host, per_host):
+    # Keyed on the limit too, so a later caller's per_host is honoured
+    with _host_locks_guard:
+        key = (host, per_host)
+        if key not in _host_locks:
+            _host_locks[key] = threading.BoundedSemaphore(per_host)
+        return _host_locks[key]
+
+
+def fetch_all(urls, max_workers=MAX_WORKERS, per_host=PER_HOST, **fetch_kwargs):
+    """
+    Fetches many URLs concurrently, at most `per_host` at a time per host.
+
+    Args:
+        urls (list[str]): Pages to fetch (duplicates are fetched once).
+        max_workers (int): Concurrent fetches overall.
+        per_host (int): Concurrent fetches per host.
+        **fetch_kwargs: Passed to fetch() (cache_dir, timeout, max_age, session).
+
+    Returns:
+        dict: url -> fetch() result (None for failures).
+    """
+    unique = list(dict.fromkeys(urls))
+    fetch_kwargs.setdefault("session", get_session(max(max_workers, per_host)))
+
+    def limited(url):
+        with _host_lock(urlparse(url).netloc, per_host):
+            return fetch(url, **fetch_kwargs)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(unique, pool.map(limited, unique)))
+
+
+def _main_element(root):
+    """lxml counterpart of the selection in parse_editorial_content()."""
+    from lxml import html as lxml_html
+
+    for xpath in (
+        "//article",
+        "//div[@id='main-content']",
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+    ):
+        found = root.xpath(xpath)
+        if found:
+            return found[0]
+
+    wrapper = lxml_html.Element("div")
+    for p in root.xpath("//p")[:MAX_FALLBACK_PARAGRAPHS]:
+        p.tail = None  # the <p> moves; its trailing text stays behind, as with bs4
+        wrapper.append(p)
+    return wrapper
+
+
+def parse_html(html):
+    """Parses a page with lxml (str input is re-encoded; lxml rejects str with an encoding declaration)."""
+    from lxml import html as lxml_html
+
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    return lxml_html.document_fromstring(html, parser=lxml_html.HTMLParser(encoding="utf-8"))
+
+
+def extract_article(html):
+    """
+    Extracts the main article of a page with lxml in a single pass.
+
+    The text and italics match get_text("\\n", strip=True) and
+    get_text_with_italics() on parse_editorial_content() (minus HTML
+    comments, which the bs4 italics walk included); the HTML is
+    lxml's pretty-printed serialisation rather than prettify()'s.
+
+    Args:
+        html (str | bytes | HtmlElement): Page source, or a parse_html()
+            document (which is modified: stripped tags are removed).
+
+    Returns:
+        dict: {"text", "italics", "html"}
+    """
+    from lxml import etree
+
+    root = html if isinstance(html, etree._Element) else parse_html(html)
+
+    for element in list(root.iter(*STRIP_TAGS)):
+        element.drop_tree()
+    main = _main_element(root)
+
+    text_parts = []
+    italic_parts = []
+
+    def add(string):
+        stripped = string.strip()
+        italic_parts.append(stripped)
+        if stripped:
+            text_parts.append(stripped)
+
+    # Comments are skipped (bs4 leaked their text into the italics output),
+    # but their tails are still text of the article.
+    for event, element in etree.iterwalk(main, events=("start", "end", "comment", "pi")):
+        if event == "start":
+            if element.tag in ITALIC_TAGS:
+                italic_parts.append("*" + "".join(t.strip() for t in element.itertext()) + "*")
+            if element.text:
+                add(element.text)
+        elif element is not main and element.tail:
+            add(element.tail)
+
+    return {
+        "text": "\n".join(text_parts),
+        "italics": " ".join(italic_parts),
+        "html": etree.tostring(main, method="html", encoding="unicode", pretty_print=True),
+    }
+
+
+def parse_editorial_content(html):
+    """
+    Finds the main article element of a page.
+
+    Strips scripts, styles and navigation, then returns <article>,
+    div#main-content or div.content; falls back to the first 200 <p> tags
+    wrapped in a <div>.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(list(STRIP_TAGS)):
+        tag.extract()
+
+    main_content = (
+        soup.find("article") or
+        soup.find("div", {"id": "main-content"}) or
+        soup.find("div", {"class": "content"})
+    )
+
+    if main_content:
+        return main_content
+
+    paragraphs = soup.find_all("p")
+    wrapper = soup.new_tag("div")
+    for p in paragraphs[:MAX_FALLBACK_PARAGRAPHS]:
+        wrapper.append(p)
+    return wrapper
+
+
+def extract_editorial_content(url, **fetch_kwargs):
+    """Fetches a page (through the cache) and returns its main article element, or None."""
+    result = fetch(url, **fetch_kwargs)
+    if not result:
+        return None
+    return parse_editorial_content(result["text"])
+
+
+def get_text_with_italics(element):
+    parts = []
+    for tag in element.descendants:
+        if tag.name in ["em", "i"]:
+            parts.append(f"*{tag.get_text(strip=True)}*")
+        elif tag.name is None:
+            parts.append(tag.strip())
+    return " ".join(parts)
+
+
+def slugify_url(url):
+    return re.sub(r'\W+', '-', url.split("//")[-1].split("/")[0].replace("www.", "")).strip("-")
+
+
+def save_article(article, article_dir, slug):
+    """Writes <slug>.txt, <slug>-italics.txt and <slug>-html.txt for an extract_article() result."""
+    outputs = {
+        f"{slug}.txt": article["text"],
+        f"{slug}-italics.txt": article["italics"],
+        f"{slug}-html.txt": article["html"],
+    }
+    for name, content in outputs.items():
+        with open(os.path.join(article_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def scrape_articles(urls, article_dir, scraper_config=None):
+    """
+    Fetches articles concurrently and saves them in the article layout.
+
+    Args:
+        urls (list[str]): Article URLs.
+        article_dir (str): Output directory.
+        scraper_config (dict): Optional "scraper" section of app_config
+            (cache_dir, timeout, max_age, max_workers, per_host).
+
+    Returns:
+        dict: url -> slug for saved articles, None for failures.
+    """
+    config = scraper_config or {}
+    results = fetch_all(
+        urls,
+        max_workers=config.get("max_workers", MAX_WORKERS),
+        per_host=config.get("per_host", PER_HOST),
+        cache_dir=config.get("cache_dir", DEFAULT_CACHE_DIR),
+        timeout=config.get("timeout", DEFAULT_TIMEOUT),
+        max_age=config.get("max_age"),
+    )
+
+    saved = {}
+    for url in urls:
+        result = results.get(url)
+        if not result:
+            logger.warning(f"Skipping due to failed fetch: {url}")
+            saved[url] = None
+            continue
+        slug = slugify_url(url)
+        try:
+            save_article(extract_article(result["text"]), article_dir, slug)
+            saved[url] = slug
+            source = "cache" if result["from_cache"] else "network"
+            logger.info(f"✅ Saved article: {slug} (txt, italics, html) from {source}")
+        except Exception as e:
+            logger.error(f"❌ Failed to save output for {slug}: {e}")
+            saved[url] = None
+    return saved
@@ -0,0 +1,230 @@
+# === IN-PROCESS TASK GRAPH RUNNER ===
+# --------------------------------------------------
+# Runs the per-video pipeline stages (download → watermark → clips/captions …)
+# inside the current interpreter instead of one `python script.py` subprocess
+# per task. Heavy imports (moviepy, whisper) are paid once per process and
+# stages whose dependencies are satisfied run concurrently.
+#
+# A stage script can expose `run_task(task_input) -> output_path | None`.
+# Only scripts that define it at top level are imported. Scripts without it
+# are never imported (their module-level code parses sys.argv and exits);
+# they are executed as `__main__` with runpy and argv = [script, input],
+# serialized behind a lock.
+# --------------------------------------------------
+#
+# Function: load_task_callable(script_path: str) -> callable
+#   Loads a bin/ stage script once and returns a callable(task_input).
+#
+# Function: run_task_graph(task_config, stages, dependencies, initial_inputs, ...) -> dict
+#   Executes enabled tasks in dependency order, persisting state via tasks_lib.
+# --------------------------------------------------
+
+import os
+import ast
+import sys
+import runpy
+import logging
+import threading
+import traceback
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from tasks_lib import record_task_state
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+_callable_cache = {}
+_cache_lock = threading.Lock()
+_argv_lock = threading.Lock()  # Legacy scripts read sys.argv, so only one at a time
+
+
+def _run_script_as_main(script_path, task_input):
+    """
+    Executes a script that has no run_task() as if launched from the CLI.
+    Returns True on success (exit code 0 / no exit), False otherwise.
+    """
+    with _argv_lock:
+        saved_argv = sys.argv
+        sys.argv = [script_path, task_input]
+        try:
+            runpy.run_path(script_path, run_name="__main__")
+            return True
+        except SystemExit as e:
+            return e.code in (None, 0)
+        finally:
+            sys.argv = saved_argv
+
+
+def _defines_run_task(script_path):
+    """True if the script defines run_task() at module level (checked without running it)."""
+    with open(script_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script_path)
+    return any(isinstance(node, ast.FunctionDef) and node.name == "run_task" for node in tree.body)
+
+
+def load_task_callable(script_path):
+    """
+    Loads a stage script once and returns a callable taking the task input.
+
+    Args:
+        script_path (str): Path to a bin/ stage script.
+
+    Returns:
+        callable: fn(task_input) -> output path (str), True, or None/False on failure.
+    """
+    script_path = os.path.abspath(script_path)
+
+    with _cache_lock:
+        if script_path in _callable_cache:
+            return _callable_cache[script_path]
+
+        if not os.path.exists(script_path):
+            raise FileNotFoundError(f"Task script not found: {script_path}")
+
+        if not _defines_run_task(script_path):
+            logger.info(f"ℹ️ {os.path.basename(script_path)} has no run_task(); running it as __main__")
+            entry = lambda task_input, path=script_path: _run_script_as_main(path, task_input)
+            _callable_cache[script_path] = entry
+            return entry
+
+        module_name = "task_" + os.path.splitext(os.path.basename(script_path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except SystemExit as e:
+            raise RuntimeError(f"{script_path} exited during import (code {e.code})")
+        entry = module.run_task
+
+        _callable_cache[script_path] = entry
+        return entry
+
+
+def _record(metadata_path, task, state, output_path=None):
+    # record_task_state() and the stages' tasks_lib writers share one file
+    # lock on the metadata JSON, so runner and stage threads never overwrite
+    # each other's updates.
+    if not metadata_path:
+        return
+    record_task_state(metadata_path, task, state, output_path)
+
+
+def run_task_graph(
+    task_config,
+    stages,
+    dependencies,
+    initial_inputs,
+    default_input=None,
+    metadata_path=None,
+    dry_run=False,
+    max_workers=4,
+):
+    """
+    Runs enabled tasks in dependency order, overlapping independent ones.
+
+    Task flags follow the default_tasks convention: True means run, a string
+    means already done (the string is its output), anything else is disabled.
+    A task's input is the output of its first dependency that produced one,
+    otherwise initial_inputs[task], otherwise default_input.
+
+    Args:
+        task_config (dict): default_tasks section (task -> True/False/output path).
+        stages (dict): task -> script path.
+        dependencies (dict): task -> list of upstream tasks.
+        initial_inputs (dict): Inputs for tasks with no upstream output (e.g. URL for download).
+        default_input (str): Fallback input for everything else.
+        metadata_path (str): Metadata JSON to persist state transitions into.
+        dry_run (bool): Log what would run without running it.
+        max_workers (int): Max stages running at once.
+
+    Returns:
+        dict: task -> {"state": ..., "output": ...} for every task in the graph.
+    """
+    results = {}
+    pending = []
+
+    for task, status in task_config.items():
+        if task not in stages:
+            logger.warning(f"No script defined for task: {task}")
+            continue
+        if status is True:
+            pending.append(task)
+        elif isinstance(status, str):
+            logger.info(f"✅ Task already completed: {task} @ {status}")
+            results[task] = {"state": "done", "output": status}
+        else:
+            logger.info(f"⏭️  Skipping task: {task}")
+            results[task] = {"state": "disabled", "output": None}
+
+    def upstream(task):
+        return [dep for dep in dependencies.get(task, []) if dep in stages]
+
+    def input_for(task):
+        for dep in upstream(task):
+            output = results.get(dep, {}).get("output")
+            if isinstance(output, str):
+                return output
+        return initial_inputs.get(task, default_input)
+
+    def run_one(task, task_input):
+        entry = load_task_callable(stages[task])
+        return entry(task_input)
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # Anything whose upstream failed can never run
+            for task in list(pending):
+                if any(results.get(dep, {}).get("state") in ("failed", "skipped") for dep in upstream(task)):
+                    pending.remove(task)
+                    results[task] = {"state": "skipped", "output": None}
+                    logger.warning(f"⏭️  Skipping task: {task} (upstream failed)")
+                    _record(metadata_path, task, "skipped")
+
+            ready = [
+                task for task in pending
+                if all(dep in results and results[dep]["state"] in ("done", "disabled") for dep in upstream(task))
+            ]
+
+            for task in ready:
+                pending.remove(task)
+                task_input = input_for(task)
+                if dry_run:
+                    logger.info(f"[Dry Run] Would run: {task} -> {stages[task]} {task_input}")
+                    results[task] = {"state": "done", "output": None}
+                    continue
+                logger.info(f"🚀 Running task: {task} -> {stages[task]}")
+                _record(metadata_path, task, "running")
+                running[pool.submit(run_one, task, task_input)] = task
+
+            if not running:
+                if pending and not ready:
+                    # Cycle or dependency on a task that never runs
+                    for task in pending:
+                        logger.error(f"❌ Task '{task}' has unsatisfiable dependencies: {upstream(task)}")
+                        results[task] = {"state": "skipped", "output": None}
+                    pending.clear()
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    output = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Task '{task}' raised: {e}")
+                    logger.debug(traceback.format_exc())
+                    output = None
+
+                if output:
+                    output_path = output if isinstance(output, str) else None
+                    results[task] = {"state": "done", "output": output_path}
+                    logger.info(f"✅ Task finished: {task}" + (f" → {output_path}" if output_path else ""))
+                    _record(metadata_path, task, "done", output_path)
+                else:
+                    results[task] = {"state": "failed", "output": None}
+                    logger.error(f"❌ Task failed: {task}")
+                    _record(metadata_path, task, "failed")
+
+    return results
@@ -37,6 +37,18 @@
 #   - get_task_states(url, metadata_dir="./metadata")                         #
 #     --> Return all task states from metadata for a given URL                #
 #                                                                             #
+#   - record_task_state(metadata_path, task, state, output_path=None)         #
+#     --> Persist a running/done/failed/skipped transition for a task         #
+#                                                                             #
+#   - record_media_language(metadata_path, detection)                         #
+#     --> Store the detected spoken language in the metadata record           #
+#                                                                             #
+#   - locked_metadata(metadata_path)                                          #
+#     --> Exclusive lock on <metadata>.lock around a read-modify-write        #
+#                                                                             #
+#   - write_metadata(metadata_path, metadata)                                 #
+#     --> Atomic write through a unique temp file in the same directory       #
+#                                                                             #
 #   Author:        Aldebaran                                                  #
 #   Created:       2025-03-18                                                 #
 #   Last Modified: 2025-03-25                                                 #
@@ -48,13 +60,42 @@ import os
 import json
 import logging
 import shutil
+import tempfile
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Optional
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
 
 # Initialize the logger
 logger = logging.getLogger(__name__)
 logger.info(f"📦 {__name__} imported into {__file__}")
 
+# Map tasks to their respective scripts (relative to the repo root)
+TASK_DISPATCH = {
+    "perform_download": "bin/call_download.py",
+    "apply_watermark": "bin/call_watermark.py",
+    "make_clips": "bin/call_make_clips.py",
+    "extract_audio": "bin/call_extract_audio.py",
+    "generate_captions": "bin/call_captions.py",
+    "post_process": "bin/call_screenshots.py"
+}
+
+# Upstream tasks each stage waits for; a stage receives its upstream's output
+TASK_DEPENDENCIES = {
+    "perform_download": [],
+    "apply_watermark": ["perform_download"],
+    "extract_audio": ["perform_download"],
+    "make_clips": ["apply_watermark"],
+    "generate_captions": ["apply_watermark"],
+    "post_process": ["make_clips", "generate_captions"],
+}
+
 
 def load_default_tasks(config_path="conf/default_tasks.json"):
     """
@@ -137,18 +178,18 @@ def extend_metadata_with_task_output(params: dict) -> dict:
         return {"updated_metadata": None}
 
     try:
-        with open(json_path, "r") as f:
-            data = json.load(f)
+        with locked_metadata(json_path):
+            with open(json_path, "r") as f:
+                data = json.load(f)
 
-        if "default_tasks" in data and task in data["default_tasks"] and output_path:
-            data["default_tasks"][task] = output_path
-            logger.info(f"Marked task '{task}' as completed: {output_path}")
-        else:
-            logger.warning(f"Task '{task}' not found or no output to record.")
+            if "default_tasks" in data and task in data["default_tasks"] and output_path:
+                data["default_tasks"][task] = output_path
+                logger.info(f"Marked task '{task}' as completed: {output_path}")
+            else:
+                logger.warning(f"Task '{task}' not found or no output to record.")
 
-        # Save the updated data back to the JSON file
-        with open(json_path, "w") as f:
-            json.dump(data, f, indent=4)
+            # Save the updated data back to the JSON file
+            write_metadata(json_path, data)
 
         return {"updated_metadata": json_path}
     except Exception as e:
@@ -245,33 +286,33 @@ def add_default_tasks_to_metadata(
         logger.error(f"❌ Metadata file not found: {metadata_path}")
         return {"updated_metadata": None}
 
-    try:
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Error parsing {metadata_path}: {e}")
-        return {"updated_metadata": None}
-
-    # Add the default tasks to the metadata if they're not already there
-    if "default_tasks" not in metadata:
-        metadata["default_tasks"] = {}
-
-    for task, status in default_tasks.items():
-        if task not in metadata["default_tasks"]:
-            metadata["default_tasks"][task] = status
-            logger.info(f"➕ Added task '{task}' to metadata with status: {status}")
-
-    # Save the updated metadata back to the file
-    try:
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=4)
-        logger.info(
-            f"✅ Metadata updated with default tasks. Saved to: {metadata_path}"
-        )
-        return {"updated_metadata": metadata_path}
-    except Exception as e:
-        logger.error(f"❌ Failed to save updated metadata: {e}")
-        return {"updated_metadata": None}
+    with locked_metadata(metadata_path):
+        try:
+            with open(metadata_path, "r") as f:
+                metadata = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error(f"❌ Error parsing {metadata_path}: {e}")
+            return {"updated_metadata": None}
+
+        # Add the default tasks to the metadata if they're not already there
+        if "default_tasks" not in metadata:
+            metadata["default_tasks"] = {}
+
+        for task, status in default_tasks.items():
+            if task not in metadata["default_tasks"]:
+                metadata["default_tasks"][task] = status
+                logger.info(f"➕ Added task '{task}' to metadata with status: {status}")
+
+        # Save the updated metadata back to the file
+        try:
+            write_metadata(metadata_path, metadata)
+            logger.info(
+                f"✅ Metadata updated with default tasks. Saved to: {metadata_path}"
+            )
+            return {"updated_metadata": metadata_path}
+        except Exception as e:
+            logger.error(f"❌ Failed to save updated metadata: {e}")
+            return {"updated_metadata": None}
 
 
 def update_task_output_path(metadata_path: str, task: str, output_path: str) -> dict:
@@ -298,17 +339,17 @@ def update_task_output_path(metadata_path: str, task: str, output_path: str) ->
         return {"updated_metadata": None}
 
     try:
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
+        with locked_metadata(metadata_path):
+            with open(metadata_path, "r") as f:
+                metadata = json.load(f)
 
-        if "default_tasks" in metadata:
-            metadata["default_tasks"][task] = output_path
-            logger.info(f"✅ Task '{task}' updated to: {output_path}")
-        else:
-            logger.warning(f"⚠️ No 'default_tasks' section found in metadata.")
+            if "default_tasks" in metadata:
+                metadata["default_tasks"][task] = output_path
+                logger.info(f"✅ Task '{task}' updated to: {output_path}")
+            else:
+                logger.warning(f"⚠️ No 'default_tasks' section found in metadata.")
 
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=4)
+            write_metadata(metadata_path, metadata)
 
         return {"updated_metadata": metadata_path}
     except Exception as e:
@@ -345,3 +386,126 @@ def get_task_states(url, metadata_dir="./metadata"):
     # Return the task states
     logger.info(f"🛠 Task states for {url}: {default_tasks}")
     return default_tasks
+
+
+@contextmanager
+def locked_metadata(metadata_path: str):
+    """
+    Holds an exclusive lock on <metadata_path>.lock for a read-modify-write
+    of the metadata JSON.
+
+    Worker processes and the stage threads of one process all update the same
+    file (make_clips and generate_captions both follow apply_watermark), so
+    every writer takes this lock before reading. flock() locks belong to the
+    open file, so threads of one process exclude each other as well.
+    """
+    with open(f"{metadata_path}.lock", "a") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_metadata(metadata_path: str, metadata: dict) -> None:
+    """
+    Writes the metadata JSON through a unique temp file and os.replace(), so
+    a crash never leaves half a JSON behind and concurrent writers never
+    share a temp file. Call it inside locked_metadata().
+    """
+    directory = os.path.dirname(os.path.abspath(metadata_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(metadata_path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(metadata, f, indent=4)
+        if os.path.exists(metadata_path):
+            shutil.copymode(metadata_path, tmp_path)  # mkstemp creates 0600
+        os.replace(tmp_path, metadata_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def record_task_state(
+    metadata_path: str, task: str, state: str, output_path: Optional[str] = None
+) -> dict:
+    """
+    Records a task state transition in the metadata JSON.
+
+    The transition is stored under 'task_states' (state, timestamp, output).
+    When a task reaches 'done' with an output path, 'default_tasks' is updated
+    the same way update_task_output_path does, so existing readers keep working.
+
+    Args:
+        metadata_path (str): Path to the metadata JSON file.
+        task (str): The task name (e.g., "apply_watermark").
+        state (str): One of "running", "done", "failed", "skipped".
+        output_path (str): Output path for completed tasks.
+
+    Returns:
+        dict: The updated metadata file path, or None if failed.
+    """
+    logger.info(f"🛠 Task '{task}' → {state}")
+
+    if not metadata_path or not os.path.exists(metadata_path):
+        logger.error(f"❌ Metadata file not found: {metadata_path}")
+        return {"updated_metadata": None}
+
+    try:
+        with locked_metadata(metadata_path):
+            with open(metadata_path, "r") as f:
+                metadata = json.load(f)
+
+            metadata.setdefault("task_states", {})[task] = {
+                "state": state,
+                "updated": datetime.now().isoformat(),
+                "output": output_path,
+            }
+            if state == "done" and output_path:
+                metadata.setdefault("default_tasks", {})[task] = output_path
+
+            write_metadata(metadata_path, metadata)
+
+        return {"updated_metadata": metadata_path}
+    except Exception as e:
+        logger.error(f"❌ Failed to record state for task '{task}': {e}")
+        logger.debug(traceback.format_exc())
+        return {"updated_metadata": None}
+
+
+def record_media_language(metadata_path: str, detection: dict) -> dict:
+    """
+    Stores a language detection result (see transcription_utils.
+    detect_media_language) under 'language' in the metadata JSON, so later
+    stages decode in that language and route non-English media to translation.
+
+    Args:
+        metadata_path (str): Path to the metadata JSON file.
+        detection (dict): {"language", "probability", ...}.
+
+    Returns:
+        dict: The updated metadata file path, or None if failed.
+    """
+    logger.info(f"🌍 Recording language '{detection.get('language')}' in: {metadata_path}")
+
+    if not metadata_path or not os.path.exists(metadata_path):
+        logger.error(f"❌ Metadata file not found: {metadata_path}")
+        return {"updated_metadata": None}
+
+    try:
+        with locked_metadata(metadata_path):
+            with open(metadata_path, "r") as f:
+                metadata = json.load(f)
+
+            metadata["language"] = dict(detection, detected=datetime.now().isoformat())
+
+            write_metadata(metadata_path, metadata)
+
+        return {"updated_metadata": metadata_path}
+    except Exception as e:
+        logger.error(f"❌ Failed to record language: {e}")
+        logger.debug(traceback.format_exc())
+        return {"updated_metadata": None}
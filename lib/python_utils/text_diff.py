@@ -0,0 +1,533 @@
+# === WORD-LEVEL TRANSCRIPT DIFF ===
+# --------------------------------------------------
+# Compares two transcripts word by word instead of line by line. Whisper
+# writes one huge line per transcript, so the old per-line difflib.ndiff
+# produced a single character diff that repeated both inputs in full.
+#
+# Algorithm: patience diff over word tokens. Words that occur exactly once
+# on both sides are used as anchors (longest increasing subsequence), the
+# regions between anchors are diffed recursively, and regions with no
+# unique words fall back to Myers' O(ND) diff. Myers explores at most
+# MYERS_MAX_D edits per call and then continues from the furthest point it
+# reached; regions with little vocabulary in common are reported as a plain
+# replacement, so two unrelated transcripts can't blow up time or memory.
+#
+# Words are compared case- and punctuation-insensitively by default
+# ("Video." == "video"); the report shows the original spelling. Runs of one
+# or two equal words stranded between changes are folded into the change.
+# --------------------------------------------------
+#
+# Function: tokenize_for_diff(text: str) -> list[str]
+#   Whitespace-separated words, punctuation kept.
+#
+# Function: normalize_word(token: str) -> str
+#   Comparison key used when normalize=True.
+#
+# Function: diff_tokens(a: list, b: list, normalize: bool) -> list[tuple]
+#   Opcodes (tag, i1, i2, j1, j2) like SequenceMatcher.get_opcodes().
+#
+# Function: iter_words(path: str) -> iterator[str]
+#   Words of a file, read in chunks.
+#
+# Function: stream_opcodes(words_a, words_b, window: int) -> iterator[tuple]
+#   Windowed diff of two word streams in bounded memory.
+#
+# Function: diff_stats(opcodes: list) -> dict
+#   Word counts per change type and a ratio-style similarity.
+#
+# Function: write_text_report(ops, out, labels) -> dict
+#   Streams the compact wdiff-style report ([-deleted-] {+inserted+}).
+#
+# Function: write_html_report(ops, out, labels) -> dict
+#   Streams a standalone HTML page with <del>/<ins> markup.
+#
+# Function: format_report(a, b, opcodes, labels) -> str
+# Function: render_html(a, b, opcodes, labels) -> str
+#   In-memory wrappers of the two writers.
+#
+# Function: generate_comparison_report(file1_path, file2_path, output_path, html_path=None) -> dict
+#   Streams two transcript files through the diff into the report files.
+# --------------------------------------------------
+
+import io
+import re
+import html
+import logging
+from bisect import bisect_left
+from itertools import islice
+from collections import Counter
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+CONTEXT_WORDS = 8     # unchanged words shown around each change
+MYERS_MAX_D = 500     # edits explored per Myers call before settling for a partial path
+MIN_SHARED = 0.3      # regions sharing fewer words than this (Dice) are reported as replacements
+STRAY_MATCH_WORDS = 2 # equal runs this short between two changes are shown as changed
+WRAP_WIDTH = 100
+WINDOW_WORDS = 20000  # words per side diffed at once when streaming
+WINDOW_MARGIN = 1000  # words at the end of a window that are never committed
+READ_CHUNK = 1 << 20  # characters read per call when streaming a transcript
+WRITE_BUFFER = 1 << 20
+_STRIP_RE = re.compile(r"^\W+|\W+$")
+
+
+def tokenize_for_diff(text):
+    """Whitespace-separated words, punctuation kept for display."""
+    return text.split()
+
+
+def normalize_word(token):
+    """Comparison key of a word: lower-cased, surrounding punctuation stripped."""
+    return _STRIP_RE.sub("", token.lower()) or token
+
+
+def _unique_anchors(a, b, alo, ahi, blo, bhi):
+    """Words unique in both regions, as (i, j) pairs forming the longest increasing run."""
+    count_a = Counter(a[alo:ahi])
+    count_b = Counter(b[blo:bhi])
+    where_b = {b[j]: j for j in range(blo, bhi) if count_b[b[j]] == 1}
+    pairs = [(i, where_b[a[i]]) for i in range(alo, ahi) if count_a[a[i]] == 1 and a[i] in where_b]
+
+    # Patience sorting: longest subsequence of pairs increasing in j
+    tails, tail_idx, prev = [], [], [None] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos:
+            prev[idx] = tail_idx[pos - 1]
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+    anchors = []
+    idx = tail_idx[-1] if tail_idx else None
+    while idx is not None:
+        anchors.append(pairs[idx])
+        idx = prev[idx]
+    return anchors[::-1]
+
+
+def _myers(a, b, alo, ahi, blo, bhi, max_d=MYERS_MAX_D):
+    """
+    Myers O(ND) diff of one region.
+
+    Returns (pairs, x, y): the matching (i, j) pairs and how far into the
+    region (x words of a, y words of b) they are final. When the region needs
+    more than max_d edits, the furthest-reaching path found so far is kept
+    and the caller continues from its end point, so the cost per call stays
+    bounded by max_d. Returns None when the region has too little in common
+    to be worth aligning.
+    """
+    n, m = ahi - alo, bhi - blo
+    # D >= n + m - 2 * LCS, and LCS can't exceed the shared word counts
+    shared = sum((Counter(a[alo:ahi]) & Counter(b[blo:bhi])).values())
+    if n + m - 2 * shared > max_d and 2 * shared < MIN_SHARED * (n + m):
+        return None
+    v = {1: 0}
+    trace = []
+    for d in range(min(n + m, max_d) + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m, alo, blo), n, m
+
+    # Too expensive: settle for the furthest point reached inside the region
+    last = len(trace) - 1
+    x, k = max(
+        ((v[k], k) for k in range(-last, last + 1, 2) if v[k] <= n and 0 <= v[k] - k <= m),
+        key=lambda item: 2 * item[0] - item[1],
+    )
+    return _myers_backtrack(trace, x, x - k, alo, blo), x, x - k
+
+
+def _myers_backtrack(trace, x, y, alo, blo):
+    """Matching pairs on the path that reached (x, y) at the last step in trace."""
+    pairs = []
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v.get(k - 1, -1) < v.get(k + 1, -1)):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            pairs.append((alo + x, blo + y))
+        x, y = prev_x, prev_y
+    return pairs
+
+
+def _matching_pairs(a, b):
+    """Patience diff with a Myers fallback; returns sorted matching (i, j) pairs."""
+    matches = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            matches.extend(anchors)
+            bounds = [(alo - 1, blo - 1)] + anchors + [(ahi, bhi)]
+            for (i1, j1), (i2, j2) in zip(bounds, bounds[1:]):
+                if i2 - i1 > 1 or j2 - j1 > 1:
+                    stack.append((i1 + 1, i2, j1 + 1, j2))
+            continue
+
+        result = _myers(a, b, alo, ahi, blo, bhi)
+        if result is None:
+            logger.debug(f"⚠️ Region {alo}:{ahi} / {blo}:{bhi} too different; reporting as replacement")
+            continue
+        pairs, x, y = result
+        matches.extend(pairs)
+        if x < ahi - alo or y < bhi - blo:
+            stack.append((alo + x, ahi, blo + y, bhi))
+    return sorted(matches)
+
+
+def diff_tokens(a, b, normalize=True):
+    """
+    Word-level diff of two token lists.
+
+    Args:
+        a (list[str]): Tokens of the first text.
+        b (list[str]): Tokens of the second text.
+        normalize (bool): Compare case- and punctuation-insensitively.
+
+    Returns:
+        list[tuple]: (tag, i1, i2, j1, j2) with tag in equal/replace/delete/insert.
+    """
+    keys_a = [normalize_word(t) for t in a] if normalize else a
+    keys_b = [normalize_word(t) for t in b] if normalize else b
+
+    opcodes = []
+    i = j = 0
+    for mi, mj in _matching_pairs(keys_a, keys_b) + [(len(a), len(b))]:
+        if mi > i or mj > j:
+            tag = "replace" if mi > i and mj > j else ("delete" if mi > i else "insert")
+            opcodes.append((tag, i, mi, j, mj))
+        if mi < len(a) and mj < len(b):
+            if opcodes and opcodes[-1][0] == "equal" and opcodes[-1][2] == mi and opcodes[-1][4] == mj:
+                opcodes[-1] = ("equal", opcodes[-1][1], mi + 1, opcodes[-1][3], mj + 1)
+            else:
+                opcodes.append(("equal", mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    return _absorb_stray_matches(opcodes)
+
+
+def _absorb_stray_matches(opcodes, max_words=STRAY_MATCH_WORDS):
+    """
+    Folds tiny equal runs sitting between changes into one replacement, so
+    unrelated passages don't read as a confetti of single shared words
+    ("a", "the", "video").
+    """
+    merged = []
+    for op in opcodes:
+        merged.append(op)
+        while len(merged) >= 3:
+            (t1, a1, _, b1, _), (t2, i1, i2, _, _), (t3, _, a3, _, b3) = merged[-3:]
+            if t1 == "equal" or t3 == "equal" or t2 != "equal" or i2 - i1 > max_words:
+                break
+            merged[-3:] = [("replace", a1, a3, b1, b3)]
+    return merged
+
+
+def iter_words(path, chunk_size=READ_CHUNK):
+    """Yields the whitespace-separated words of a file without reading it whole."""
+    carry = ""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunk = carry + chunk
+            words = chunk.split()
+            # A word touching the end of the chunk may continue in the next one
+            carry = words.pop() if words and not chunk[-1].isspace() else ""
+            yield from words
+    if carry:
+        yield carry
+
+
+def stream_opcodes(words_a, words_b, window=WINDOW_WORDS, normalize=True):
+    """
+    Diffs two word streams in bounded memory.
+
+    Up to `window` words of each stream are diffed at a time. Everything up to
+    the last equal run that ends at least `margin` words before the end of
+    both windows is final and is yielded; the rest is carried over and
+    re-diffed with the next words. A window with no usable equal run commits
+    its first half as a replacement, so memory stays bounded even for
+    unrelated inputs.
+
+    Yields:
+        tuple: (tag, i1, i2, j1, j2, words_a, words_b) with positions in the
+        whole streams and the words the opcode covers.
+    """
+    it_a, it_b = iter(words_a), iter(words_b)
+    buf_a, buf_b = [], []
+    off_a = off_b = 0
+    done_a = done_b = False
+    margin = min(WINDOW_MARGIN, window // 4)
+
+    while True:
+        if not done_a:
+            buf_a.extend(islice(it_a, window - len(buf_a)))
+            done_a = len(buf_a) < window
+        if not done_b:
+            buf_b.extend(islice(it_b, window - len(buf_b)))
+            done_b = len(buf_b) < window
+        if not buf_a and not buf_b:
+            return
+
+        opcodes = diff_tokens(buf_a, buf_b, normalize)
+        if done_a and done_b:
+            commit, cut_a, cut_b = opcodes, len(buf_a), len(buf_b)
+        else:
+            limit_a = len(buf_a) if done_a else len(buf_a) - margin
+            limit_b = len(buf_b) if done_b else len(buf_b) - margin
+            last = max(
+                (n for n, op in enumerate(opcodes) if op[0] == "equal" and op[2] <= limit_a and op[4] <= limit_b),
+                default=None,
+            )
+            if last is not None:
+                commit = opcodes[:last + 1]
+                cut_a, cut_b = commit[-1][2], commit[-1][4]
+            else:
+                cut_a, cut_b = (len(buf_a) + 1) // 2, (len(buf_b) + 1) // 2
+                tag = "replace" if cut_a and cut_b else ("delete" if cut_a else "insert")
+                commit = [(tag, 0, cut_a, 0, cut_b)]
+
+        for tag, i1, i2, j1, j2 in commit:
+            yield (tag, off_a + i1, off_a + i2, off_b + j1, off_b + j2, buf_a[i1:i2], buf_b[j1:j2])
+
+        buf_a, buf_b = buf_a[cut_a:], buf_b[cut_b:]
+        off_a += cut_a
+        off_b += cut_b
+
+
+def _with_words(a, b, opcodes):
+    for tag, i1, i2, j1, j2 in opcodes:
+        yield (tag, i1, i2, j1, j2, a[i1:i2], b[j1:j2])
+
+
+def _add_stats(stats, tag, i1, i2, j1, j2):
+    if tag == "equal":
+        stats["equal"] += i2 - i1
+    elif tag == "delete":
+        stats["deleted"] += i2 - i1
+    elif tag == "insert":
+        stats["inserted"] += j2 - j1
+    else:
+        stats["replaced_a"] += i2 - i1
+        stats["replaced_b"] += j2 - j1
+
+
+def _finish_stats(stats):
+    total_a = stats["equal"] + stats["deleted"] + stats["replaced_a"]
+    total_b = stats["equal"] + stats["inserted"] + stats["replaced_b"]
+    stats["words_a"], stats["words_b"] = total_a, total_b
+    stats["similarity"] = 2 * stats["equal"] / (total_a + total_b) if total_a + total_b else 1.0
+    return stats
+
+
+def _new_stats():
+    return {"equal": 0, "deleted": 0, "inserted": 0, "replaced_a": 0, "replaced_b": 0}
+
+
+def diff_stats(opcodes):
+    """Word counts per change type plus 2 * equal / total, on the ratio() scale."""
+    stats = _new_stats()
+    for op in opcodes:
+        _add_stats(stats, *op[:5])
+    return _finish_stats(stats)
+
+
+def _summary(stats):
+    return (
+        f"📊 Similarity: {stats['similarity']:.3f} | words {stats['words_a']} vs {stats['words_b']} | "
+        f"equal {stats['equal']} | deleted {stats['deleted']} | inserted {stats['inserted']} | "
+        f"replaced {stats['replaced_a']}→{stats['replaced_b']}"
+    )
+
+
+def write_text_report(ops, out, labels=("1", "2"), context=CONTEXT_WORDS, width=WRAP_WIDTH):
+    """
+    Writes the compact report while the diff is still running.
+
+    Each hunk starts with the word positions where it begins, followed by
+    wrapped wdiff-style text ([-deleted-] {+inserted+}) with `context`
+    unchanged words around each change. Only the open line and up to
+    2 * context pending words are held in memory. The summary is written
+    last, once the totals are known.
+
+    Args:
+        ops (iterable): stream_opcodes() output (or _with_words() of diff_tokens()).
+        out (file): Text file opened for writing.
+        labels (tuple): Names of the two transcripts.
+
+    Returns:
+        dict: diff_stats-style totals.
+    """
+    stats = _new_stats()
+    line, line_len = [], 0
+    gap = []          # (word, i, j) of equal words since the last change
+    in_hunk = False
+    hunks = 0
+
+    def put(word):
+        nonlocal line_len
+        if line and line_len + 1 + len(word) > width:
+            flush()
+        line.append(word)
+        line_len += len(word) + (1 if len(line) > 1 else 0)
+
+    def flush():
+        nonlocal line_len
+        if line:
+            out.write(" ".join(line) + "\n")
+            line.clear()
+            line_len = 0
+
+    def put_marked(words, opening, closing):
+        for n, word in enumerate(words):
+            put((opening if n == 0 else "") + word + (closing if n == len(words) - 1 else ""))
+
+    out.write(f"=== TRANSCRIPT COMPARISON ===\n🎥 1: {labels[0]}\n🎥 2: {labels[1]}\n\n")
+
+    for tag, i1, i2, j1, j2, words_a, words_b in ops:
+        _add_stats(stats, tag, i1, i2, j1, j2)
+        if tag == "equal":
+            tail_start = max(0, len(words_a) - context)
+            tail = [(w, i1 + tail_start + n, j1 + tail_start + n) for n, w in enumerate(words_a[tail_start:])]
+            if in_hunk:
+                pending = gap + [(w, i1 + n, j1 + n) for n, w in enumerate(words_a[:2 * context + 1])]
+                if len(pending) <= 2 * context:
+                    gap = pending  # short run: stays inside the hunk
+                    continue
+                for word, _, _ in pending[:context]:
+                    put(word)
+                flush()
+                out.write("\n")
+                in_hunk = False
+            gap = (gap + tail)[-context:]
+            continue
+
+        if not in_hunk:
+            start_i, start_j = (gap[0][1], gap[0][2]) if gap else (i1, j1)
+            out.write(f"@@ 1: word {start_i + 1} | 2: word {start_j + 1} @@\n")
+            in_hunk = True
+            hunks += 1
+        for word, _, _ in gap:
+            put(word)
+        gap = []
+        if words_a:
+            put_marked(words_a, "[-", "-]")
+        if words_b:
+            put_marked(words_b, "{+", "+}")
+
+    if in_hunk:
+        for word, _, _ in gap[:context]:
+            put(word)
+        flush()
+        out.write("\n")
+    if not hunks:
+        out.write("✅ IDENTICAL\n\n")
+
+    stats = _finish_stats(stats)
+    out.write(_summary(stats) + "\n")
+    return stats
+
+
+def write_html_report(ops, out, labels=("1", "2")):
+    """Streams the whole diff inline into a standalone HTML page (<del>/<ins>)."""
+    stats = _new_stats()
+    out.write(
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Transcript comparison</title>\n"
+        "<style>body{font-family:sans-serif;max-width:60em;margin:2em auto;line-height:1.6}"
+        "del{background:#fdd;color:#900}ins{background:#dfd;color:#060;text-decoration:none}</style>\n"
+        "</head><body>\n"
+        f"<h1>Transcript comparison</h1>\n<p><del>1: {html.escape(labels[0])}</del><br>"
+        f"<ins>2: {html.escape(labels[1])}</ins></p>\n<p>"
+    )
+    for tag, i1, i2, j1, j2, words_a, words_b in ops:
+        _add_stats(stats, tag, i1, i2, j1, j2)
+        if tag == "equal":
+            out.write(html.escape(" ".join(words_a)) + " ")
+        if tag in ("delete", "replace"):
+            out.write(f"<del>{html.escape(' '.join(words_a))}</del> ")
+        if tag in ("insert", "replace"):
+            out.write(f"<ins>{html.escape(' '.join(words_b))}</ins> ")
+    stats = _finish_stats(stats)
+    out.write(f"</p>\n<p>{html.escape(_summary(stats))}</p>\n</body></html>\n")
+    return stats
+
+
+def format_report(a, b, opcodes, labels=("1", "2"), context=CONTEXT_WORDS):
+    """In-memory version of write_text_report() for already tokenized texts."""
+    out = io.StringIO()
+    write_text_report(_with_words(a, b, opcodes), out, labels, context)
+    return out.getvalue()
+
+
+def render_html(a, b, opcodes, labels=("1", "2")):
+    """In-memory version of write_html_report() for already tokenized texts."""
+    out = io.StringIO()
+    write_html_report(_with_words(a, b, opcodes), out, labels)
+    return out.getvalue()
+
+
+def generate_comparison_report(file1_path, file2_path, output_path, html_path=None):
+    """
+    Word-level comparison of two transcript files, streamed end to end.
+
+    Both files are read incrementally and hunks are written through a
+    buffered writer as soon as they are final, so memory use doesn't grow
+    with transcript length. The HTML rendering, when requested, is a second
+    streaming pass over the files.
+
+    Args:
+        file1_path (str): First transcript.
+        file2_path (str): Second transcript.
+        output_path (str): Where to write the compact text report.
+        html_path (str): Optional path for an HTML rendering of the full diff.
+
+    Returns:
+        dict: diff_stats() of the comparison.
+    """
+    labels = (file1_path, file2_path)
+
+    with open(output_path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+        stats = write_text_report(stream_opcodes(iter_words(file1_path), iter_words(file2_path)), out, labels)
+    print(f"\n📄 Comparison report saved to: {output_path}")
+
+    if html_path:
+        with open(html_path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+            write_html_report(stream_opcodes(iter_words(file1_path), iter_words(file2_path)), out, labels)
+        print(f"🌐 HTML comparison saved to: {html_path}")
+
+    return stats
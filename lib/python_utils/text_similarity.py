@@ -0,0 +1,229 @@
+# === NEAR-DUPLICATE TEXT SIMILARITY ===
+# --------------------------------------------------
+# Replacement for SequenceMatcher(None, a, b).ratio() on whole transcripts and
+# articles. Character-level SequenceMatcher is close to quadratic on long texts;
+# here every text is reduced once to word tokens plus two signatures:
+#   - MinHash over k-word shingles (estimates shingle Jaccard similarity)
+#   - SimHash over word counts (64-bit fingerprint, catches re-worded copies)
+# Only pairs whose signatures look related get an exact alignment pass, which
+# runs SequenceMatcher over the sequence of shingle hashes instead of
+# characters: shingles repeat far less often than characters or single words,
+# so the matcher has few candidate positions to try.
+#
+# Scores stay on the ratio scale: 2 * matched / total, 1.0 for identical text,
+# 0.0 for nothing in common. Matches are weighted by token length, so the
+# aligned score reads like a character ratio over normalized text (lower-cased,
+# punctuation and runs of whitespace collapsed).
+# --------------------------------------------------
+#
+# Function: tokenize(text: str) -> list[str]
+#   Lower-cased word tokens.
+#
+# Function: tokenize_with_offsets(text: str) -> tuple[list[str], list[tuple]]
+#   Tokens plus their character spans in the original text.
+#
+# Function: shingle_hashes(tokens: list, k: int) -> list[int]
+#   Ordered 32-bit hashes of every k-word shingle.
+#
+# Function: shingle_text(text: str) -> dict
+#   Tokens and ordered shingle hashes only (enough for aligned_ratio()).
+#
+# Function: sign_text(text: str) -> dict
+#   Tokens, ordered shingle hashes, MinHash and SimHash for a text.
+#
+# Function: text_signature(text: str) -> dict
+#   sign_text() behind an LRU cache.
+#
+# Function: estimate_similarity(sig_a: dict, sig_b: dict) -> float
+#   MinHash estimate of shingle Jaccard similarity.
+#
+# Function: simhash_similarity(sig_a: dict, sig_b: dict) -> float
+#   1 - hamming distance / 64 between SimHash fingerprints.
+#
+# Function: aligned_ratio(sig_a: dict, sig_b: dict) -> float
+#   Exact shingle alignment score on the ratio scale.
+#
+# Function: compare_texts(a: str, b: str, threshold: float) -> float
+#   Signature screen, then exact alignment for candidates only.
+# --------------------------------------------------
+
+import re
+import zlib
+import hashlib
+import logging
+from functools import lru_cache
+from collections import Counter
+from difflib import SequenceMatcher
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3          # words per shingle
+NUM_PERM = 128            # MinHash permutations (error ~ 1/sqrt(NUM_PERM))
+CANDIDATE_THRESHOLD = 0.1 # shingle Jaccard estimate that triggers exact alignment
+SIMHASH_THRESHOLD = 0.9   # SimHash bit agreement that triggers exact alignment
+_PRIME = 4294967311       # smallest prime above 2^32
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased word tokens (unicode aware, so accents survive)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def tokenize_with_offsets(text):
+    """Like tokenize(), plus the (start, end) character offsets of each token in `text`."""
+    tokens, offsets = [], []
+    for match in _TOKEN_RE.finditer(text):
+        tokens.append(match.group().lower())
+        offsets.append(match.span())
+    return tokens, offsets
+
+
+def shingle_hashes(tokens, k=SHINGLE_SIZE):
+    """32-bit hashes of every k-word shingle, in order (the whole text when it is shorter than k)."""
+    if len(tokens) < k:
+        return [zlib.crc32(" ".join(tokens).encode("utf-8"))] if tokens else []
+    return [
+        zlib.crc32(" ".join(tokens[i:i + k]).encode("utf-8"))
+        for i in range(len(tokens) - k + 1)
+    ]
+
+
+@lru_cache(maxsize=1)
+def _permutations(num_perm):
+    import numpy as np
+    rng = np.random.RandomState(1)  # fixed seed: signatures are comparable across runs
+    a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(hashes, num_perm=NUM_PERM):
+    """
+    MinHash signature of a set of 32-bit shingle hashes.
+
+    Uses h(x) = ((a * x + b) mod p) & 0xffffffff with a, b, x < 2^32 so the
+    products fit in uint64; vectorized over all shingles at once.
+    """
+    import numpy as np
+    a, b = _permutations(num_perm)
+    if not hashes:
+        return np.full(num_perm, _MAX_HASH, dtype=np.uint64)
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    permuted = ((np.outer(values, a) + b) % np.uint64(_PRIME)) & np.uint64(_MAX_HASH)
+    return permuted.min(axis=0)
+
+
+def simhash(tokens):
+    """64-bit SimHash over word counts."""
+    import numpy as np
+    counts = Counter(tokens)
+    if not counts:
+        return 0
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big") for t in counts],
+        dtype=np.uint64,
+    )
+    weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    totals = (np.where(bits == 1, 1, -1) * weights[:, None]).sum(axis=0)
+    return sum(1 << bit for bit in range(64) if totals[bit] > 0)
+
+
+def shingle_text(text):
+    """
+    Tokenizes a text and hashes its shingles, without the MinHash and
+    SimHash signatures (callers that only align or index shingles).
+
+    Returns:
+        dict: tokens, shingles (ordered hashes).
+    """
+    tokens = tokenize(text)
+    return {"tokens": tokens, "shingles": shingle_hashes(tokens)}
+
+
+def sign_text(text):
+    """
+    Tokenizes a text and computes its signatures.
+
+    Returns:
+        dict: tokens, shingles (ordered hashes), minhash, simhash.
+    """
+    signature = shingle_text(text)
+    signature["minhash"] = minhash_signature(set(signature["shingles"]))
+    signature["simhash"] = simhash(signature["tokens"])
+    return signature
+
+
+@lru_cache(maxsize=256)
+def text_signature(text):
+    """
+    Cached sign_text(), so comparing one transcript against many articles (or
+    every article against every other) only signs each text once.
+    """
+    return sign_text(text)
+
+
+def estimate_similarity(sig_a, sig_b):
+    """MinHash estimate of the Jaccard similarity of the two shingle sets."""
+    return float((sig_a["minhash"] == sig_b["minhash"]).mean())
+
+
+def simhash_similarity(sig_a, sig_b):
+    """Fraction of SimHash bits that agree."""
+    return 1.0 - bin(sig_a["simhash"] ^ sig_b["simhash"]).count("1") / 64
+
+
+def aligned_ratio(sig_a, sig_b, k=SHINGLE_SIZE):
+    """
+    Exact alignment of two signed texts, scored like SequenceMatcher.ratio().
+
+    Aligns the ordered shingle hashes; a run of n matching shingles covers
+    n + k - 1 words. Each covered word counts its length plus one separator,
+    so the result is 2 * matched characters / total characters of the
+    normalized texts. Edits isolated to fewer than k words between two
+    changes are counted as unmatched, so scores can read slightly low next to
+    a word-by-word alignment.
+    """
+    tokens_a, tokens_b = sig_a["tokens"], sig_b["tokens"]
+    total = sum(len(t) + 1 for t in tokens_a) + sum(len(t) + 1 for t in tokens_b)
+    if not total:
+        return 1.0
+    matcher = SequenceMatcher(None, sig_a["shingles"], sig_b["shingles"], autojunk=False)
+    covered = bytearray(len(tokens_a))
+    for block in matcher.get_matching_blocks():
+        if block.size:
+            end = min(block.a + block.size + k - 1, len(tokens_a))
+            covered[block.a:end] = b"\x01" * (end - block.a)
+    matched = sum(len(t) + 1 for t, hit in zip(tokens_a, covered) if hit)
+    return 2.0 * matched / total
+
+
+def compare_texts(a, b, threshold=CANDIDATE_THRESHOLD):
+    """
+    Similarity of two texts on the SequenceMatcher.ratio() scale.
+
+    Pairs whose MinHash and SimHash both say "unrelated" are not aligned; they
+    get the MinHash estimate converted to a Dice score (2J / (1 + J)), which
+    stays well below any score an aligned pair would reach.
+
+    Args:
+        a (str): First text (e.g. a transcript).
+        b (str): Second text (e.g. an article).
+        threshold (float): Shingle Jaccard estimate that triggers exact alignment.
+
+    Returns:
+        float: Similarity in [0, 1].
+    """
+    sig_a, sig_b = text_signature(a), text_signature(b)
+    if not sig_a["tokens"] or not sig_b["tokens"]:
+        return 1.0 if not sig_a["tokens"] and not sig_b["tokens"] else 0.0
+
+    jaccard = estimate_similarity(sig_a, sig_b)
+    if jaccard < threshold and simhash_similarity(sig_a, sig_b) < SIMHASH_THRESHOLD:
+        logger.debug(f"⏩ Skipping alignment (jaccard≈{jaccard:.3f})")
+        return 2 * jaccard / (1 + jaccard)
+
+    return aligned_ratio(sig_a, sig_b)
@@ -5,39 +5,133 @@
 # Requires: pip install openai-whisper, moviepy, SpeechRecognition
 # --------------------------------------------------
 #
-# Function: whisper_transcribe_full_video(video_path: str) -> str
+# Function: detect_media_language(media_path: str, model_name: str, samples: int) -> dict
+#   Language of a media file from a few 30-second sample windows.
+#
+# Function: whisper_transcribe_full_video(video_path: str, language: str) -> str
 #   Transcribes the entire video into one block of text using Whisper.
 #
-# Function: whisper_transcribe_video_by_minute(video_path: str) -> dict[str, str]
-#   Breaks the video into 60-second chunks and transcribes each using Whisper.
+# Function: whisper_transcribe_video_by_minute(video_path: str, language: str) -> dict[str, str]
+#   Breaks the video into 60-second chunks and transcribes each using Whisper;
+#   the language is detected once and pinned for every chunk.
+#
+# Function: whisper_transcribe_and_translate(media_path: str, model_name: str, language: str) -> dict
+#   Source-language and English segments from one pass over the audio.
+#
+# Function: segments_by_minute(segments: list[dict]) -> dict[str, str]
+#   Buckets timestamped segments into the {"0-60s": text} minute format.
 # --------------------------------------------------
 
 import os
 import tempfile
 import logging
 import time
+from functools import lru_cache
 
-from moviepy.editor import VideoFileClip
-import whisper
-import speech_recognition as sr
+# moviepy, whisper and speech_recognition take seconds to import, so they are
+# loaded inside the functions that need them rather than at module load.
 
 # === Logger Setup ===
 logger = logging.getLogger(__name__)
 logger.info(f"📦 {__name__} imported into {__file__}")
 
+LANGUAGE_SAMPLES = 3        # 30-second windows used to detect a file's language
+SAMPLE_SECONDS = 30
+
+
 # === WHISPER TRANSCRIPTION FUNCTIONS ===
 
-def whisper_transcribe_full_video(video_path):
+@lru_cache(maxsize=2)
+def load_whisper_model(model_name="base"):
+    """Loads a Whisper model once per process."""
+    import whisper
+
+    return whisper.load_model(model_name)
+
+
+def _media_duration(media_path):
+    import subprocess
+
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", media_path],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    return float(out) if out and out != "N/A" else 0.0
+
+
+def _load_audio_window(media_path, start, seconds):
+    """Decodes seconds of audio from start as 16 kHz mono float32 (like whisper.load_audio)."""
+    import subprocess
+    import numpy as np
+
+    out = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-ss", f"{start:.2f}", "-t", f"{seconds:.2f}", "-i", media_path,
+         "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", "16000", "-"],
+        capture_output=True, check=True,
+    ).stdout
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def detect_media_language(media_path, model_name="base", samples=LANGUAGE_SAMPLES):
+    """
+    Detects the spoken language of a media file once, from a few windows.
+
+    Sample windows are spread evenly over the file, away from the very
+    start, which is often music or silence. Whisper's language
+    probabilities are averaged over the windows.
+
+    Args:
+        media_path (str): Video or audio file.
+        model_name (str): Whisper model used for detection.
+        samples (int): Number of 30-second windows.
+
+    Returns:
+        dict: {"language", "probability", "top": {code: prob} (5 best), "samples", "model"}
+    """
+    import whisper
+
+    model = load_whisper_model(model_name)
+    duration = _media_duration(media_path)
+    if duration <= SAMPLE_SECONDS * samples:
+        starts = [i * SAMPLE_SECONDS for i in range(max(1, int(duration // SAMPLE_SECONDS)))][:samples]
+    else:
+        starts = [duration * (i + 1) / (samples + 1) - SAMPLE_SECONDS / 2 for i in range(samples)]
+
+    totals = {}
+    for start in starts:
+        audio = whisper.pad_or_trim(_load_audio_window(media_path, start, SAMPLE_SECONDS))
+        mel = whisper.log_mel_spectrogram(audio, model.dims.n_mels).to(model.device)
+        _, probs = model.detect_language(mel)
+        for code, prob in probs.items():
+            totals[code] = totals.get(code, 0.0) + prob / len(starts)
+
+    top = dict(sorted(totals.items(), key=lambda item: -item[1])[:5])
+    language = next(iter(top))
+    logger.info(f"🌍 {os.path.basename(media_path)}: {language} ({top[language]:.0%} over {len(starts)} windows)")
+    return {
+        "language": language,
+        "probability": round(top[language], 4),
+        "top": {code: round(prob, 4) for code, prob in top.items()},
+        "samples": [round(start, 2) for start in starts],
+        "model": model_name,
+    }
+
+
+def whisper_transcribe_full_video(video_path, language=None, model_name="base"):
     """
     Transcribes an entire video using OpenAI's Whisper model.
 
     Args:
         video_path (str): Path to input video.
+        language (str): Language code to decode in; Whisper detects it when None.
+        model_name (str): tiny, base, small, medium or large.
 
     Returns:
         str: Full transcription as one block of text.
     """
-    model = whisper.load_model("base")  # Options: tiny, base, small, medium, large
+    from moviepy.editor import VideoFileClip
+
+    model = load_whisper_model(model_name)
 
     with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio_file:
         clip = VideoFileClip(video_path)
@@ -45,22 +139,32 @@ def whisper_transcribe_full_video(video_path):
         audio.write_audiofile(temp_audio_file.name)
         clip.close()
 
-        result = model.transcribe(temp_audio_file.name)
+        result = model.transcribe(temp_audio_file.name, language=language)
         os.remove(temp_audio_file.name)
         return result["text"]
 
 
-def whisper_transcribe_video_by_minute(video_path):
+def whisper_transcribe_video_by_minute(video_path, language=None, model_name="base"):
     """
     Breaks a video into 60-second chunks and transcribes each using Whisper.
 
+    Every chunk is decoded in the same language. When none is given it is
+    detected once with detect_media_language(), rather than once per chunk
+    by Whisper.
+
     Args:
         video_path (str): Path to input video.
+        language (str): Language code to decode in.
+        model_name (str): tiny, base, small, medium or large.
 
     Returns:
         dict[str, str]: Mapping of time ranges to transcribed text.
     """
-    model = whisper.load_model("base")
+    from moviepy.editor import VideoFileClip
+
+    model = load_whisper_model(model_name)
+    if language is None:
+        language = detect_media_language(video_path, model_name)["language"]
     video = VideoFileClip(video_path)
     duration = int(video.duration)
     transcript = {}
@@ -71,13 +175,147 @@ def whisper_transcribe_video_by_minute(video_path):
             audio_clip = video.audio.subclip(start, end)
             audio_clip.write_audiofile(temp_audio_file.name)
 
-            result = model.transcribe(temp_audio_file.name)
+            result = model.transcribe(temp_audio_file.name, language=language)
             os.remove(temp_audio_file.name)
             transcript[f"{start}-{end}s"] = result["text"]
 
     video.close()
     return transcript
 
+def _timestamped_segments(tokens, tokenizer, offset, window_seconds):
+    """
+    Splits decoded tokens (text and <|t|> timestamp tokens) into segments.
+
+    Returns:
+        tuple: (segments, consumed_seconds). A trailing segment without a
+        closing timestamp is dropped and consumed_seconds stops at the last
+        complete segment, so the next window decodes it again (as
+        whisper.transcribe does).
+    """
+    timestamp_begin = tokenizer.timestamp_begin
+    segments = []
+    start = None
+    text_tokens = []
+    for token in tokens:
+        if token >= timestamp_begin:
+            time_s = (token - timestamp_begin) * 0.02
+            if start is not None and text_tokens:
+                segments.append({"start": offset + start, "end": offset + time_s,
+                                 "text": tokenizer.decode(text_tokens).strip()})
+                text_tokens = []
+                start = None
+            else:
+                start = time_s
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+
+    if not text_tokens:
+        return segments, window_seconds
+    if not segments:
+        # No timestamps at all: the whole window is one segment
+        return [{"start": offset + (start or 0.0), "end": offset + window_seconds,
+                 "text": tokenizer.decode(text_tokens).strip()}], window_seconds
+    return segments, segments[-1]["end"] - offset
+
+
+def whisper_transcribe_and_translate(media_path, model_name="base", language=None, shared_encoder=True):
+    """
+    Transcribes a video/audio file and translates it to English in one pass.
+
+    With shared_encoder (default) every 30-second window is encoded once and
+    decoded twice from the same encoder output: once with task="transcribe"
+    and once with task="translate". The window advances to the last complete
+    source segment. Without it, model.transcribe() runs twice on the decoded
+    audio. That path has whisper's temperature fallback and prompt
+    conditioning, but encodes everything twice.
+
+    Args:
+        media_path (str): Video or audio file (anything ffmpeg reads).
+        model_name (str): Whisper model (tiny, base, small, medium, large).
+        language (str): Source language code; detected when None.
+        shared_encoder (bool): Decode both tasks from one encoder pass.
+
+    Returns:
+        dict: {"language", "segments", "translation", "text", "translated_text"};
+        segments and translation are lists of {"start", "end", "text"}.
+    """
+    import torch
+    import whisper
+    from whisper.audio import N_FRAMES, HOP_LENGTH, SAMPLE_RATE
+
+    model = load_whisper_model(model_name)
+    audio = whisper.load_audio(media_path)
+    fp16 = model.device.type == "cuda"
+
+    if not shared_encoder:
+        source = model.transcribe(audio, task="transcribe", language=language, fp16=fp16)
+        english = model.transcribe(audio, task="translate", language=source["language"], fp16=fp16)
+        segments = [{"start": s["start"], "end": s["end"], "text": s["text"].strip()} for s in source["segments"]]
+        translation = [{"start": s["start"], "end": s["end"], "text": s["text"].strip()} for s in english["segments"]]
+        return {
+            "language": source["language"],
+            "segments": segments,
+            "translation": translation,
+            "text": source["text"].strip(),
+            "translated_text": english["text"].strip(),
+        }
+
+    start = time.perf_counter()
+    mel = whisper.log_mel_spectrogram(audio, model.dims.n_mels, padding=N_FRAMES * HOP_LENGTH)
+    content_frames = mel.shape[-1] - N_FRAMES
+    frame_seconds = HOP_LENGTH / SAMPLE_RATE
+    dtype = torch.float16 if fp16 else torch.float32
+
+    segments = []
+    translation = []
+    seek = 0
+    while seek < content_frames:
+        window_frames = min(N_FRAMES, content_frames - seek)
+        window = whisper.pad_or_trim(mel[:, seek:seek + window_frames], N_FRAMES).to(model.device).to(dtype)
+        features = model.embed_audio(window.unsqueeze(0))
+
+        if language is None:
+            _, probs = model.detect_language(features)
+            language = max(probs[0], key=probs[0].get)
+            logger.info(f"🌍 Detected language: {language}")
+        tokenizer = whisper.tokenizer.get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                                    language=language, task="transcribe")
+
+        offset = seek * frame_seconds
+        window_seconds = window_frames * frame_seconds
+        source, english = (
+            whisper.decode(model, features, whisper.DecodingOptions(task=task, language=language, fp16=fp16))[0]
+            for task in ("transcribe", "translate")
+        )
+
+        window_segments, consumed = _timestamped_segments(source.tokens, tokenizer, offset, window_seconds)
+        window_translation, _ = _timestamped_segments(english.tokens, tokenizer, offset, window_seconds)
+        segments.extend(window_segments)
+        # English segments past the consumed point are decoded again with the next window
+        translation.extend(seg for seg in window_translation if seg["start"] < offset + consumed - 0.5)
+
+        # Guard against a window that yields no progress (e.g. a segment ending at 0.00)
+        seek += round((consumed if consumed >= 1.0 else window_seconds) / frame_seconds)
+
+    logger.info(f"🗣️ Transcribed and translated {content_frames * frame_seconds:.0f}s of audio "
+                f"in {time.perf_counter() - start:.1f}s ({len(segments)} segments)")
+    return {
+        "language": language,
+        "segments": segments,
+        "translation": translation,
+        "text": " ".join(seg["text"] for seg in segments),
+        "translated_text": " ".join(seg["text"] for seg in translation),
+    }
+
+
+def segments_by_minute(segments):
+    """Buckets segments by start minute into the {"0-60s": text} minute-transcript format."""
+    minutes = {}
+    for seg in segments:
+        minute = int(seg["start"] // 60)
+        minutes.setdefault(minute, []).append(seg["text"])
+    return {f"{m * 60}-{m * 60 + 60}s": " ".join(texts) for m, texts in sorted(minutes.items())}
+
 # === GOOGLE SPEECH RECOGNITION TRANSCRIPTION ===
 
 def transcribe_full_video(video_path):
@@ -109,6 +347,9 @@ def transcribe_video_by_minute(video_path, output_dir):
     Returns:
         str: Full stitched transcript.
     """
+    import speech_recognition as sr
+    from moviepy.editor import VideoFileClip
+
     video = VideoFileClip(video_path)
     duration = int(video.duration)
     os.makedirs(output_dir, exist_ok=True)
@@ -163,46 +404,8 @@ def transcribe_video_by_minute(video_path, output_dir):
     return "\n".join(stitched_transcript)
 
 
-import requests
-from bs4 import BeautifulSoup
-import re
-
-def extract_editorial_content(url):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        return None
-
-    soup = BeautifulSoup(response.text, "lxml")
-    for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
-        tag.extract()
-
-    main_content = (
-        soup.find("article") or 
-        soup.find("div", {"id": "main-content"}) or 
-        soup.find("div", {"class": "content"})
-    )
-
-    if main_content:
-        return main_content
-
-    paragraphs = soup.find_all("p")
-    wrapper = soup.new_tag("div")
-    for p in paragraphs[:200]:
-        wrapper.append(p)
-    return wrapper
-
-def get_text_with_italics(element):
-    parts = []
-    for tag in element.descendants:
-        if tag.name in ["em", "i"]:
-            parts.append(f"*{tag.get_text(strip=True)}*")
-        elif tag.name is None:
-            parts.append(tag.strip())
-    return " ".join(parts)
-
-def slugify_url(url):
-    return re.sub(r'\W+', '-', url.split("//")[-1].split("/")[0].replace("www.", "")).strip("-")
+# Article scraping lives in scraper.py; re-exported here for existing callers.
+from scraper import extract_editorial_content, get_text_with_italics, slugify_url, scrape_articles
 
 def distill_run_snapshot(output_dir, input_video, urls, config):
     import socket
@@ -275,6 +478,8 @@ def distill_run_snapshot(output_dir, input_video, urls, config):
 import re
 
 def chunk_sentences(audio_path, model_name='base'):
+    import whisper
+
     model = whisper.load_model(model_name)
     result = model.transcribe(audio_path, verbose=False)
 
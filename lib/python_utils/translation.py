@@ -0,0 +1,277 @@
+# === MACHINE TRANSLATION (MarianMT) ===
+# --------------------------------------------------
+# Translates transcripts sentence by sentence in padded batches.
+#
+# - Text is split into sentences, at Latin (.!?…) and CJK (。！？)
+#   sentence punctuation. Sentences too long for the model, by words or by
+#   characters (CJK text has no spaces to count), are split further at
+#   clause boundaries or fixed windows, so nothing is truncated (the old
+#   per-minute call cut every minute at 512 tokens).
+# - All sentences of a transcript are translated together: unique
+#   sentences are sorted by length and grouped into batches, so padding is
+#   minimal and generate() runs once per batch instead of once per minute.
+# - Translations are cached by a hash of model name + sentence, so repeated
+#   sentences (and repeated calls) are translated once per process.
+# - With a translation memory (translation_memory.open_memory()), sentences
+#   are looked up there first (exact, then fuzzy) and new translations are
+#   stored, so reruns only send novel sentences to the model.
+# - The tokenizer and model are loaded on first use and kept per model name.
+# - Only language pairs with a published MarianMT model are routed to one
+#   (MARIAN_MODELS). Other sources fall back to the multilingual model for
+#   the target (MULTILINGUAL_MODELS), or are skipped with a warning when
+#   there is none, instead of naming a model that does not exist.
+#
+# Requires: pip install transformers sentencepiece torch
+# --------------------------------------------------
+#
+# Function: model_for_language(language: str, target: str) -> str | None
+#   MarianMT model for a source language (None when no translation is needed
+#   or none is available).
+#
+# Function: split_sentences(text: str, max_words: int, max_chars: int) -> list[str]
+#   Sentences, with over-long ones split into pieces of at most max_words
+#   words and max_chars characters.
+#
+# Function: load_model(model_name: str) -> tuple
+#   Cached (tokenizer, model, device) for a MarianMT model.
+#
+# Function: translate_sentences(sentences: list[str], model_name: str, batch_size: int, memory, stats) -> list[str]
+#   Batched, cached translation of sentences, in input order.
+#
+# Function: translate_text(text: str, model_name: str) -> str
+#   Translation of a whole text.
+#
+# Function: translate_chunks(chunks: list[str], model_name: str) -> list[str]
+#   Translation of many texts (e.g. minute chunks) in one batched pass.
+# --------------------------------------------------
+
+import re
+import time
+import hashlib
+import logging
+from functools import lru_cache
+
+# transformers/torch take seconds to import and the model is hundreds of MB,
+# so both are loaded on first use rather than at import time.
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "Helsinki-NLP/opus-mt-es-en"
+BATCH_SIZE = 16
+MAX_SENTENCE_WORDS = 120    # ~200 Marian tokens, well inside the 512-token limit
+MAX_SENTENCE_CHARS = 400    # at most ~400 tokens even for CJK, about one token per character
+MAX_INPUT_TOKENS = 512
+
+# (source, target) -> Helsinki-NLP model published for that pair
+MARIAN_MODELS = {
+    (source, "en"): f"Helsinki-NLP/opus-mt-{source}-en"
+    for source in ("ar", "cs", "da", "de", "es", "fi", "fr", "hi", "id", "it",
+                   "ja", "ko", "nl", "pl", "ru", "sv", "tr", "uk", "vi", "zh")
+}
+# target -> many-to-one model used for sources without their own pair
+MULTILINGUAL_MODELS = {"en": "Helsinki-NLP/opus-mt-mul-en"}
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])\s*")
+_CLAUSE_RE = re.compile(r"(?<=[,;:，；：、])")
+
+_cache = {}
+
+
+def model_for_language(language, target="en"):
+    """
+    Routes a detected language to its Helsinki-NLP MarianMT model.
+
+    Returns:
+        str | None: e.g. "Helsinki-NLP/opus-mt-es-en"; the multilingual
+        model when the pair has no model of its own; None when the text is
+        already in the target language or no model covers it.
+    """
+    if not language or language == target:
+        return None
+    model_name = MARIAN_MODELS.get((language, target))
+    if model_name:
+        return model_name
+    model_name = MULTILINGUAL_MODELS.get(target)
+    if model_name:
+        logger.warning(f"⚠️ No MarianMT model for {language}->{target}; using {model_name}")
+        return model_name
+    logger.warning(f"⚠️ No MarianMT model for {language}->{target}; not translating")
+    return None
+
+
+def _fits(text, max_words, max_chars):
+    return len(text.split()) <= max_words and len(text) <= max_chars
+
+
+def _windows(text, max_words, max_chars):
+    """Cuts text into windows of at most max_words words and max_chars characters."""
+    windows = []
+    text = text.strip()
+    while text:
+        window = " ".join(text.split(" ", max_words)[:max_words])
+        if len(window) > max_chars:
+            cut = window.rfind(" ", 0, max_chars + 1)
+            window = window[:cut] if cut > 0 else window[:max_chars]
+        windows.append(window)
+        text = text[len(window):].strip()
+    return windows
+
+
+def split_sentences(text, max_words=MAX_SENTENCE_WORDS, max_chars=MAX_SENTENCE_CHARS):
+    """
+    Splits text into sentences small enough to translate without truncation.
+
+    Over-long sentences (more than max_words words or max_chars characters)
+    are split at clause punctuation, and pieces that are still too long are
+    cut into fixed windows.
+    """
+    pieces = []
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        if _fits(sentence, max_words, max_chars):
+            pieces.append(sentence)
+            continue
+
+        current = ""
+        for clause in _CLAUSE_RE.split(sentence):
+            if current and not _fits(current + clause, max_words, max_chars):
+                pieces.append(current.strip())
+                current = ""
+            current += clause
+            if not _fits(current, max_words, max_chars):
+                *done, current = _windows(current, max_words, max_chars)
+                pieces.extend(done)
+        if current.strip():
+            pieces.append(current.strip())
+    return pieces
+
+
+@lru_cache(maxsize=4)
+def load_model(model_name=DEFAULT_MODEL):
+    """
+    Loads a MarianMT tokenizer and model once per process.
+
+    Returns:
+        tuple: (tokenizer, model, device)
+    """
+    import torch
+    from transformers import MarianMTModel, MarianTokenizer
+
+    start = time.perf_counter()
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    tokenizer = MarianTokenizer.from_pretrained(model_name)
+    model = MarianMTModel.from_pretrained(model_name).to(device)
+    model.eval()
+    logger.info(f"🧠 Loaded {model_name} on {device} in {time.perf_counter() - start:.1f}s")
+    return tokenizer, model, device
+
+
+def _cache_key(model_name, sentence):
+    return hashlib.sha256(f"{model_name}\0{sentence}".encode("utf-8")).hexdigest()
+
+
+def _generate(batch, model_name):
+    import torch
+
+    tokenizer, model, device = load_model(model_name)
+    inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True,
+                       max_length=MAX_INPUT_TOKENS).to(device)
+    with torch.inference_mode():
+        output = model.generate(**inputs)
+    return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+
+def _count(stats, name, amount):
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + amount
+
+
+def translate_sentences(sentences, model_name=DEFAULT_MODEL, batch_size=BATCH_SIZE,
+                        memory=None, fuzzy_threshold=None, stats=None):
+    """
+    Translates sentences in length-sorted padded batches.
+
+    Args:
+        sentences (list[str]): Sentences (see split_sentences()).
+        model_name (str): Hugging Face MarianMT model.
+        batch_size (int): Sentences per generate() call.
+        memory (sqlite3.Connection): Optional translation memory to consult
+            before the model and to store new translations in.
+        fuzzy_threshold (float): Fuzzy match threshold for the memory;
+            None uses translation_memory.FUZZY_THRESHOLD.
+        stats (dict): Optional counters to accumulate into: "sentences",
+            "cached", "memory_exact", "memory_fuzzy", "translated".
+
+    Returns:
+        list[str]: Translations in input order ("" for blank input).
+    """
+    keys = [_cache_key(model_name, s) if s.strip() else None for s in sentences]
+    pending = {}
+    for key, sentence in zip(keys, sentences):
+        if key and key not in _cache:
+            pending[key] = sentence
+    _count(stats, "sentences", len(sentences))
+    _count(stats, "cached", len(sentences) - len(pending))
+
+    if pending and memory is not None:
+        from translation_memory import lookup_sentences, FUZZY_THRESHOLD
+
+        threshold = FUZZY_THRESHOLD if fuzzy_threshold is None else fuzzy_threshold
+        found = lookup_sentences(memory, list(pending.values()), model_name, threshold)
+        for key, translation in zip(list(pending), found["translations"]):
+            if translation is not None:
+                _cache[key] = translation
+                del pending[key]
+        metrics = found["metrics"]
+        _count(stats, "memory_exact", metrics["exact"])
+        _count(stats, "memory_fuzzy", metrics["fuzzy"])
+        logger.info(f"📚 Translation memory: {metrics['exact']} exact, {metrics['fuzzy']} fuzzy, "
+                    f"{metrics['misses']} new ({metrics['hit_rate']:.0%} hit rate)")
+
+    if pending:
+        start = time.perf_counter()
+        todo = sorted(pending.items(), key=lambda item: len(item[1]), reverse=True)
+        for i in range(0, len(todo), batch_size):
+            batch = todo[i:i + batch_size]
+            for (key, _), translation in zip(batch, _generate([s for _, s in batch], model_name)):
+                _cache[key] = translation
+        elapsed = time.perf_counter() - start
+        logger.info(f"🌐 Translated {len(pending)} new sentences in {elapsed:.1f}s "
+                    f"({len(sentences) - len(pending)} cached, remembered or repeated)")
+        _count(stats, "translated", len(pending))
+
+        if memory is not None:
+            from translation_memory import store_translations
+            store_translations(memory, [(s, _cache[key]) for key, s in pending.items()], model_name)
+
+    return [_cache[key] if key else "" for key in keys]
+
+
+def translate_chunks(chunks, model_name=DEFAULT_MODEL, batch_size=BATCH_SIZE, **kwargs):
+    """
+    Translates many texts in one batched pass.
+
+    Args:
+        chunks (list[str]): Texts, e.g. the minute chunks of a transcript.
+        **kwargs: memory, fuzzy_threshold, stats (see translate_sentences()).
+
+    Returns:
+        list[str]: One translation per chunk.
+    """
+    split = [split_sentences(chunk) for chunk in chunks]
+    flat = translate_sentences([s for sentences in split for s in sentences], model_name, batch_size, **kwargs)
+
+    translations = []
+    position = 0
+    for sentences in split:
+        translations.append(" ".join(flat[position:position + len(sentences)]))
+        position += len(sentences)
+    return translations
+
+
+def translate_text(text, model_name=DEFAULT_MODEL, batch_size=BATCH_SIZE, **kwargs):
+    """Translates a whole text, sentence by sentence."""
+    return translate_chunks([text], model_name, batch_size, **kwargs)[0]
@@ -0,0 +1,222 @@
+# === TRANSLATION MEMORY ===
+# --------------------------------------------------
+# SQLite store of translated sentences, so reruns and near-duplicate videos
+# do not send the same sentences through the neural model again.
+#
+# - Entries are keyed by (model name, normalized source sentence).
+#   Normalization casefolds, applies NFKC and collapses whitespace.
+# - Exact lookup goes through the primary key.
+# - Fuzzy lookup finds candidates through a word index (tm_words), keeps
+#   those of similar length, and accepts the best one whose difflib ratio
+#   to the query is at least fuzzy_threshold. The default of 0.95 only
+#   catches punctuation, filler-word and single-typo differences.
+# - Every lookup updates the entry's hit counter. lookup_sentences()
+#   returns per-call hit metrics and memory_stats() reports totals.
+# --------------------------------------------------
+#
+# Function: open_memory(db_path: str) -> sqlite3.Connection
+#   Opens (and creates if needed) the translation memory.
+#
+# Function: normalize_sentence(sentence: str) -> str
+#   Lookup form of a source sentence.
+#
+# Function: lookup_sentences(conn, sentences: list[str], model_name: str, fuzzy_threshold: float) -> dict
+#   {"translations": [str | None], "metrics": {...}} for a list of sentences.
+#
+# Function: store_translations(conn, pairs: list[tuple[str, str]], model_name: str) -> int
+#   Adds (source, translation) pairs; returns the number of new entries.
+#
+# Function: memory_stats(conn) -> dict
+#   Entries and lifetime hits per model.
+# --------------------------------------------------
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import unicodedata
+from difflib import SequenceMatcher
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_TM_PATH = "./cache/translation_memory.sqlite3"
+FUZZY_THRESHOLD = 0.95
+FUZZY_CANDIDATES = 20      # candidates verified with difflib per sentence
+MIN_FUZZY_WORDS = 4        # shorter sentences are only matched exactly
+
+_WORD_RE = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tm_entries (
+    model      TEXT NOT NULL,
+    key        TEXT NOT NULL,              -- sha256 of the normalized source
+    source     TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    target     TEXT NOT NULL,
+    words      INTEGER NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0,
+    created    REAL NOT NULL,
+    last_used  REAL,
+    PRIMARY KEY (model, key)
+);
+CREATE TABLE IF NOT EXISTS tm_words (
+    model TEXT NOT NULL,
+    word  TEXT NOT NULL,
+    key   TEXT NOT NULL,
+    PRIMARY KEY (model, word, key)
+) WITHOUT ROWID;
+"""
+
+
+def open_memory(db_path=DEFAULT_TM_PATH):
+    """
+    Opens (and creates if needed) the translation memory.
+
+    Args:
+        db_path (str): Path to the SQLite file.
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode with WAL enabled.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def normalize_sentence(sentence):
+    return " ".join(unicodedata.normalize("NFKC", sentence).casefold().split())
+
+
+def _key(normalized):
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _fuzzy_match(conn, normalized, model_name, threshold):
+    """Best stored entry with difflib ratio >= threshold, or None."""
+    words = sorted(set(_WORD_RE.findall(normalized)))
+    if len(words) < MIN_FUZZY_WORDS:
+        return None
+
+    # A ratio of t between strings of n and m words needs roughly
+    # min_shared words in common and a length within [n*t, n/t].
+    min_shared = max(1, int(len(words) * (2 * threshold - 1)))
+    length = len(normalized.split())
+    placeholders = ",".join("?" * len(words))
+    rows = conn.execute(
+        f"""
+        SELECT e.key, e.normalized, e.target, COUNT(*) AS shared
+        FROM tm_words w JOIN tm_entries e ON e.model = w.model AND e.key = w.key
+        WHERE w.model = ? AND w.word IN ({placeholders}) AND e.words BETWEEN ? AND ?
+        GROUP BY e.key
+        HAVING shared >= ?
+        ORDER BY shared DESC
+        LIMIT ?
+        """,
+        (model_name, *words, int(length * threshold), int(length / threshold) + 1, min_shared, FUZZY_CANDIDATES),
+    ).fetchall()
+
+    best = None
+    for row in rows:
+        matcher = SequenceMatcher(None, normalized, row["normalized"], autojunk=False)
+        if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= threshold and (best is None or ratio > best[0]):
+            best = (ratio, row)
+    return best[1] if best else None
+
+
+def lookup_sentences(conn, sentences, model_name, fuzzy_threshold=FUZZY_THRESHOLD):
+    """
+    Looks sentences up in the translation memory.
+
+    Args:
+        conn (sqlite3.Connection): From open_memory().
+        sentences (list[str]): Source sentences.
+        model_name (str): Model the translations must come from.
+        fuzzy_threshold (float): Minimum difflib ratio for a fuzzy hit;
+            None disables fuzzy lookup.
+
+    Returns:
+        dict: {"translations": [str | None per sentence],
+               "metrics": {"lookups", "exact", "fuzzy", "misses", "hit_rate"}}
+    """
+    translations = []
+    exact = fuzzy = 0
+    used = []
+    for sentence in sentences:
+        normalized = normalize_sentence(sentence)
+        row = conn.execute("SELECT key, target FROM tm_entries WHERE model = ? AND key = ?",
+                           (model_name, _key(normalized))).fetchone()
+        if row:
+            exact += 1
+        elif fuzzy_threshold is not None:
+            row = _fuzzy_match(conn, normalized, model_name, fuzzy_threshold)
+            fuzzy += 1 if row else 0
+        translations.append(row["target"] if row else None)
+        if row:
+            used.append((time.time(), model_name, row["key"]))
+
+    if used:
+        conn.executemany("UPDATE tm_entries SET hits = hits + 1, last_used = ? WHERE model = ? AND key = ?", used)
+
+    lookups = len(sentences)
+    metrics = {
+        "lookups": lookups,
+        "exact": exact,
+        "fuzzy": fuzzy,
+        "misses": lookups - exact - fuzzy,
+        "hit_rate": (exact + fuzzy) / lookups if lookups else 0.0,
+    }
+    return {"translations": translations, "metrics": metrics}
+
+
+def store_translations(conn, pairs, model_name):
+    """
+    Adds (source, translation) pairs to the memory. Existing entries are kept.
+
+    Returns:
+        int: Number of new entries.
+    """
+    now = time.time()
+    added = 0
+    conn.execute("BEGIN")
+    try:
+        for source, target in pairs:
+            normalized = normalize_sentence(source)
+            if not normalized:
+                continue
+            key = _key(normalized)
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO tm_entries (model, key, source, normalized, target, words, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (model_name, key, source, normalized, target, len(normalized.split()), now),
+            )
+            if cursor.rowcount:
+                added += 1
+                conn.executemany("INSERT OR IGNORE INTO tm_words (model, word, key) VALUES (?, ?, ?)",
+                                 [(model_name, word, key) for word in set(_WORD_RE.findall(normalized))])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return added
+
+
+def memory_stats(conn):
+    """
+    Returns:
+        dict: model -> {"entries", "hits", "reused_entries"}
+    """
+    rows = conn.execute(
+        "SELECT model, COUNT(*) AS entries, SUM(hits) AS hits, SUM(hits > 0) AS reused "
+        "FROM tm_entries GROUP BY model"
+    ).fetchall()
+    return {row["model"]: {"entries": row["entries"], "hits": row["hits"] or 0,
+                           "reused_entries": row["reused"] or 0} for row in rows}
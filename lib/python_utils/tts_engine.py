@@ -0,0 +1,194 @@
+# === LONG-TEXT TEXT-TO-SPEECH ===
+# --------------------------------------------------
+# Synthesizes long transcripts (podcasts) with Coqui TTS without feeding the
+# whole text to the model at once.
+#
+# - Text is split into short sentences (translation.split_sentences with a
+#   small word limit). Tacotron2 degrades and uses a lot of memory on long
+#   inputs.
+# - Every sentence is cached as a WAV under cache/tts/<model>/<sha256>.wav,
+#   so reruns only synthesize sentences that changed.
+# - Uncached sentences are synthesized in worker processes. Each worker
+#   loads the model once (initializer) and keeps it resident for all its
+#   sentences, instead of building a new TTS object per call.
+# - Sentence clips are joined with a short equal-power crossfade into the
+#   final WAV.
+#
+# Requires: pip install TTS numpy
+# --------------------------------------------------
+#
+# Function: load_tts(model_name: str) -> TTS
+#   Cached TTS instance for this process.
+#
+# Function: synthesize_long_text(text: str, output_path: str, model_name: str, workers: int, cache_dir: str) -> dict
+#   Sentence-level, cached, parallel synthesis into one WAV.
+#
+# Function: crossfade_concat(clips: list[np.ndarray], sample_rate: int, crossfade_ms: float) -> np.ndarray
+#   Joins clips with equal-power crossfades.
+# --------------------------------------------------
+
+import os
+import time
+import wave
+import hashlib
+import logging
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from translation import split_sentences
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTS_MODEL = "tts_models/en/ljspeech/tacotron2-DDC"
+DEFAULT_CACHE_DIR = "./cache/tts"
+MAX_SENTENCE_WORDS = 40
+CROSSFADE_MS = 40
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+_worker_model = None
+
+
+@lru_cache(maxsize=2)
+def load_tts(model_name=DEFAULT_TTS_MODEL):
+    """Loads a Coqui TTS model once per process."""
+    from TTS.api import TTS  # Heavy: only load once we actually synthesize
+
+    start = time.perf_counter()
+    tts = TTS(model_name=model_name, progress_bar=False)
+    logger.info(f"🔊 Loaded {model_name} in {time.perf_counter() - start:.1f}s (pid {os.getpid()})")
+    return tts
+
+
+def _cache_path(cache_dir, model_name, sentence):
+    model_dir = os.path.join(cache_dir, model_name.replace("/", "--"))
+    return os.path.join(model_dir, hashlib.sha256(sentence.encode("utf-8")).hexdigest() + ".wav")
+
+
+def _write_wav(path, samples, sample_rate):
+    import numpy as np
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with wave.open(tmp_path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+    os.replace(tmp_path, path)
+
+
+def _read_wav(path):
+    import numpy as np
+
+    with wave.open(path, "rb") as f:
+        sample_rate = f.getframerate()
+        pcm = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    return pcm.astype(np.float32) / 32767, sample_rate
+
+
+def _init_worker(model_name):
+    global _worker_model
+    _worker_model = load_tts(model_name)
+
+
+def _synthesize_sentence(task):
+    """Worker: synthesizes one sentence with the resident model into its cache file."""
+    import numpy as np
+
+    sentence, path = task
+    tts = _worker_model
+    samples = np.asarray(tts.tts(text=sentence), dtype=np.float32)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_wav(path, samples, tts.synthesizer.output_sample_rate)
+    return path
+
+
+def crossfade_concat(clips, sample_rate, crossfade_ms=CROSSFADE_MS):
+    """
+    Joins clips with an equal-power crossfade of crossfade_ms at each boundary.
+
+    Clips shorter than the crossfade are joined without one.
+    """
+    import numpy as np
+
+    clips = [clip for clip in clips if len(clip)]
+    if not clips:
+        return np.zeros(0, dtype=np.float32)
+
+    fade = int(sample_rate * crossfade_ms / 1000)
+    ramp = np.linspace(0.0, np.pi / 2, fade, dtype=np.float32) if fade else None
+    out = [clips[0]]
+    for clip in clips[1:]:
+        previous = out[-1]
+        if not fade or len(previous) < fade or len(clip) < fade:
+            out.append(clip)
+            continue
+        mixed = previous[-fade:] * np.cos(ramp) + clip[:fade] * np.sin(ramp)
+        out[-1] = previous[:-fade]
+        out.append(mixed)
+        out.append(clip[fade:])
+    return np.concatenate(out)
+
+
+def synthesize_long_text(text, output_path, model_name=DEFAULT_TTS_MODEL, workers=DEFAULT_WORKERS,
+                         cache_dir=DEFAULT_CACHE_DIR, crossfade_ms=CROSSFADE_MS):
+    """
+    Synthesizes a long text sentence by sentence into one WAV.
+
+    Args:
+        text (str): Text to speak.
+        output_path (str): Final WAV path.
+        model_name (str): Coqui TTS model.
+        workers (int): Worker processes for uncached sentences (1 = in this process).
+            Workers are spawned, so scripts must call this under a __main__ guard.
+        cache_dir (str): Per-sentence WAV cache.
+        crossfade_ms (float): Crossfade between sentences.
+
+    Returns:
+        dict: {"output", "sentences", "cached", "synthesized", "seconds", "elapsed"}
+    """
+    start = time.perf_counter()
+    sentences = split_sentences(text, MAX_SENTENCE_WORDS)
+    paths = [_cache_path(cache_dir, model_name, sentence) for sentence in sentences]
+
+    todo = list({path: sentence for sentence, path in zip(sentences, paths) if not os.path.exists(path)}.items())
+    logger.info(f"🗣️ {len(sentences)} sentences, {len(sentences) - len(todo)} cached, {len(todo)} to synthesize")
+
+    tasks = [(sentence, path) for path, sentence in todo]
+    if tasks and (workers <= 1 or len(tasks) == 1):
+        _init_worker(model_name)
+        for task in tasks:
+            _synthesize_sentence(task)
+    elif tasks:
+        # spawn, not fork: the parent may already hold torch/CUDA state (Whisper)
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(model_name,),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            for done, _ in enumerate(pool.map(_synthesize_sentence, tasks, chunksize=4), start=1):
+                if done % 25 == 0:
+                    logger.info(f"🔊 {done}/{len(tasks)} sentences synthesized")
+
+    clips = []
+    sample_rate = None
+    for path in paths:
+        samples, rate = _read_wav(path)
+        sample_rate = sample_rate or rate
+        clips.append(samples)
+
+    audio = crossfade_concat(clips, sample_rate or 22050, crossfade_ms)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    _write_wav(output_path, audio, sample_rate or 22050)
+
+    elapsed = time.perf_counter() - start
+    seconds = len(audio) / (sample_rate or 22050)
+    logger.info(f"✅ {seconds:.0f}s of speech written to {output_path} in {elapsed:.1f}s")
+    return {
+        "output": output_path,
+        "sentences": len(sentences),
+        "cached": len(sentences) - len(todo),
+        "synthesized": len(todo),
+        "seconds": seconds,
+        "elapsed": elapsed,
+    }
@@ -7,6 +7,8 @@ import logging
 import json
 import logging
 import sys
+import re
+import threading
 from datetime import datetime
 
 
@@ -42,24 +44,71 @@ def store_params_as_json(params):
         return {"config_json": None}
 
 
-def unique_output_path(path, filename):
+# Next free suffix per (directory, base, ext), shared by every caller in this process
+_suffix_index = {}
+_suffix_lock = threading.Lock()
+
+
+def _highest_suffix(path, base, ext):
+    """
+    Scans a directory once and returns the highest counter already used for
+    base/ext (0 for the bare filename, -1 if nothing matches).
+    """
+    pattern = re.compile(rf"^{re.escape(base)}(?:_(\d+))?{re.escape(ext)}$")
+    highest = -1
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                match = pattern.match(entry.name)
+                if match:
+                    highest = max(highest, int(match.group(1) or 0))
+    except FileNotFoundError:
+        pass
+    return highest
+
+
+def unique_output_path(path, filename, reserve=True):
     """
     Generates a unique output file path by appending a counter to the filename if it already exists.
 
+    The next counter comes from a single directory listing (cached per process),
+    and the name is reserved with an exclusive create so concurrent downloaders
+    never receive the same path.
+
     Args:
         path (str): Directory path.
         filename (str): Original filename.
+        reserve (bool): Create an empty placeholder at the returned path.
 
     Returns:
         str: A unique file path.
     """
     base, ext = os.path.splitext(filename)
-    counter = 1
-    unique_filename = filename
-    while os.path.exists(os.path.join(path, unique_filename)):
-        unique_filename = f"{base}_{counter}{ext}"
-        counter += 1
-    return os.path.join(path, unique_filename)
+    key = (os.path.abspath(path), base, ext)
+
+    with _suffix_lock:
+        counter = _suffix_index.get(key)
+        if counter is None:
+            counter = _highest_suffix(path, base, ext) + 1
+
+        if reserve:
+            os.makedirs(path, exist_ok=True)
+
+        while True:
+            unique_filename = filename if counter == 0 else f"{base}_{counter}{ext}"
+            candidate = os.path.join(path, unique_filename)
+            if not reserve:
+                break
+            try:
+                os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                # Another process took this name since our listing
+                counter += 1
+
+        _suffix_index[key] = counter + 1
+
+    return candidate
 
 
 def print_params(params):
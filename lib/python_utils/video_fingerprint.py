@@ -0,0 +1,393 @@
+# === VIDEO FINGERPRINT INDEX ===
+# --------------------------------------------------
+# Finds re-uploads and re-edits of the same footage without transcribing
+# anything.
+#
+# - Frames are sampled at a low rate (SAMPLE_FPS) with OpenCV. Frames that
+#   are not sampled are only grabbed, never converted. Times come from the
+#   container timestamps (CAP_PROP_POS_MSEC), so variable-frame-rate phone
+#   videos are placed correctly.
+# - Every sampled frame is reduced to a 64-bit difference hash (dHash):
+#   grayscale, shrunk to 9x8, one bit per horizontally adjacent pixel pair.
+#   The hash survives re-encoding, rescaling and mild colour and brightness
+#   changes. Near-uniform frames (black, fades) carry no information and
+#   are skipped.
+# - Hashes go into SQLite with the hash split into BANDS = 6 bands (four of
+#   11 bits, two of 10), each indexed. Two hashes within Hamming distance 5
+#   (MAX_DISTANCE) differ in at most five bands, so they always share one.
+#   Candidates come from exact band lookups and are verified with the full
+#   Hamming distance (<= max_distance). A max_distance above BANDS - 1 can
+#   miss pairs. An index written with another band layout is re-banded
+#   when it is opened.
+# - Static camera and slide shots repeat one hash for minutes. Consecutive
+#   samples within COLLAPSE_DISTANCE of the last kept one are dropped, so a
+#   static shot is stored and queried as one sample, and band values
+#   occurring more than MAX_BAND_OCCURRENCES times in one video are neither
+#   indexed nor looked up. Without this a slide matches every frame of every
+#   talk filmed in the same room, and query cost grows quadratically with
+#   the shot length. A static shot longer than MAX_GAP_SAMPLES splits a
+#   shared segment in two.
+# - A query votes each matching frame pair into (video, time offset).
+#   Consecutive query frames that agree on an offset form a shared segment,
+#   reported in milliseconds on both timelines.
+#
+# Requires: pip install opencv_python numpy
+# --------------------------------------------------
+#
+# Function: open_video_index(db_path: str) -> sqlite3.Connection
+#   Opens (and creates if needed) the fingerprint index.
+#
+# Function: frame_hash(frame: np.ndarray) -> int | None
+#   64-bit dHash of a BGR frame (None for near-uniform frames).
+#
+# Function: fingerprint_video(path: str, sample_fps: float) -> dict
+#   {"path", "duration_ms", "sample_ms", "hashes": [(t_ms, hash)]}.
+#
+# Function: add_video(conn, path: str, video_id: str, sample_fps: float) -> dict
+#   Fingerprints a video and stores it (replacing an earlier version).
+#
+# Function: find_shared_segments(conn, fingerprint: dict, max_distance: int, min_frames: int, exclude: set) -> list[dict]
+#   Stored videos sharing footage with a fingerprint, with offsets.
+#
+# Function: query_video(conn, path: str, **kwargs) -> list[dict]
+#   fingerprint_video() + find_shared_segments().
+# --------------------------------------------------
+
+import os
+import time
+import sqlite3
+import logging
+from collections import Counter
+from statistics import median
+
+# === Logger Setup ===
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "./cache/video_fingerprints.sqlite3"
+SAMPLE_FPS = 1.0
+MAX_DISTANCE = 5        # Hamming distance for two frames to count as the same
+MIN_FRAMES = 3          # matching frames needed to report a segment
+MAX_GAP_SAMPLES = 5     # missing samples tolerated inside a segment
+MIN_FRAME_STD = 4.0     # grayscale std below this = uniform frame, not hashed
+COLLAPSE_DISTANCE = 3   # consecutive samples this close to the last kept one are the same shot
+MAX_BAND_OCCURRENCES = 20  # band values more frequent than this in one video carry no alignment
+BANDS = 6               # > MAX_DISTANCE, so matching hashes share a band
+BAND_WIDTHS = [64 // BANDS + (1 if band < 64 % BANDS else 0) for band in range(BANDS)]  # 11,11,11,11,10,10
+INDEX_VERSION = 3       # PRAGMA user_version; bump when the band layout or collapsing changes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id    TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    duration_ms INTEGER,
+    sample_ms   INTEGER NOT NULL,
+    frames      INTEGER NOT NULL,
+    created     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS frames (
+    video_id TEXT NOT NULL,
+    t_ms     INTEGER NOT NULL,
+    hash     INTEGER NOT NULL,          -- dHash as signed 64-bit
+    PRIMARY KEY (video_id, t_ms)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS frame_bands (
+    band     INTEGER NOT NULL,
+    value    INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    t_ms     INTEGER NOT NULL,
+    PRIMARY KEY (band, value, video_id, t_ms)
+) WITHOUT ROWID;
+"""
+
+
+def open_video_index(db_path=DEFAULT_INDEX_PATH):
+    """
+    Opens (and creates if needed) the fingerprint index.
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode with WAL enabled.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+        _rebuild_bands(conn)
+    return conn
+
+
+def _rebuild_bands(conn):
+    """Re-collapses the stored frames and recomputes frame_bands for the current layout."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM frame_bands")
+        rows = conn.execute("SELECT video_id, t_ms, hash FROM frames ORDER BY video_id, t_ms").fetchall()
+        by_video = {}
+        for row in rows:
+            by_video.setdefault(row["video_id"], []).append((row["t_ms"], _to_unsigned(row["hash"])))
+        for video_id, hashes in by_video.items():
+            kept = _collapse(hashes)
+            conn.execute("DELETE FROM frames WHERE video_id = ?", (video_id,))
+            conn.executemany("INSERT INTO frames (video_id, t_ms, hash) VALUES (?, ?, ?)",
+                             [(video_id, t_ms, _to_signed(value)) for t_ms, value in kept])
+            conn.executemany("INSERT OR IGNORE INTO frame_bands (band, value, video_id, t_ms) VALUES (?, ?, ?, ?)",
+                             _band_rows(video_id, kept))
+            conn.execute("UPDATE videos SET frames = ? WHERE video_id = ?", (len(kept), video_id))
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if rows:
+        logger.info(f"🔁 Re-banded {len(rows)} stored frames for index version {INDEX_VERSION}")
+
+
+def _to_signed(value):
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def _bands(value):
+    bands = []
+    shift = 0
+    for band, width in enumerate(BAND_WIDTHS):
+        bands.append((band, (value >> shift) & ((1 << width) - 1)))
+        shift += width
+    return bands
+
+
+def _hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _collapse(hashes):
+    """Drops samples that repeat the last kept hash, so a static shot is one sample."""
+    kept = []
+    for t_ms, value in hashes:
+        if not kept or _hamming(value, kept[-1][1]) > COLLAPSE_DISTANCE:
+            kept.append((t_ms, value))
+    return kept
+
+
+def _frequent_bands(hashes):
+    """(band, value) pairs occurring more than MAX_BAND_OCCURRENCES times in one video."""
+    counts = Counter(pair for _, value in hashes for pair in _bands(value))
+    return {pair for pair, count in counts.items() if count > MAX_BAND_OCCURRENCES}
+
+
+def _band_rows(video_id, hashes):
+    frequent = _frequent_bands(hashes)
+    return [(band, band_value, video_id, t_ms)
+            for t_ms, value in hashes for band, band_value in _bands(value)
+            if (band, band_value) not in frequent]
+
+
+def frame_hash(frame):
+    """
+    64-bit difference hash of a BGR (or grayscale) frame.
+
+    Returns:
+        int | None: The hash, or None when the frame is near-uniform.
+    """
+    import cv2
+    import numpy as np
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    if small.std() < MIN_FRAME_STD:
+        return None
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def fingerprint_video(path, sample_fps=SAMPLE_FPS):
+    """
+    Samples a video at sample_fps and hashes the sampled frames.
+
+    Returns:
+        dict: {"path", "duration_ms", "sample_ms", "hashes": [(t_ms, hash)]}
+
+    Raises:
+        RuntimeError: When OpenCV cannot open the video.
+    """
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise RuntimeError(f"Could not open video: {path}")
+
+    start = time.perf_counter()
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25.0  # only for backends without frame timestamps
+    sample_ms = int(round(1000 / sample_fps))
+    hashes = []
+    index = 0
+    next_ms = 0
+    t_ms = 0
+    try:
+        while capture.grab():
+            position_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+            t_ms = int(round(position_ms)) if position_ms > 0 or index == 0 else int(round(index * 1000 / fps))
+            index += 1
+            if t_ms < next_ms:
+                continue
+            next_ms += sample_ms * (1 + (t_ms - next_ms) // sample_ms)  # skip grid slots a timestamp jump passed
+            ok, frame = capture.retrieve()
+            if not ok:
+                continue
+            value = frame_hash(frame)
+            if value is not None:
+                hashes.append((t_ms, value))
+    finally:
+        capture.release()
+
+    logger.info(f"🎞️ Fingerprinted {os.path.basename(path)}: {len(hashes)} frames over {t_ms / 1000:.0f}s "
+                f"in {time.perf_counter() - start:.1f}s")
+    return {"path": path, "duration_ms": t_ms, "sample_ms": sample_ms, "hashes": hashes}
+
+
+def add_fingerprint(conn, video_id, fingerprint):
+    """Stores a fingerprint under video_id (static shots collapsed), replacing any earlier one."""
+    hashes = _collapse(fingerprint["hashes"])
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DELETE FROM frame_bands WHERE video_id = ?", (video_id,))
+        conn.execute("DELETE FROM frames WHERE video_id = ?", (video_id,))
+        conn.execute("INSERT OR REPLACE INTO videos (video_id, path, duration_ms, sample_ms, frames, created) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     (video_id, fingerprint["path"], fingerprint["duration_ms"], fingerprint["sample_ms"],
+                      len(hashes), time.time()))
+        conn.executemany("INSERT OR REPLACE INTO frames (video_id, t_ms, hash) VALUES (?, ?, ?)",
+                         [(video_id, t_ms, _to_signed(value)) for t_ms, value in hashes])
+        conn.executemany("INSERT OR IGNORE INTO frame_bands (band, value, video_id, t_ms) VALUES (?, ?, ?, ?)",
+                         _band_rows(video_id, hashes))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def add_video(conn, path, video_id=None, sample_fps=SAMPLE_FPS):
+    """
+    Fingerprints a video and stores it under video_id (default: file name
+    without extension).
+
+    Returns:
+        dict: {"video_id", "frames", "duration_ms"}
+    """
+    video_id = video_id or os.path.splitext(os.path.basename(path))[0]
+    fingerprint = fingerprint_video(path, sample_fps)
+    add_fingerprint(conn, video_id, fingerprint)
+    return {"video_id": video_id, "frames": len(fingerprint["hashes"]), "duration_ms": fingerprint["duration_ms"]}
+
+
+def _matches(conn, fingerprint, max_distance, exclude):
+    """video_id -> [(offset_ms, query_t_ms, stored_t_ms)] for every matching frame pair."""
+    hashes = _collapse(fingerprint["hashes"])
+    frequent = _frequent_bands(hashes)
+    matches = {}
+    for query_t, value in hashes:
+        seen = set()
+        for band, band_value in _bands(value):
+            if (band, band_value) in frequent:
+                continue
+            rows = conn.execute(
+                "SELECT b.video_id, b.t_ms, f.hash FROM frame_bands b "
+                "JOIN frames f ON f.video_id = b.video_id AND f.t_ms = b.t_ms "
+                "WHERE b.band = ? AND b.value = ?",
+                (band, band_value),
+            ).fetchall()
+            for row in rows:
+                key = (row["video_id"], row["t_ms"])
+                if key in seen or row["video_id"] in exclude:
+                    continue
+                seen.add(key)
+                if _hamming(value, _to_unsigned(row["hash"])) <= max_distance:
+                    matches.setdefault(row["video_id"], []).append((row["t_ms"] - query_t, query_t, row["t_ms"]))
+    return matches
+
+
+def _segments(pairs, sample_ms, min_frames):
+    """Groups frame pairs into runs that agree on the offset and are contiguous in time."""
+    segments = []
+    pairs.sort()
+    cluster = [pairs[0]]
+    clusters = []
+    for pair in pairs[1:]:
+        if pair[0] - cluster[-1][0] <= sample_ms:
+            cluster.append(pair)
+        else:
+            clusters.append(cluster)
+            cluster = [pair]
+    clusters.append(cluster)
+
+    max_gap = sample_ms * MAX_GAP_SAMPLES
+    for cluster in clusters:
+        cluster.sort(key=lambda pair: pair[1])
+        run = [cluster[0]]
+        for pair in cluster[1:] + [None]:
+            if pair is not None and pair[1] - run[-1][1] <= max_gap:
+                run.append(pair)
+                continue
+            frames = len({query_t for _, query_t, _ in run})
+            if frames >= min_frames:
+                segments.append({
+                    "offset_ms": int(median(offset for offset, _, _ in run)),
+                    "query_start_ms": run[0][1],
+                    "query_end_ms": run[-1][1] + sample_ms,
+                    "match_start_ms": min(stored_t for _, _, stored_t in run),
+                    "match_end_ms": max(stored_t for _, _, stored_t in run) + sample_ms,
+                    "frames": frames,
+                })
+            run = [pair]
+    return segments
+
+
+def find_shared_segments(conn, fingerprint, max_distance=MAX_DISTANCE, min_frames=MIN_FRAMES, exclude=()):
+    """
+    Finds stored videos that share footage with a fingerprint.
+
+    Args:
+        conn (sqlite3.Connection): From open_video_index().
+        fingerprint (dict): From fingerprint_video().
+        max_distance (int): Hamming distance for two frames to match.
+        min_frames (int): Matching sampled frames needed for a segment.
+        exclude (set): video_ids to ignore (e.g. the query itself).
+
+    Returns:
+        list[dict]: One entry per stored video with shared footage, best
+        first: {"video_id", "path", "shared_ms", "coverage", "segments"}.
+        Each segment has offset_ms (stored time - query time), the segment
+        on both timelines (query_/match_start_ms, _end_ms) and frames.
+    """
+    start = time.perf_counter()
+    sample_ms = fingerprint["sample_ms"]
+    matches = _matches(conn, fingerprint, max_distance, set(exclude))
+
+    results = []
+    for video_id, pairs in matches.items():
+        segments = _segments(pairs, sample_ms, min_frames)
+        if not segments:
+            continue
+        row = conn.execute("SELECT path FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        shared_ms = sum(seg["query_end_ms"] - seg["query_start_ms"] for seg in segments)
+        results.append({
+            "video_id": video_id,
+            "path": row["path"] if row else None,
+            "shared_ms": shared_ms,
+            "coverage": min(1.0, shared_ms / max(fingerprint["duration_ms"], sample_ms)),
+            "segments": sorted(segments, key=lambda seg: seg["query_start_ms"]),
+        })
+
+    results.sort(key=lambda result: result["shared_ms"], reverse=True)
+    logger.info(f"🔍 {len(fingerprint['hashes'])} frames checked in {time.perf_counter() - start:.2f}s: "
+                f"{len(results)} video(s) share footage")
+    return results
+
+
+def query_video(conn, path, sample_fps=SAMPLE_FPS, **kwargs):
+    """Fingerprints a video and returns find_shared_segments() for it."""
+    return find_shared_segments(conn, fingerprint_video(path, sample_fps), **kwargs)
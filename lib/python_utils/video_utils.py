@@ -42,8 +42,6 @@ import datetime
 import yaml
 import tempfile
 import time
-import speech_recognition as sr
-from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip, ColorClip, concatenate_videoclips
 import threading
 import platform
 
@@ -51,6 +49,9 @@ logger = logging.getLogger(__name__)
 
 print(f"📦 {__name__} imported into {__file__}")
 
+# moviepy and speech_recognition are imported inside the functions that use
+# them: loading them here made every --help / usage error pay seconds.
+
 
 # ==================================================
 
@@ -120,11 +121,15 @@ def load_app_config():
 # AUDIO EXTRACTION AND CAPTIONING
 # ==================================================
 def extract_audio_from_video(video_path, start_time, end_time, temp_audio_path):
+    from moviepy.editor import VideoFileClip
+
     video = VideoFileClip(video_path).subclip(start_time, end_time)
     video.audio.write_audiofile(temp_audio_path)
     return temp_audio_path
 
 def transcribe_audio(audio_path):
+    import speech_recognition as sr
+
     recognizer = sr.Recognizer()
     with sr.AudioFile(audio_path) as source:
         audio_data = recognizer.record(source)
@@ -230,6 +235,8 @@ def generate_clip_transcripts(input_video, clips, output_yaml_path, logger=None)
 # PROCESS CLIPS
 # ==================================================
 def process_clips_moviepy(config, clips, logger, input_video, output_dir, captions_config=None):
+    from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
+
     video_clip = VideoFileClip(input_video)
     clips_directory = os.path.join(output_dir)
     os.makedirs(clips_directory, exist_ok=True)
@@ -282,12 +289,16 @@ def load_clips_from_file(file_path):
         return yaml.safe_load(file) if file_path.endswith(('.yaml', '.yml')) else json.load(file)
 
 def stitch_clips(clip_files, output_file):
+    from moviepy.editor import VideoFileClip, concatenate_videoclips
+
     final_clips = [VideoFileClip(clip) for clip in clip_files]
     final_video = concatenate_videoclips(final_clips, method="compose")
     final_video.write_videofile(output_file, codec="libx264", fps=24, audio_codec="aac")
     print(f"Final stitched video saved as {output_file}")
 
 def process_clips_with_captions(app_config, clips, logger, input_video, output_dir):
+    from moviepy.editor import VideoFileClip
+
     video_clip = VideoFileClip(input_video)
     clips_directory = output_dir  # ✅ No extra "clips" subdir
     os.makedirs(clips_directory, exist_ok=True)
@@ -364,6 +375,8 @@ def process_clips_with_captions(config, clips, logger, input_video, output_dir):
         input_video (str): Path to the input video
         output_dir (str): Directory to save output clips
     """
+    from moviepy.editor import VideoFileClip
+
     video_clip = VideoFileClip(input_video)
     clips_directory = os.path.join(output_dir, "clips")
     os.makedirs(clips_directory, exist_ok=True)
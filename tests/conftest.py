@@ -0,0 +1,36 @@
+# Shared pytest fixtures: lib/python_utils on sys.path and throwaway local
+# HTTP servers, so network code is tested without leaving 127.0.0.1.
+
+import os
+import sys
+import threading
+import http.server
+
+import pytest
+
+LIB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../lib/python_utils"))
+if LIB_PATH not in sys.path:
+    sys.path.insert(0, LIB_PATH)
+
+
+@pytest.fixture
+def serve():
+    """
+    Starts local servers for the duration of a test.
+
+    serve(handler_class) -> base URL ("http://127.0.0.1:<port>"). Every
+    server started is shut down when the test ends.
+    """
+    servers = []
+
+    def start(handler_class):
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
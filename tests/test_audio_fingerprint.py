@@ -0,0 +1,40 @@
+# audio_fingerprint on synthetic audio (no ffmpeg needed for sample arrays).
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import audio_fingerprint
+
+SR = audio_fingerprint.SAMPLE_RATE
+
+
+def tones(seconds, seed=1):
+    """Noise with short random tones and a stretch of digital silence."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * SR) / SR
+    samples = 0.02 * rng.standard_normal(len(t))
+    for f0, start in zip(rng.uniform(200, 3500, seconds * 2), rng.integers(0, len(t) - SR, seconds * 2)):
+        samples[start:start + SR // 2] += 0.2 * np.sin(2 * np.pi * f0 * t[:SR // 2])
+    samples[5 * SR:10 * SR] = 0
+    return samples.astype(np.float32)
+
+
+def test_blockwise_peaks_do_not_depend_on_block_size(monkeypatch):
+    samples = tones(60)
+    whole = audio_fingerprint._peaks(samples)
+
+    for block_frames in (37, 500):
+        monkeypatch.setattr(audio_fingerprint, "BLOCK_FRAMES", block_frames)
+        times, bins = audio_fingerprint._peaks(samples)
+        assert np.array_equal(times, whole[0]) and np.array_equal(bins, whole[1])
+
+
+def test_shared_audio_found_at_its_offset():
+    samples = tones(120)
+    excerpt = np.concatenate([np.zeros(7 * SR, np.float32), samples[30 * SR:90 * SR]])
+
+    regions = audio_fingerprint.match_fingerprints(audio_fingerprint.fingerprint_audio(excerpt),
+                                                   audio_fingerprint.fingerprint_audio(samples))
+
+    assert regions and abs(regions[0]["offset_ms"] - 23000) <= 64
@@ -0,0 +1,108 @@
+# browser_pool against a local stub page server. The page tests need
+# selenium and a working Chrome and are skipped without them.
+
+import http.server
+
+import pytest
+
+import browser_pool
+
+MP3 = b"ID3" + bytes(2048)
+
+PAGES = {
+    # The player fetches the file itself: seen as a network request
+    "/direct": '<html><body><audio preload="auto" src="/media/direct.mp3"></audio></body></html>',
+    # Script adds the link after load without requesting it: found in the page source
+    "/js": """<html><body><div id="player"></div><script>
+        setTimeout(function () {
+            var link = document.createElement("a");
+            link.href = location.origin + "/media/js.mp3";
+            link.textContent = "download";
+            document.getElementById("player").appendChild(link);
+        }, 300);
+    </script></body></html>""",
+    "/none": "<html><body><p>No episode here.</p></body></html>",
+}
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/media/"):
+            body, content_type = MP3, "audio/mpeg"
+        elif self.path in PAGES:
+            body, content_type = PAGES[self.path].encode(), "text/html"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def chrome():
+    pytest.importorskip("selenium")
+    try:
+        driver = browser_pool.create_driver(headless=True)
+    except Exception as e:
+        pytest.skip(f"Chrome not available: {e}")
+    yield driver
+    driver.quit()
+
+
+def test_direct_media_request(chrome, serve):
+    host = serve(StubHandler)
+    result = browser_pool.find_media(chrome, host + "/direct", timeout=10)
+    assert result["ready"] == "media"
+    assert result["media_url"] == host + "/media/direct.mp3"
+
+
+def test_js_inserted_mp3_link(chrome, serve):
+    host = serve(StubHandler)
+    result = browser_pool.find_media(chrome, host + "/js", timeout=10, idle_seconds=1.0)
+    assert result["media_url"] == host + "/media/js.mp3"
+
+
+def test_page_without_media(chrome, serve):
+    host = serve(StubHandler)
+    result = browser_pool.find_media(chrome, host + "/none", timeout=10, idle_seconds=0.5)
+    assert result["media_url"] is None
+    assert result["ready"] == "idle"
+
+
+def test_fetch_media_urls_on_a_pool(chrome, serve):
+    host = serve(StubHandler)
+    results = browser_pool.fetch_media_urls([host + "/direct", host + "/none"], pool_size=2, timeout=10)
+    assert [r["url"] for r in results] == [host + "/direct", host + "/none"]
+    assert results[0]["media_url"] and results[1]["media_url"] is None
+
+
+def test_pool_quits_started_drivers_when_a_launch_fails(monkeypatch):
+    launched = []
+
+    class FakeDriver:
+        quit_called = False
+
+        def quit(self):
+            self.quit_called = True
+
+    def create_driver(headless=True):
+        if len(launched) == 1:
+            launched.append(None)
+            raise RuntimeError("chrome crashed")
+        driver = FakeDriver()
+        launched.append(driver)
+        return driver
+
+    monkeypatch.setattr(browser_pool, "create_driver", create_driver)
+    with pytest.raises(RuntimeError, match="chrome crashed"):
+        with browser_pool.browser_pool(size=3):
+            pass
+
+    started = [driver for driver in launched if driver]
+    assert started and all(driver.quit_called for driver in started)
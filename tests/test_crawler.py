@@ -0,0 +1,121 @@
+# crawler.crawl against a small multi-page site served on 127.0.0.1.
+
+import json
+import http.server
+
+import crawler
+
+WORDS = "the quick brown fox jumps over the lazy dog again and again".split()
+
+
+def article(title, links=(), words=40):
+    body = " ".join(WORDS[i % len(WORDS)] for i in range(words))
+    anchors = "".join(f'<a href="{href}">{href}</a>' for href in links)
+    return f"<html><body><nav>{anchors}</nav><article><h1>{title}</h1><p>{body}</p></article></body></html>"
+
+
+SITE = {
+    "/": article("Home", ["/a", "/dup1", "/dup2", "/a?utm_source=feed#top", "/private/secret", "mailto:x@y"]),
+    "/a": article("A", ["/b"]),
+    "/b": article("B", ["/c"]),
+    "/c": article("C"),
+    "/dup1": article("Same story"),
+    "/dup2": article("Same  STORY"),  # same text after case/whitespace normalisation
+    "/private/secret": article("Secret"),
+}
+
+
+def site_handler(pages, robots=(200, "User-agent: *\nDisallow: /private/\n")):
+    """Handler class serving `pages` plus robots.txt with the given (status, body)."""
+
+    class SiteHandler(http.server.BaseHTTPRequestHandler):
+        requests = []
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            type(self).requests.append(self.path)
+            if self.path == "/robots.txt":
+                status, text = robots
+            elif self.path in pages:
+                status, text = 200, pages[self.path]
+            else:
+                status, text = 404, "not found"
+            body = text.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain" if self.path == "/robots.txt" else "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return SiteHandler
+
+
+def run(seeds, tmp_path, **kwargs):
+    kwargs.setdefault("max_depth", 3)
+    return crawler.crawl(seeds, str(tmp_path / "articles"), delay=0, workers=4, min_words=10,
+                         cache_dir=None, **kwargs)
+
+
+def manifest(summary):
+    with open(summary["manifest"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_robots_disallow_and_dedup(serve, tmp_path):
+    handler = site_handler(SITE)
+    host = serve(handler)
+
+    summary = run([host + "/"], tmp_path)
+    pages = manifest(summary)["pages"]
+
+    assert "/private/secret" not in handler.requests
+    assert pages[host + "/private/secret"]["status"] == "disallowed"
+    assert handler.requests.count("/a") == 1  # tracking params and fragments normalised away
+    assert handler.requests.count("/robots.txt") == 1
+    assert summary["duplicates"] == 1
+    assert summary["articles"] == len(SITE) - 2  # one duplicate, one disallowed
+
+
+def test_depth_limit(serve, tmp_path):
+    handler = site_handler(SITE)
+    host = serve(handler)
+
+    summary = run([host + "/"], tmp_path, max_depth=2)
+
+    assert "/b" in handler.requests and "/c" not in handler.requests
+    assert manifest(summary)["pages"][host + "/b"]["depth"] == 2
+
+
+def test_other_hosts_followed_only_when_allowed(serve, tmp_path):
+    other = site_handler({"/": article("Elsewhere")})
+    other_host = serve(other)
+    handler = site_handler({"/": article("Home", [other_host + "/"])})
+    host = serve(handler)
+
+    run([host + "/"], tmp_path)
+    assert other.requests == []
+
+    run([host + "/"], tmp_path / "open", same_host=False)
+    assert "/" in other.requests
+
+
+def test_robots_401_403_disallow_everything(serve, tmp_path):
+    for status in (401, 403):
+        handler = site_handler(SITE, robots=(status, "denied"))
+        host = serve(handler)
+
+        summary = run([host + "/"], tmp_path / str(status))
+
+        assert handler.requests == ["/robots.txt"]
+        assert summary["disallowed"] == 1 and summary["articles"] == 0
+
+
+def test_missing_robots_allows_everything(serve, tmp_path):
+    handler = site_handler(SITE, robots=(404, "none"))
+    host = serve(handler)
+
+    run([host + "/"], tmp_path)
+
+    assert "/private/secret" in handler.requests
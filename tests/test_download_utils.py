@@ -0,0 +1,175 @@
+# download_utils against a local Range-capable http.server fixture.
+
+import os
+import re
+import hashlib
+import http.server
+
+import pytest
+
+import download_utils
+
+DATA = bytes(range(256)) * 1024  # 256 KB
+
+
+def range_handler(data=DATA, etag='"v1"', honor_range=True, known_length=True, failures=0):
+    """
+    Handler class serving one file. The stdlib handler ignores Range; this one
+    answers 206/416 like a CDN, and can ignore ranges (always 200), hide the
+    total size ("bytes a-b/*", no Content-Length) or fail the first requests.
+    Every request is recorded in handler.requests as (method, headers).
+    """
+
+    class RangeHandler(http.server.BaseHTTPRequestHandler):
+        requests = []
+        failures_left = failures
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, send_body):
+            cls = type(self)
+            cls.requests.append((self.command, dict(self.headers)))
+            if cls.failures_left > 0:
+                cls.failures_left -= 1
+                self.send_error(500)
+                return
+
+            start, end = 0, len(data) - 1
+            range_header = self.headers.get("Range") if honor_range else None
+            if range_header and self.headers.get("If-Range", etag) != etag:
+                range_header = None  # validator changed: full file
+            if range_header:
+                match = re.match(r"bytes=(\d+)-(\d*)$", range_header)
+                start = int(match.group(1))
+                if start >= len(data):
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(data)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                end = min(int(match.group(2)), len(data) - 1) if match.group(2) else len(data) - 1
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(data) if known_length else '*'}")
+            else:
+                self.send_response(200)
+            if honor_range:
+                self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            if known_length:
+                self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(data[start:end + 1])
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def do_GET(self):
+            self._respond(True)
+
+    return RangeHandler
+
+
+def ranged_gets(handler):
+    return [headers.get("Range") for method, headers in handler.requests
+            if method == "GET" and headers.get("Range") != "bytes=0-0"]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(download_utils.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_segmented_download_matches_hash(serve, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_utils, "SEGMENT_THRESHOLD", 1024)
+    handler = range_handler()
+    url = serve(handler) + "/episode.mp3"
+    output = str(tmp_path / "episode.mp3")
+
+    result = download_utils.download_file({
+        "url": url, "output_path": output, "segments": 4,
+        "expected_hash": hashlib.sha256(DATA).hexdigest(),
+    })
+
+    assert result == {"to_process": output}
+    assert open(output, "rb").read() == DATA
+    assert len(ranged_gets(handler)) == 4
+    assert not [name for name in os.listdir(tmp_path) if ".part" in name]
+
+
+def test_resume_fetches_only_the_missing_bytes(serve, tmp_path):
+    handler = range_handler()
+    url = serve(handler) + "/episode.mp3"
+    output = str(tmp_path / "episode.mp3")
+    with open(output + ".part", "wb") as f:
+        f.write(DATA[:100_000])
+
+    assert download_utils.download_file({"url": url, "output_path": output, "segments": 1})
+    assert open(output, "rb").read() == DATA
+    assert ranged_gets(handler) == [f"bytes=100000-{len(DATA) - 1}"]
+    resume = [headers for method, headers in handler.requests if headers.get("Range") == "bytes=100000-262143"]
+    assert resume[0]["If-Range"] == '"v1"'
+
+
+def test_server_ignoring_range_restarts_from_zero(serve, tmp_path):
+    handler = range_handler(honor_range=False)
+    url = serve(handler) + "/episode.mp3"
+    output = str(tmp_path / "episode.mp3")
+    with open(output + ".part", "wb") as f:
+        f.write(b"stale bytes from another file")
+
+    assert download_utils.download_file({"url": url, "output_path": output})
+    assert open(output, "rb").read() == DATA
+
+
+def test_unknown_length_resume_sends_if_range(serve, tmp_path):
+    handler = range_handler(known_length=False)
+    url = serve(handler) + "/episode.mp3"
+    output = str(tmp_path / "episode.mp3")
+    with open(output + ".part", "wb") as f:
+        f.write(DATA[:50_000])
+
+    assert download_utils.download_file({"url": url, "output_path": output})
+    assert open(output, "rb").read() == DATA
+    resume = [headers for method, headers in handler.requests if headers.get("Range") == "bytes=50000-"]
+    assert resume and resume[0]["If-Range"] == '"v1"'
+
+
+def test_416_on_complete_part_publishes_it(serve, tmp_path):
+    handler = range_handler(known_length=False)
+    url = serve(handler) + "/episode.mp3"
+    output = str(tmp_path / "episode.mp3")
+    with open(output + ".part", "wb") as f:
+        f.write(DATA)
+
+    assert download_utils.download_file({"url": url, "output_path": output})
+    assert open(output, "rb").read() == DATA
+    assert ranged_gets(handler) == [f"bytes={len(DATA)}-"]
+
+
+def test_size_mismatch_discards_the_download(serve, tmp_path):
+    url = serve(range_handler()) + "/episode.mp3"
+    output = str(tmp_path / "episode.mp3")
+
+    assert download_utils.download_file({"url": url, "output_path": output, "expected_size": len(DATA) + 1}) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_retries_then_succeeds_without_trailing_backoff(serve, tmp_path, no_backoff):
+    # HEAD and the probe GET take the first two failures, the download the third
+    handler = range_handler(failures=3)
+    url = serve(handler) + "/episode.mp3"
+    output = str(tmp_path / "episode.mp3")
+
+    assert download_utils.download_file({"url": url, "output_path": output, "retries": 3})
+    assert open(output, "rb").read() == DATA
+    assert no_backoff == [1]
+
+    no_backoff.clear()
+    handler = range_handler(failures=100)
+    url = serve(handler) + "/episode.mp3"
+    assert download_utils.download_file({"url": url, "output_path": str(tmp_path / "x.mp3"), "retries": 2}) is None
+    assert no_backoff == [1]  # no sleep after the last attempt
@@ -0,0 +1,89 @@
+# media_cache against a local media server whose validators can change.
+
+import sqlite3
+import http.server
+
+import pytest
+
+import media_cache
+
+
+def media_handler():
+    """Handler class serving /episode.mp3 with the class-level validators."""
+
+    class MediaHandler(http.server.BaseHTTPRequestHandler):
+        body = b"ID3" + bytes(1024)
+        etag = None
+        last_modified = "Mon, 06 Oct 2025 10:00:00 GMT"
+
+        def log_message(self, *args):
+            pass
+
+        def _headers(self):
+            cls = type(self)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(cls.body)))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Last-Modified", cls.last_modified)
+            if cls.etag:
+                self.send_header("ETag", cls.etag)
+            self.end_headers()
+
+        def do_HEAD(self):
+            self._headers()
+
+        def do_GET(self):
+            self._headers()
+            self.wfile.write(type(self).body)
+
+    return MediaHandler
+
+
+@pytest.fixture
+def cache(tmp_path):
+    conn = media_cache.open_media_cache(str(tmp_path / "media.sqlite3"))
+    yield conn
+    conn.close()
+
+
+def test_cached_entry_reused_until_last_modified_changes(serve, cache):
+    handler = media_handler()
+    media_url = serve(handler) + "/episode.mp3"
+    calls = []
+
+    def resolver(page_url):
+        calls.append(page_url)
+        return media_url
+
+    first = media_cache.resolve_media("https://pod.example/ep1", resolver, cache)
+    second = media_cache.resolve_media("https://pod.example/ep1", resolver, cache)
+    assert not first["from_cache"] and second["from_cache"] and len(calls) == 1
+    assert first["last_modified"] == handler.last_modified
+
+    handler.last_modified = "Tue, 07 Oct 2025 10:00:00 GMT"  # same size, no ETag: re-encoded in place
+    third = media_cache.resolve_media("https://pod.example/ep1", resolver, cache)
+    assert not third["from_cache"] and len(calls) == 2
+    assert third["last_modified"] == handler.last_modified
+
+
+def test_opened_connection_is_closed(serve, tmp_path, monkeypatch):
+    media_url = serve(media_handler()) + "/episode.mp3"
+    opened = []
+
+    def open_media_cache():
+        conn = sqlite3.connect(str(tmp_path / "media.sqlite3"), isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(media_cache.SCHEMA)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(media_cache, "open_media_cache", open_media_cache)
+    media_cache.resolve_media("https://pod.example/ep1", lambda page_url: media_url)
+    with pytest.raises(RuntimeError):
+        media_cache.resolve_media("https://pod.example/ep2", lambda page_url: None)
+
+    assert len(opened) == 2
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
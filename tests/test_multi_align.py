@@ -0,0 +1,30 @@
+# multi_align.load_versions naming of transcripts from several directories.
+
+import pytest
+
+import multi_align
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_colliding_names_get_their_directories(tmp_path):
+    paths = [
+        write(tmp_path / "2019" / "talk.full.txt", "we fought at the border"),
+        write(tmp_path / "2025" / "talk.txt", "we fought at the wall"),
+        write(tmp_path / "2025" / "interview.txt", "an interview"),
+    ]
+
+    versions = multi_align.load_versions(paths)
+
+    assert list(versions) == ["2019/talk", "2025/talk", "interview"]
+    assert versions["2019/talk"] != versions["2025/talk"]
+
+
+def test_same_file_twice_is_an_error(tmp_path):
+    path = write(tmp_path / "talk.txt", "once")
+    with pytest.raises(ValueError, match="more than once"):
+        multi_align.load_versions([path, str(tmp_path / "." / "talk.txt")])
@@ -0,0 +1,73 @@
+# podcast_fetch.download_mp3 against a local Range-capable mp3 server.
+
+import re
+import http.server
+
+import podcast_fetch
+
+MP3 = b"ID3" + bytes(range(256)) * 512
+
+
+def mp3_handler():
+    """Handler class serving MP3 at every path, honouring Range; records GET ranges."""
+
+    class Mp3Handler(http.server.BaseHTTPRequestHandler):
+        ranges = []
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, send_body):
+            start = 0
+            match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(MP3) - 1}/{len(MP3)}")
+            else:
+                self.send_response(200)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", '"ep"')
+            self.send_header("Content-Length", str(len(MP3) - start))
+            self.end_headers()
+            if send_body:
+                type(self).ranges.append(self.headers.get("Range"))
+                self.wfile.write(MP3[start:])
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def do_GET(self):
+            self._respond(True)
+
+    return Mp3Handler
+
+
+def media(url):
+    return {"media_url": url, "headers": {}, "content_length": len(MP3)}
+
+
+def test_same_basename_from_different_urls(serve, tmp_path):
+    host = serve(mp3_handler())
+
+    first = podcast_fetch.download_mp3(media(host + "/show-a/episode.mp3"), str(tmp_path))
+    second = podcast_fetch.download_mp3(media(host + "/show-b/episode.mp3"), str(tmp_path))
+
+    assert first != second
+    assert open(first, "rb").read() == MP3 and open(second, "rb").read() == MP3
+
+
+def test_rerun_resumes_partial_and_skips_finished(serve, tmp_path):
+    handler = mp3_handler()
+    url = serve(handler) + "/episode.mp3"
+    path = podcast_fetch._output_path(url, str(tmp_path))
+    with open(f"{path}.part", "wb") as f:
+        f.write(MP3[:5000])  # left behind by an interrupted run
+
+    assert podcast_fetch.download_mp3(media(url), str(tmp_path)) == path
+    assert open(path, "rb").read() == MP3
+    assert [r for r in handler.ranges if r != "bytes=0-0"] == [f"bytes=5000-{len(MP3) - 1}"]
+
+    handler.ranges.clear()
+    assert podcast_fetch.download_mp3(media(url), str(tmp_path)) == path
+    assert handler.ranges == []
@@ -0,0 +1,47 @@
+# podcast_stream.iter_pcm against a slow local audio server. Needs ffmpeg.
+
+import time
+import shutil
+import http.server
+
+import pytest
+
+pytest.importorskip("numpy")
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+import podcast_stream
+
+CHUNK = bytes(64 * 1024)
+CHUNKS = 200  # ~13 MB at one chunk per 10 ms: two seconds to serve in full
+
+
+class SlowAudioHandler(http.server.BaseHTTPRequestHandler):
+    sent = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(CHUNK) * CHUNKS))
+        self.end_headers()
+        try:
+            for _ in range(CHUNKS):
+                self.wfile.write(CHUNK)
+                type(self).sent += 1
+                time.sleep(0.01)
+        except OSError:
+            pass
+
+
+def test_consumer_error_stops_the_download(serve, tmp_path):
+    url = serve(SlowAudioHandler) + "/episode.wav"
+
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        for _ in podcast_stream.iter_pcm(url, str(tmp_path / "episode.wav")):
+            raise ValueError("transcription failed")
+
+    assert time.perf_counter() - start < 1.5
+    assert SlowAudioHandler.sent < CHUNKS
@@ -0,0 +1,132 @@
+# scraper.fetch / fetch_all against fixture pages on a local http.server.
+
+import time
+import threading
+import http.server
+
+import requests
+
+import scraper
+
+
+def page_handler(delay=0.0, failures=0, status=200):
+    """
+    Handler class serving a tiny article at every path. Tracks the peak
+    number of requests in flight, can fail the first requests with 503,
+    answers with `status` and honours If-None-Match with a 304.
+    """
+
+    class PageHandler(http.server.BaseHTTPRequestHandler):
+        requests = []
+        in_flight = 0
+        peak = 0
+        failures_left = failures
+        lock = threading.Lock()
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            cls = type(self)
+            with cls.lock:
+                cls.requests.append((self.path, dict(self.headers)))
+                cls.in_flight += 1
+                cls.peak = max(cls.peak, cls.in_flight)
+                fail = cls.failures_left > 0
+                cls.failures_left -= fail
+            try:
+                time.sleep(delay)
+                if fail:
+                    self.send_error(503)
+                    return
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = f"<html><body><article><p>Page {self.path}</p></article></body></html>".encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with cls.lock:
+                    cls.in_flight -= 1
+
+    return PageHandler
+
+
+def test_fetch_all_limits_concurrency_per_host(serve, tmp_path):
+    slow_a, slow_b = page_handler(delay=0.2), page_handler(delay=0.2)
+    host_a, host_b = serve(slow_a), serve(slow_b)
+    urls = [f"{host_a}/a{i}" for i in range(6)] + [f"{host_b}/b{i}" for i in range(6)]
+
+    results = scraper.fetch_all(urls, max_workers=8, per_host=2, cache_dir=None)
+
+    assert all(results[url] and "Page" in results[url]["text"] for url in urls)
+    assert slow_a.peak == 2 and slow_b.peak == 2
+
+
+def test_later_per_host_limit_is_honoured(serve):
+    handler = page_handler(delay=0.1)
+    host = serve(handler)
+    scraper.fetch_all([f"{host}/warm{i}" for i in range(4)], per_host=3, cache_dir=None)
+
+    handler.peak = 0
+    scraper.fetch_all([f"{host}/p{i}" for i in range(4)], per_host=1, cache_dir=None)
+    assert handler.peak == 1
+
+
+def test_session_per_pool_size():
+    assert scraper.get_session(3) is scraper.get_session(3)
+    assert scraper.get_session(3) is not scraper.get_session(5)
+    assert scraper.get_session(5).get_adapter("http://x")._pool_maxsize == 5
+
+
+def test_transient_errors_are_retried(serve):
+    handler = page_handler(failures=2)
+    url = serve(handler) + "/flaky"
+
+    result = scraper.fetch(url, session=scraper.get_session(), cache_dir=None)
+
+    assert result and result["status"] == 200
+    assert len(handler.requests) == 3
+
+
+def test_cache_revalidates_and_serves_stale_copy(serve, tmp_path):
+    handler = page_handler()
+    url = serve(handler) + "/cached"
+    cache_dir = str(tmp_path / "http")
+
+    first = scraper.fetch(url, cache_dir=cache_dir)
+    second = scraper.fetch(url, cache_dir=cache_dir)
+    fresh = scraper.fetch(url, cache_dir=cache_dir, max_age=60)
+
+    assert not first["from_cache"] and second["from_cache"] and fresh["from_cache"]
+    assert second["text"] == first["text"]
+    assert len(handler.requests) == 2  # max_age hit did not go to the network
+    assert handler.requests[1][1]["If-None-Match"] == '"v1"'
+
+    # Network down: the stale copy is served (plain session, no retry backoff)
+    closed = requests.Session()
+    closed.get = lambda *args, **kwargs: (_ for _ in ()).throw(requests.ConnectionError("down"))
+    stale = scraper.fetch(url, session=closed, cache_dir=cache_dir)
+    assert stale["from_cache"] and stale["text"] == first["text"]
+
+
+def test_non_200_success_statuses_are_results(serve):
+    url = serve(page_handler(status=203)) + "/mirror"
+    result = scraper.fetch(url, cache_dir=None)
+    assert result and result["status"] == 203
+
+
+def test_client_errors_are_failures(serve):
+    class Missing(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_error(404)
+
+    assert scraper.fetch(serve(Missing) + "/gone", cache_dir=None) is None
@@ -0,0 +1,40 @@
+# translation.split_sentences: sentence and length splitting (no model needed).
+
+import translation
+
+
+def test_latin_sentences():
+    assert translation.split_sentences("Hola.  ¿Qué tal?\nBien!") == ["Hola.", "¿Qué tal?", "Bien!"]
+
+
+def test_cjk_sentence_punctuation():
+    text = "今天天气很好。我们去公园吧！你来吗？好的"
+    assert translation.split_sentences(text) == ["今天天气很好。", "我们去公园吧！", "你来吗？", "好的"]
+
+
+def test_long_cjk_sentence_split_by_characters():
+    clause = "这是一个没有空格的很长的句子" * 3  # 42 characters
+    text = "，".join([clause] * 20) + "。"
+
+    pieces = translation.split_sentences(text, max_chars=100)
+
+    assert all(len(piece) <= 100 for piece in pieces)
+    assert "".join(pieces) == text
+    assert all(piece.endswith(("，", "。")) for piece in pieces)  # cut at clause punctuation
+
+
+def test_unpunctuated_cjk_cut_into_windows():
+    text = "字" * 250
+    pieces = translation.split_sentences(text, max_chars=100)
+    assert [len(piece) for piece in pieces] == [100, 100, 50]
+
+
+def test_long_latin_sentence_split_by_words_and_characters():
+    words = " ".join(f"word{i}" for i in range(300))
+
+    by_words = translation.split_sentences(words, max_words=50, max_chars=10_000)
+    by_chars = translation.split_sentences(words, max_words=1_000, max_chars=120)
+
+    assert all(len(piece.split()) <= 50 for piece in by_words)
+    assert all(len(piece) <= 120 for piece in by_chars)
+    assert " ".join(by_words) == words and " ".join(by_chars) == words